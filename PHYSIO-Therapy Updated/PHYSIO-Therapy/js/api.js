@@ -2,7 +2,8 @@
 // - getIdToken() comes from auth.js
 // - API_BASE_URL comes from config.js
 
-async function apiRequest(endpoint, options = {}) {
+// fetch() with auth headers; throws with the backend's error message on non-2xx
+async function apiFetch(endpoint, options = {}) {
   const token = await getIdToken()
 
   const defaultOptions = {
@@ -38,20 +39,140 @@ async function apiRequest(endpoint, options = {}) {
     throw new Error(message)
   }
 
+  return response
+}
+
+async function apiRequest(endpoint, options = {}) {
+  const response = await apiFetch(endpoint, options)
   return response.json()
 }
 
 // Pose analysis endpoint
-async function analyzePose(imageData, exerciseType) {
-  return apiRequest("/analyze_pose", {
+// frame is a JPEG Blob from webcamManager.captureFrame(), sent as the raw request
+// body (a base64 data URL string is still sent as JSON).
+// sessionId keeps the backend pose tracker for this live session separate from other users
+async function analyzePose(frame, exerciseType, sessionId = null) {
+  if (typeof frame === "string") {
+    return apiRequest("/analyze_pose", {
+      method: "POST",
+      body: JSON.stringify({
+        image: frame,
+        exercise_type: exerciseType,
+        session_id: sessionId,
+      }),
+    })
+  }
+
+  const params = new URLSearchParams({ exercise_type: exerciseType })
+  if (sessionId) params.set("session_id", sessionId)
+
+  return apiRequest(`/analyze_pose?${params}`, {
+    method: "POST",
+    headers: { "Content-Type": frame.type || "image/jpeg" },
+    body: frame,
+  })
+}
+
+// Pack MediaPipe landmarks as 33×4 little-endian float32 (x, y, z, visibility),
+// after an optional header of headerBytes bytes. The server gates rep angles
+// and ROI checks on visibility, so it is sent even though it costs 132 bytes.
+function packLandmarks(landmarks, headerBytes = 0) {
+  const buffer = new ArrayBuffer(headerBytes + landmarks.length * 4 * 4)
+  const view = new DataView(buffer)
+  landmarks.forEach((lm, i) => {
+    const offset = headerBytes + i * 16
+    view.setFloat32(offset, lm.x, true)
+    view.setFloat32(offset + 4, lm.y, true)
+    view.setFloat32(offset + 8, lm.z, true)
+    view.setFloat32(offset + 12, typeof lm.visibility === "number" ? lm.visibility : 1, true)
+  })
+  return { buffer, view }
+}
+
+// Landmark-only analysis: sends the 33 browser-side MediaPipe landmarks
+// (528 bytes) instead of a JPEG frame.
+async function analyzeLandmarks(landmarks, exerciseType, sessionId = null, imageWidth = 1, imageHeight = 1) {
+  const params = new URLSearchParams({
+    exercise_type: exerciseType,
+    image_width: imageWidth,
+    image_height: imageHeight,
+  })
+  if (sessionId) params.set("session_id", sessionId)
+
+  return apiRequest(`/analyze_landmarks/binary?${params}`, {
     method: "POST",
-    body: JSON.stringify({
-      image: imageData,
-      exercise_type: exerciseType,
-    }),
+    headers: { "Content-Type": "application/octet-stream" },
+    body: packLandmarks(landmarks).buffer,
   })
 }
 
+// Streaming analysis over the /ws/analyze WebSocket. Authenticates once at
+// connect; results arrive asynchronously through onResult, tagged with the
+// sequence number of the frame they belong to. Results older than the newest
+// one already delivered are discarded.
+const STREAM_HEADER_BYTES = 5 // uint32 seq + uint8 kind
+const STREAM_KIND_IMAGE = 0
+const STREAM_KIND_LANDMARKS = 1
+
+async function openAnalysisStream({ exerciseType, sessionId, imageWidth = 1, imageHeight = 1, onResult, onClose }) {
+  const token = await getIdToken()
+  const params = new URLSearchParams({
+    exercise_type: exerciseType,
+    image_width: imageWidth,
+    image_height: imageHeight,
+  })
+  if (token) params.set("token", token)
+  if (sessionId) params.set("session_id", sessionId)
+
+  const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, "ws")}/ws/analyze?${params}`)
+  socket.binaryType = "arraybuffer"
+
+  await new Promise((resolve, reject) => {
+    socket.addEventListener("open", resolve, { once: true })
+    socket.addEventListener("close", () => reject(new Error("Analysis stream closed")), { once: true })
+  })
+
+  let seq = 0
+  let lastSeq = -1
+  socket.addEventListener("message", (event) => {
+    const result = JSON.parse(event.data)
+    if (result.error) {
+      console.warn("Analysis stream error:", result.error)
+      return
+    }
+    if (result.seq <= lastSeq) return
+    lastSeq = result.seq
+    if (onResult) onResult(result)
+  })
+  socket.addEventListener("close", () => {
+    if (onClose) onClose()
+  })
+
+  return {
+    isOpen: () => socket.readyState === WebSocket.OPEN,
+    sendLandmarks(landmarks) {
+      seq += 1
+      const { buffer, view } = packLandmarks(landmarks, STREAM_HEADER_BYTES)
+      view.setUint32(0, seq, true)
+      view.setUint8(4, STREAM_KIND_LANDMARKS)
+      socket.send(buffer)
+    },
+    sendFrame(frame) {
+      seq += 1
+      if (typeof frame === "string") {
+        socket.send(JSON.stringify({ seq, image: frame }))
+        return
+      }
+      // Binary frame: header + JPEG bytes
+      const header = new DataView(new ArrayBuffer(STREAM_HEADER_BYTES))
+      header.setUint32(0, seq, true)
+      header.setUint8(4, STREAM_KIND_IMAGE)
+      socket.send(new Blob([header.buffer, frame]))
+    },
+    close: () => socket.close(),
+  }
+}
+
 // Get user dashboard stats
 async function getDashboardStats() {
   return apiRequest("/dashboard/stats", {
@@ -66,12 +187,20 @@ async function getRecentSessions(limit = 5) {
   })
 }
 
-// Get session history
-async function getSessionHistory(exerciseFilter = "") {
-  const params = exerciseFilter ? `?exercise=${exerciseFilter}` : ""
-  return apiRequest(`/sessions/history${params}`, {
+// Get one page of session history (newest first)
+// Returns { sessions, nextCursor }; pass nextCursor back to get the following page (null on the last page)
+async function getSessionHistory(exerciseFilter = "", cursor = null, limit = 50) {
+  const params = new URLSearchParams({ limit: String(limit) })
+  if (exerciseFilter) params.set("exercise", exerciseFilter)
+  if (cursor) params.set("cursor", cursor)
+
+  const response = await apiFetch(`/sessions/history?${params}`, {
     method: "GET",
   })
+  return {
+    sessions: await response.json(),
+    nextCursor: response.headers.get("X-Next-Cursor"),
+  }
 }
 
 // Save session
@@ -8,6 +8,18 @@ document.addEventListener("DOMContentLoaded", () => {
   })
 })
 
+const HISTORY_PAGE_SIZE = 50
+
+// Paging state for the history list; `generation` discards pages from a previous filter
+const historyState = {
+  filter: "",
+  cursor: null,
+  loading: false,
+  done: false,
+  generation: 0,
+  observer: null,
+}
+
 async function loadHistoryData(exerciseFilter = "") {
   try {
     // Load aggregate stats
@@ -23,19 +35,71 @@ async function loadHistoryData(exerciseFilter = "") {
     document.getElementById("avg-accuracy").textContent = `${stats.avgAccuracy || 0}%`
     document.getElementById("total-time").textContent = `${stats.totalTime || 0} min`
 
-    // Load session history
-    const sessions = await getSessionHistory(exerciseFilter).catch(() => [])
-    displayHistory(sessions)
+    // Load the first page of session history; later pages load on scroll
+    resetHistory(exerciseFilter)
+    await loadNextHistoryPage()
   } catch (error) {
     console.error("Error loading history data:", error)
-    displayHistory([])
+    displayHistory([], false)
+  }
+}
+
+function resetHistory(exerciseFilter) {
+  historyState.filter = exerciseFilter
+  historyState.cursor = null
+  historyState.loading = false
+  historyState.done = false
+  historyState.generation += 1
+}
+
+async function loadNextHistoryPage() {
+  if (historyState.loading || historyState.done) return
+
+  const generation = historyState.generation
+  const append = historyState.cursor !== null
+  historyState.loading = true
+
+  try {
+    const page = await getSessionHistory(historyState.filter, historyState.cursor, HISTORY_PAGE_SIZE).catch(() => ({
+      sessions: [],
+      nextCursor: null,
+    }))
+    if (generation !== historyState.generation) return
+
+    historyState.cursor = page.nextCursor
+    historyState.done = !page.nextCursor
+    displayHistory(page.sessions, append)
+  } finally {
+    if (generation === historyState.generation) historyState.loading = false
+  }
+
+  observeHistoryEnd()
+}
+
+// Load the next page when the end of the list scrolls into view
+function observeHistoryEnd() {
+  const container = document.getElementById("history-list")
+
+  if (!historyState.observer) {
+    historyState.observer = new IntersectionObserver(
+      (entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) loadNextHistoryPage()
+      },
+      { rootMargin: "200px" },
+    )
+  }
+  historyState.observer.disconnect()
+
+  const last = container.lastElementChild
+  if (!historyState.done && last && last.classList.contains("history-item")) {
+    historyState.observer.observe(last)
   }
 }
 
-function displayHistory(sessions) {
+function displayHistory(sessions, append = false) {
   const container = document.getElementById("history-list")
 
-  if (!sessions || sessions.length === 0) {
+  if (!append && (!sessions || sessions.length === 0)) {
     container.innerHTML = `
             <div class="empty-state">
                 <p>No exercise sessions found. Start exercising to see your history!</p>
@@ -44,7 +108,7 @@ function displayHistory(sessions) {
     return
   }
 
-  container.innerHTML = sessions
+  const html = sessions
     .map(
       (session) => `
         <div class="history-item">
@@ -70,6 +134,12 @@ function displayHistory(sessions) {
     `,
     )
     .join("")
+
+  if (append) {
+    container.insertAdjacentHTML("beforeend", html)
+  } else {
+    container.innerHTML = html
+  }
 }
 
 function setupFilter() {
@@ -10,6 +10,15 @@
   let lastAnalysisTs = 0
   const ANALYSIS_INTERVAL_MS = 350
 
+  // Latest landmarks from browser-side MediaPipe; when fresh, these are sent
+  // instead of a JPEG frame so the backend skips decode and pose detection.
+  let latestLandmarks = null
+  let latestLandmarksTs = 0
+  const LANDMARKS_MAX_AGE_MS = 500
+
+  // WebSocket channel for analysis; falls back to HTTP requests when unavailable
+  let analysisStream = null
+
   let adviceInterval = null
   let adviceInFlight = false
   let lastAdviceTs = 0
@@ -17,6 +26,7 @@
   let lastLiveFeedbackMessage = ""
   let lastAiAdviceMessage = ""
   const sessionData = {
+    sessionId: "",
     exerciseType: "",
     startTime: null,
     correctReps: 0,
@@ -46,6 +56,7 @@
   }
 
   sessionData.exerciseType = exerciseType
+  sessionData.sessionId = createSessionId()
   document.getElementById("exercise-title").textContent = `Remote Rehab Session: ${formatExerciseName(exerciseType)}`
 
   const videoElement = document.getElementById("webcam")
@@ -156,18 +167,34 @@ function startAnalysis() {
   analysisLoopActive = true
   analysisInFlight = false
   lastAnalysisTs = 0
+  connectAnalysisStream()
 
   const loop = async (ts) => {
     if (!analysisLoopActive) return
 
-    if (webcamManager && webcamManager.isActive) {
-      if (!analysisInFlight && ts - lastAnalysisTs >= ANALYSIS_INTERVAL_MS) {
-        const frameData = webcamManager.captureFrame()
-        if (frameData) {
-          analysisInFlight = true
+    if (webcamManager && webcamManager.isActive && ts - lastAnalysisTs >= ANALYSIS_INTERVAL_MS) {
+      const landmarks = performance.now() - latestLandmarksTs <= LANDMARKS_MAX_AGE_MS ? latestLandmarks : null
+
+      if (analysisStream && analysisStream.isOpen()) {
+        // Streamed: results come back through handleAnalysisResult, no round-trip wait
+        lastAnalysisTs = ts
+        if (landmarks) {
+          analysisStream.sendLandmarks(landmarks)
+        } else {
+          const frame = await webcamManager.captureFrame()
+          if (frame && analysisStream && analysisStream.isOpen()) analysisStream.sendFrame(frame)
+        }
+      } else if (!analysisInFlight) {
+        analysisInFlight = true
+        const frameData = landmarks ? null : await webcamManager.captureFrame()
+        if (!landmarks && !frameData) {
+          analysisInFlight = false
+        } else {
           lastAnalysisTs = ts
           try {
-            const result = await analyzePose(frameData, sessionData.exerciseType)
+            const result = landmarks
+              ? await analyzeLandmarks(landmarks, sessionData.exerciseType, sessionData.sessionId, ...getFrameSize())
+              : await analyzePose(frameData, sessionData.exerciseType, sessionData.sessionId)
             handleAnalysisResult(result)
           } catch (error) {
             console.error("Analysis error:", error)
@@ -185,11 +212,45 @@ function startAnalysis() {
   startLiveAdvice()
 }
 
+function getFrameSize() {
+  const canvas = webcamManager ? webcamManager.canvas : null
+  return canvas ? [canvas.width, canvas.height] : [1, 1]
+}
+
+async function connectAnalysisStream() {
+  if (typeof WebSocket === "undefined") return
+
+  const [imageWidth, imageHeight] = getFrameSize()
+  try {
+    const stream = await openAnalysisStream({
+      exerciseType: sessionData.exerciseType,
+      sessionId: sessionData.sessionId,
+      imageWidth,
+      imageHeight,
+      onResult: (result) => {
+        if (analysisLoopActive) handleAnalysisResult(result)
+      },
+      onClose: () => {
+        analysisStream = null
+      },
+    })
+    if (analysisLoopActive) {
+      analysisStream = stream
+    } else {
+      stream.close()
+    }
+  } catch (error) {
+    console.warn("Analysis stream unavailable, using HTTP requests:", error)
+    analysisStream = null
+  }
+}
+
 function handleMediaPipeResults(results) {
   // This function is called when MediaPipe detects pose landmarks
   // The pose visualization is already handled by MediaPipe in webcam.js
-  // We can use this for additional processing if needed
-  // The actual prediction is done by sending frames to the backend API
+  // Keep the latest landmarks so the analysis loop can send them instead of a frame
+  latestLandmarks = results.poseLandmarks
+  latestLandmarksTs = performance.now()
 }
 
 function drawBackendPoseOverlay(keypoints) {
@@ -237,6 +298,10 @@ function drawBackendPoseOverlay(keypoints) {
 function stopAnalysis() {
   analysisLoopActive = false
   analysisInFlight = false
+  if (analysisStream) {
+    analysisStream.close()
+    analysisStream = null
+  }
   if (analysisInterval) {
     clearInterval(analysisInterval)
     analysisInterval = null
@@ -315,25 +380,27 @@ function handleAnalysisResult(result) {
   if (result.status === "correct") {
     indicator.className = "status-indicator correct"
     statusText.textContent = "Correct Form"
-
-    if (result.repCompleted) {
-      sessionData.correctReps++
-      document.getElementById("correct-reps").textContent = sessionData.correctReps
-    }
   } else if (result.status === "incorrect") {
     indicator.className = "status-indicator incorrect"
     statusText.textContent = "Adjust Form"
 
-    if (result.repCompleted) {
-      sessionData.incorrectReps++
-      document.getElementById("incorrect-reps").textContent = sessionData.incorrectReps
-    }
-
     if (result.feedback) {
       recordMistake(result.feedback)
     }
   }
 
+  // The backend counts reps per session; a rep is correct when most of its frames were
+  if (result.repCompleted) {
+    const repCorrect = typeof result.repCorrect === "boolean" ? result.repCorrect : result.status === "correct"
+    if (repCorrect) {
+      sessionData.correctReps++
+      document.getElementById("correct-reps").textContent = sessionData.correctReps
+    } else {
+      sessionData.incorrectReps++
+      document.getElementById("incorrect-reps").textContent = sessionData.incorrectReps
+    }
+  }
+
   renderRiskBadge(getRiskFlag())
 
   // Update confidence meter
@@ -497,6 +564,13 @@ async function endSession() {
   window.location.href = "summary.html"
 }
 
+function createSessionId() {
+  if (window.crypto && typeof window.crypto.randomUUID === "function") {
+    return window.crypto.randomUUID()
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`
+}
+
 function formatExerciseName(type) {
   const names = {
     "shoulder-abduction": "Shoulder Abduction",
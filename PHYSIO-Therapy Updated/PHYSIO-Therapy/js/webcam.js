@@ -218,11 +218,13 @@ class WebcamManager {
     this.clearOverlay()
   }
 
+  // Current frame as a JPEG Blob (resolves to null when the camera is off).
+  // Sent as raw bytes, so there is no base64 data URL to build or parse.
   captureFrame() {
-    if (!this.isActive || !this.captureCanvas || !this.captureCtx) return null
+    if (!this.isActive || !this.captureCanvas || !this.captureCtx) return Promise.resolve(null)
 
     this.captureCtx.drawImage(this.video, 0, 0, this.captureWidth, this.captureHeight)
-    return this.captureCanvas.toDataURL("image/jpeg", 0.6)
+    return new Promise((resolve) => this.captureCanvas.toBlob(resolve, "image/jpeg", 0.6))
   }
 
   drawPoseOverlay(keypoints) {
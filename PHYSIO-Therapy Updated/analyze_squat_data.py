@@ -3,8 +3,6 @@ Analyze the Squat_Data folder and convert to CSV format for training.
 """
 import numpy as np
 import pandas as pd
-import os
-from pathlib import Path
 try:
     from tqdm import tqdm
     HAS_TQDM = True
@@ -24,24 +22,10 @@ def analyze_squat_dataset():
     valid_folder = SQUAT_DATA_DIR / "Valid"
     invalid_folder = SQUAT_DATA_DIR / "Invalid"
     
-    valid_samples = []
-    invalid_samples = []
-    
-    # Count valid samples
-    if valid_folder.exists():
-        for subfolder in os.listdir(valid_folder):
-        
-            if os.path.isdir(subfolder_path):
-                npy_files = list(Path(subfolder_path).glob("*.npy"))
-                valid_samples.extend(npy_files)
-    
-    # Count invalid samples
-    if invalid_folder.exists():
-        for subfolder in os.listdir(invalid_folder):
-            subfolder_path = os.path.join(invalid_folder, subfolder)
-            if os.path.isdir(subfolder_path):
-                npy_files = list(Path(subfolder_path).glob("*.npy"))
-                invalid_samples.extend(npy_files)
+    from squat_data import discover
+    files = discover(SQUAT_DATA_DIR)
+    valid_samples = [p for p, label in zip(files.paths, files.labels) if label == 1]
+    invalid_samples = [p for p, label in zip(files.paths, files.labels) if label == 0]
     
     print(f"\n📈 Dataset Statistics:")
     print(f"   ✅ Valid samples: {len(valid_samples):,}")
@@ -85,8 +69,8 @@ def analyze_squat_dataset():
                 print(f"   ⚠️  Unexpected feature count: {sample_data.shape[0]}")
     
     # Check diversity (number of subfolders = different videos/sessions)
-    valid_subfolders = len([d for d in os.listdir(valid_folder) if os.path.isdir(os.path.join(valid_folder, d))]) if valid_folder.exists() else 0
-    invalid_subfolders = len([d for d in os.listdir(invalid_folder) if os.path.isdir(os.path.join(invalid_folder, d))]) if invalid_folder.exists() else 0
+    valid_subfolders = sum(name.startswith("Valid/") for name in files.source_names)
+    invalid_subfolders = sum(name.startswith("Invalid/") for name in files.source_names)
     
     print(f"\n🎬 Data Diversity:")
     print(f"   Valid videos/sessions: {valid_subfolders}")
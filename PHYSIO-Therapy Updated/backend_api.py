@@ -1,45 +1,101 @@
-import base64
+import asyncio
 import io
+import json
 import os
-from typing import List, Optional
+import struct
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, List, Optional
 
-import cv2
-import joblib
-import mediapipe as mp
-import numpy as np
 import sqlite3
-from datetime import datetime, date, timedelta
-from fastapi import Depends, FastAPI, Header, HTTPException
+from datetime import datetime, date
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
 
-import firebase_admin
-from firebase_admin import auth as firebase_auth
-from firebase_admin import credentials
 
-
-# ===== Model & MediaPipe Pose setup (loaded once at startup) =====
+# ===== Model & MediaPipe Pose setup (loaded lazily, see vision_stack.py) =====
+#
+# NumPy, OpenCV, MediaPipe, the model and firebase_admin are not imported at
+# module import. Functions that need the vision modules import them after
+# vision_stack has loaded.
 from pathlib import Path
 from paths import DEFAULT_MODEL_PATH
+from inference_executor import DeadlineExceeded, ExecutorSaturated
+from pose_pool import PoolExhausted
+from session_db import ConnectionPool, SessionRepository, connect, decode_cursor, encode_cursor, init_schema
+from token_cache import TokenCache, fake_verify_token
+from vision_stack import VisionStack
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from pose_pipeline import PoseAnalysis
+
+# One MediaPipe tracker per live session (see pose_pool.py)
+POSE_POOL_CONFIG = {
+    "max_sessions": int(os.getenv("PHYSIO_POSE_POOL_SIZE", "64")),
+    "idle_ttl": float(os.getenv("PHYSIO_POSE_IDLE_TTL", "120")),
+    "acquire_timeout": float(os.getenv("PHYSIO_POSE_ACQUIRE_TIMEOUT", "0.5")),
+}
+
+MODEL_PATH = DEFAULT_MODEL_PATH
+
+vision_stack = VisionStack(
+    MODEL_PATH,
+    POSE_POOL_CONFIG,
+    # Decode and pose detection run here, never on the event loop.
+    executor_config={
+        "mode": os.getenv("PHYSIO_INFERENCE_MODE", "thread"),
+        "max_workers": int(os.getenv("PHYSIO_INFERENCE_WORKERS", "0")) or None,
+        "max_queue": int(os.environ["PHYSIO_INFERENCE_QUEUE"]) if "PHYSIO_INFERENCE_QUEUE" in os.environ else None,
+        "deadline": float(os.getenv("PHYSIO_INFERENCE_DEADLINE_MS", "2000")) / 1000.0,
+    },
+    # Squat classification of concurrent requests is coalesced into batched
+    # predict_proba calls on this process's model (see micro_batcher.py).
+    batch_config={
+        "max_batch": int(os.getenv("PHYSIO_BATCH_MAX_SIZE", "32")),
+        "max_wait": float(os.getenv("PHYSIO_BATCH_MAX_WAIT_MS", "2")) / 1000.0,
+    },
+    # Frames are decoded/downscaled to at most this many pixels on their longest side
+    input_size=int(os.getenv("PHYSIO_POSE_INPUT_SIZE", "640")) or None,
+    # Later frames of a session are cropped to the previous pose's box plus this padding
+    roi_padding=float(os.getenv("PHYSIO_POSE_ROI_PADDING", "0.25")) or None,
+    # A session's last classification is reused while its landmarks barely move
+    cache_config={
+        "max_distance": float(os.getenv("PHYSIO_CLASSIFY_CACHE_DISTANCE", "0.01")),
+        "max_age": float(os.getenv("PHYSIO_CLASSIFY_CACHE_MAX_AGE_MS", "1000")) / 1000.0,
+    },
+    # Squat reps are counted per session from the knee angle (see rep_detector.py)
+    rep_config={
+        "stand_angle": float(os.getenv("PHYSIO_REP_STAND_ANGLE", "160")),
+        "bottom_angle": float(os.getenv("PHYSIO_REP_BOTTOM_ANGLE", "120")),
+    },
+)
 
-try:
-    MODEL_PATH = DEFAULT_MODEL_PATH
-    model = joblib.load(str(MODEL_PATH))
-except Exception as e:
-    raise RuntimeError(f"Failed to load model from {MODEL_PATH}: {e}")
-
-mp_pose = mp.solutions.pose
+# Load the vision stack in the background at startup (0: on the first pose request)
+VISION_WARMUP = os.getenv("PHYSIO_WARMUP", "1") != "0"
 
 
-def get_pose():
-    if not hasattr(get_pose, 'pose_instance'):
-        get_pose.pose_instance = mp_pose.Pose(static_image_mode=False)
-    return get_pose.pose_instance
+# ===== FastAPI app =====
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.get_running_loop().run_in_executor(None, get_session_repo)
+    if VISION_WARMUP:
+        vision_stack.start_warmup()
+    yield
+    vision_stack.shutdown()
+    if _session_repo is not None:
+        _session_repo.close()
 
-# ===== FastAPI app =====
 
-app = FastAPI(title="PhysioSenseAI Backend", version="1.0")
+app = FastAPI(title="PhysioSenseAI Backend", version="1.0", lifespan=lifespan)
 
 # Allow local frontend to call the API
 app.add_middleware(
@@ -48,24 +104,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
 def init_firebase_admin() -> bool:
-    if firebase_admin._apps:
-        return True
-
     service_account_file = os.getenv("FIREBASE_SERVICE_ACCOUNT_FILE")
     if not service_account_file:
         return False
 
+    import firebase_admin
+    from firebase_admin import credentials
+
+    if firebase_admin._apps:
+        return True
+
     cred = credentials.Certificate(service_account_file)
     firebase_admin.initialize_app(cred)
     return True
 
 
-def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
-    if not init_firebase_admin():
+def verify_firebase_token(token: str) -> dict:
+    from firebase_admin import auth as firebase_auth
+
+    return firebase_auth.verify_id_token(token)
+
+
+# Verified tokens are cached until their exp claim (see token_cache.py).
+# PHYSIO_FAKE_AUTH=1 accepts 'fake:<uid>' tokens for offline development only.
+FAKE_AUTH = os.getenv("PHYSIO_FAKE_AUTH") == "1"
+token_cache = TokenCache(fake_verify_token if FAKE_AUTH else verify_firebase_token)
+
+
+def verify_user_token(token: Optional[str]) -> str:
+    """Verify a Firebase ID token and return the user's uid."""
+    if not FAKE_AUTH and not init_firebase_admin():
         raise HTTPException(
             status_code=500,
             detail=(
@@ -74,15 +147,11 @@ def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
             ),
         )
 
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise HTTPException(status_code=401, detail="Missing Authorization Bearer token")
-
-    token = authorization.split(" ", 1)[1].strip()
     if not token:
         raise HTTPException(status_code=401, detail="Missing Authorization Bearer token")
 
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = token_cache.verify(token)
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
@@ -92,57 +161,54 @@ def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
     return str(uid)
 
 
-DB_PATH = Path(__file__).resolve().parent / "physiosense.db"
+def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
+    token = None
+    if authorization and authorization.lower().startswith("bearer "):
+        token = authorization.split(" ", 1)[1].strip()
+    return verify_user_token(token)
 
 
-def get_db_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+DB_PATH = Path(__file__).resolve().parent / "physiosense.db"
 
 
 def init_db() -> None:
-    conn = get_db_conn()
+    conn = connect(DB_PATH)
     try:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                userId TEXT,
-                exerciseType TEXT NOT NULL,
-                duration INTEGER NOT NULL,
-                correctReps INTEGER NOT NULL,
-                incorrectReps INTEGER NOT NULL,
-                accuracy INTEGER NOT NULL,
-                avgConfidence INTEGER NOT NULL,
-                date TEXT NOT NULL
-            );
-            """
-        )
-
-        cols = [r["name"] for r in conn.execute("PRAGMA table_info(sessions);").fetchall()]
-        if "userId" not in cols:
-            conn.execute("ALTER TABLE sessions ADD COLUMN userId TEXT;")
-
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date);")
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_sessions_exercise ON sessions(exerciseType);"
-        )
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(userId);")
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_sessions_user_date ON sessions(userId, date);"
-        )
-        conn.commit()
+        init_schema(conn)
     finally:
         conn.close()
 
 
-init_db()
+# Long-lived WAL connections shared by all session/stats endpoints (see session_db.py),
+# opened at startup or by the first request that needs them.
+_session_repo: Optional[SessionRepository] = None
+_session_repo_lock = threading.Lock()
+
+
+def get_session_repo() -> SessionRepository:
+    global _session_repo
+    if _session_repo is None:
+        with _session_repo_lock:
+            if _session_repo is None:
+                init_db()
+                _session_repo = SessionRepository(
+                    ConnectionPool(DB_PATH, size=int(os.getenv("PHYSIO_DB_POOL_SIZE", "4")))
+                )
+    return _session_repo
 
 
 class AnalyzePoseRequest(BaseModel):
     image: str  # base64 image string (data URL or raw base64)
     exercise_type: str
+    session_id: Optional[str] = None  # keeps pose tracking per live session
+
+
+class AnalyzeLandmarksRequest(BaseModel):
+    landmarks: List[List[float]]  # 33 × [x, y, z] or [x, y, z, visibility], normalized 0–1
+    exercise_type: str
+    session_id: Optional[str] = None
+    image_width: float = 1.0  # keypoints are scaled to these pixel dimensions
+    image_height: float = 1.0
 
 
 class Keypoint(BaseModel):
@@ -157,6 +223,11 @@ class AnalyzePoseResponse(BaseModel):
     repCompleted: bool
     keypoints: List[Keypoint]
     feedback: str
+    # Squat sessions with a session_id: reps counted so far, and for the rep this
+    # frame completed whether most of its frames were correct (and their share)
+    repCount: Optional[int] = None
+    repCorrect: Optional[bool] = None
+    repAccuracy: Optional[float] = None
 
 
 class SessionCreate(BaseModel):
@@ -212,74 +283,27 @@ def row_to_session(row: sqlite3.Row) -> SessionRecord:
     )
 
 
-def minutes_from_seconds(seconds: int) -> int:
-    if seconds <= 0:
-        return 0
-    return int(round(seconds / 60.0))
-
-
-def decode_base64_image(data: str) -> np.ndarray:
-    """
-    Accepts either a raw base64 string or a data URL like:
-    'data:image/jpeg;base64,/9j/4AAQSkZJRgABAQ...'
-    Returns a BGR OpenCV image array.
-    """
-    if "," in data:
-        data = data.split(",", 1)[1]
-
-    try:
-        img_bytes = base64.b64decode(data)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid base64 image data: {e}")
-
-    nparr = np.frombuffer(img_bytes, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    if img is None:
-        raise HTTPException(status_code=400, detail="Could not decode image.")
-    return img
-
-
-def run_pose_and_predict(image_bgr: np.ndarray):
-    """Run MediaPipe pose, build feature vector, and get model prediction + confidence."""
-    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-    result = get_pose().process(image_rgb)
-
-    if not result.pose_landmarks:
-        return None, None, None
+SESSION_FIELDS = (
+    "id", "exerciseType", "duration", "correctReps", "incorrectReps", "accuracy", "avgConfidence", "date",
+)
 
-    landmarks = []
-    for lm in result.pose_landmarks.landmark:
-        landmarks.extend([lm.x, lm.y, lm.z])
 
-    features = np.array(landmarks).reshape(1, -1)
+def session_row_json(row: sqlite3.Row) -> str:
+    """Serialize a sessions row straight to a SessionRecord-shaped JSON object."""
+    return json.dumps({field: row[field] for field in SESSION_FIELDS}, separators=(",", ":"))
 
-    # Prediction (labels are 0 = incorrect, 1 = correct based on your training)
-    pred_label = int(model.predict(features)[0])
 
-    confidence = 0.0
-    if hasattr(model, "predict_proba"):
-        proba = model.predict_proba(features)[0]
-        # proba is [P(label=0), P(label=1)]
-        confidence = float(proba[pred_label])
-    else:
-        confidence = 1.0  # fallback if no proba support
+def minutes_from_seconds(seconds: int) -> int:
+    if seconds <= 0:
+        return 0
+    return int(round(seconds / 60.0))
 
-    return result.pose_landmarks, pred_label, confidence
 
+def build_keypoints(landmarks: "np.ndarray", image_shape) -> List[Keypoint]:
+    """Convert a (33, 4) landmark array to pixel-space keypoints that frontend can draw."""
+    from pose_features import pixel_keypoints
 
-def build_keypoints(landmarks, image_shape) -> List[Keypoint]:
-    """Convert MediaPipe landmarks to pixel-space keypoints that frontend can draw."""
-    h, w, _ = image_shape
-    keypoints: List[Keypoint] = []
-    for lm in landmarks.landmark:
-        keypoints.append(
-            Keypoint(
-                x=lm.x * w,
-                y=lm.y * h,
-                score=float(lm.visibility),
-            )
-        )
-    return keypoints
+    return [Keypoint(x=x, y=y, score=score) for x, y, score in pixel_keypoints(landmarks, image_shape).tolist()]
 
 
 def generate_feedback(exercise_type: str, status: str) -> str:
@@ -323,20 +347,78 @@ def generate_feedback(exercise_type: str, status: str) -> str:
         return "Your posture needs some adjustment. Move slowly and focus on alignment."
 
 
-@app.post("/analyze_pose", response_model=AnalyzePoseResponse)
-async def analyze_pose_endpoint(payload: AnalyzePoseRequest):
-    """
-    Main endpoint called by the frontend:
-    - payload.image: base64-encoded JPEG from webcam
-    - payload.exercise_type: e.g. 'squats', 'shoulder-abduction', etc.
-    """
-    image_bgr = decode_base64_image(payload.image)
+async def loaded_vision_stack() -> VisionStack:
+    """The vision stack, loading it first if needed; 503 while it cannot be loaded."""
+    try:
+        return await vision_stack.ensure_ready()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Pose analysis is unavailable: {vision_stack.error or e}")
 
-    # Extract pose landmarks
-    image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-    result = get_pose().process(image_rgb)
-    
-    if not result.pose_landmarks:
+
+async def run_inference(fn, *args, affinity: Optional[str] = None):
+    """Run a pose_pipeline job on the inference executor, mapping failures to HTTP errors.
+    ``affinity`` (the session ID) keeps a session on one worker in process mode."""
+    vision = await loaded_vision_stack()
+    try:
+        return await vision.executor.run(fn, *args, affinity=affinity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (ExecutorSaturated, PoolExhausted) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+async def classify_analysis(
+    analysis: "PoseAnalysis", classify: bool, session_id: Optional[str] = None
+) -> "PoseAnalysis":
+    """Fill in label/confidence when a pose was found (from the session's cache if
+    the pose barely moved, else through the micro-batcher) and feed the session's
+    rep detector."""
+    if not (classify and analysis.detected):
+        return analysis
+    from pose_features import model_features
+
+    vision = await loaded_vision_stack()
+    cache = vision.classify_cache
+    cached = cache.lookup(session_id, analysis.landmarks) if cache is not None else None
+    if cached is not None:
+        analysis.label, analysis.confidence = cached
+    else:
+        start = time.perf_counter()
+        analysis.label, analysis.confidence = await vision.batcher.submit(model_features(analysis.landmarks))
+        if cache is not None:
+            elapsed = time.perf_counter() - start
+            cache.store(session_id, analysis.landmarks, analysis.label, analysis.confidence, elapsed)
+
+    height, width = analysis.image_shape[:2]
+    analysis.rep, analysis.rep_count = vision.reps.update(
+        session_id, analysis.landmarks, analysis.label, analysis.confidence, aspect=width / height if height else 1.0
+    )
+    return analysis
+
+
+async def analyze_image_frame(image, session_id: Optional[str], classify: bool) -> "PoseAnalysis":
+    """Decode + detect on the inference executor, then classify in a batch."""
+    from pose_pipeline import analyze_encoded_frame
+
+    analysis = await run_inference(analyze_encoded_frame, image, session_id, False, affinity=session_id)
+    return await classify_analysis(analysis, classify, session_id)
+
+
+async def analyze_landmark_frame(
+    landmarks: "np.ndarray", image_shape, classify: bool, session_id: Optional[str] = None
+) -> "PoseAnalysis":
+    """Classify landmarks detected elsewhere (e.g. in the browser)."""
+    from pose_pipeline import PoseAnalysis
+
+    analysis = PoseAnalysis(landmarks=landmarks, image_shape=image_shape)
+    return await classify_analysis(analysis, classify, session_id)
+
+
+def build_analysis_response(analysis: "PoseAnalysis", exercise_type: str) -> AnalyzePoseResponse:
+    """Shared response for /analyze_pose and /analyze_landmarks."""
+    if not analysis.detected:
         # No pose detected in frame
         return AnalyzePoseResponse(
             status="analyzing",
@@ -346,190 +428,496 @@ async def analyze_pose_endpoint(payload: AnalyzePoseRequest):
             feedback="I can't clearly see your full body. Step back a little and ensure your body is inside the camera frame.",
         )
 
-    keypoints = build_keypoints(result.pose_landmarks, image_bgr.shape)
+    keypoints = build_keypoints(analysis.landmarks, analysis.image_shape)
 
     # Check if exercise type is supported (only squats have trained model)
-    if payload.exercise_type != "squats":
+    if exercise_type != "squats":
         # For other exercises, only detect if pose is visible (no correctness check)
         return AnalyzePoseResponse(
             status="analyzing",
             confidence=0.5,  # Neutral confidence
             repCompleted=False,
             keypoints=keypoints,
-            feedback=f"Pose detection active for {payload.exercise_type}. Note: Model is only trained for squats. For accurate feedback, please use the Squats exercise.",
+            feedback=f"Pose detection active for {exercise_type}. Note: Model is only trained for squats. For accurate feedback, please use the Squats exercise.",
         )
 
-    # For squats: Use trained model for prediction
-    landmarks, pred_label, confidence = run_pose_and_predict(image_bgr)
-    
-    if landmarks is None:
-        return AnalyzePoseResponse(
-            status="analyzing",
-            confidence=0.0,
-            repCompleted=False,
-            keypoints=keypoints,
-            feedback="I can't clearly see your full body. Step back a little and ensure your body is inside the camera frame.",
-        )
+    # For squats: prediction from the same landmarks used for the keypoints
+    pred_label, confidence = analysis.label, analysis.confidence
 
     status = "correct" if pred_label == 1 else "incorrect"
-    feedback = generate_feedback(payload.exercise_type, status)
+    feedback = generate_feedback(exercise_type, status)
 
-    # For now, we are not doing rep counting on the backend.
-    # live.js already handles correct/incorrect + feedback + confidence display.
+    rep = analysis.rep
     return AnalyzePoseResponse(
         status=status,
         confidence=confidence,
-        repCompleted=False,
+        repCompleted=rep is not None,
         keypoints=keypoints,
         feedback=feedback,
+        repCount=analysis.rep_count,
+        repCorrect=rep.correct if rep is not None else None,
+        repAccuracy=rep.accuracy if rep is not None else None,
     )
 
 
+# Bodies /analyze_pose accepts as raw image bytes (besides JSON and multipart)
+RAW_IMAGE_TYPES = ("image/jpeg", "image/png", "image/webp", "application/octet-stream")
+
+ANALYZE_POSE_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"$ref": "#/components/schemas/AnalyzePoseRequest"}},
+            **{media_type: {"schema": {"type": "string", "format": "binary"}} for media_type in RAW_IMAGE_TYPES},
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["image"],
+                    "properties": {
+                        "image": {"type": "string", "format": "binary"},
+                        "exercise_type": {"type": "string"},
+                        "session_id": {"type": "string"},
+                    },
+                }
+            },
+        },
+    }
+}
+
+
+async def read_analyze_pose_request(request: Request, exercise_type: Optional[str], session_id: Optional[str]):
+    """(image, exercise_type, session_id) from a JSON, raw image or multipart /analyze_pose body."""
+    content_type = request.headers.get("content-type", "application/json").split(";", 1)[0].strip().lower()
+
+    if content_type == "application/json":
+        try:
+            body = await request.json()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+        try:
+            # Also rejects bodies that are valid JSON but not an object ([1, 2], "x", 5)
+            payload = AnalyzePoseRequest.model_validate(body)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+        return payload.image, payload.exercise_type, payload.session_id
+
+    if content_type in RAW_IMAGE_TYPES:
+        image = await request.body()  # handed to cv2.imdecode without another copy
+    elif content_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("image")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=422, detail="Multipart body needs an 'image' file field.")
+        image = await upload.read()
+        exercise_type = exercise_type or form.get("exercise_type")
+        session_id = session_id or form.get("session_id")
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported Content-Type {content_type!r}; send JSON, multipart/form-data or one of {', '.join(RAW_IMAGE_TYPES)}.",
+        )
+
+    if not image:
+        raise HTTPException(status_code=400, detail="Empty image body.")
+    if not exercise_type:
+        raise HTTPException(
+            status_code=422, detail="exercise_type is required (query parameter, X-Exercise-Type header or form field)."
+        )
+    return image, exercise_type, session_id
+
+
+@app.post("/analyze_pose", response_model=AnalyzePoseResponse, openapi_extra=ANALYZE_POSE_OPENAPI)
+async def analyze_pose_endpoint(
+    request: Request,
+    exercise_type: Optional[str] = None,
+    session_id: Optional[str] = None,
+    x_exercise_type: Optional[str] = Header(None),
+    x_session_id: Optional[str] = Header(None),
+):
+    """
+    Main endpoint called by the frontend. The frame is either:
+    - a raw image body (image/jpeg, image/png, image/webp or application/octet-stream),
+      with exercise_type / session_id as query parameters or X-Exercise-Type /
+      X-Session-Id headers;
+    - multipart/form-data with an 'image' file and optional exercise_type /
+      session_id fields;
+    - JSON {"image": base64 or data URL, "exercise_type", "session_id"}.
+    exercise_type is e.g. 'squats', 'shoulder-abduction'; session_id selects the pose tracker.
+    """
+    image, exercise_type, session_id = await read_analyze_pose_request(
+        request, exercise_type or x_exercise_type, session_id or x_session_id
+    )
+
+    # Pose detection runs once; only squats go on to classification.
+    is_squats = exercise_type == "squats"
+    analysis = await analyze_image_frame(image, session_id, is_squats)
+    return build_analysis_response(analysis, exercise_type)
+
+
+@app.post("/analyze_landmarks", response_model=AnalyzePoseResponse)
+async def analyze_landmarks_endpoint(payload: AnalyzeLandmarksRequest):
+    """
+    Classify landmarks already detected in the browser (no image decode or pose
+    detection on the server). Returns the same shape as /analyze_pose.
+    """
+    await loaded_vision_stack()
+    from pose_pipeline import landmarks_from_rows
+
+    try:
+        landmarks = landmarks_from_rows(payload.landmarks)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    image_shape = (payload.image_height, payload.image_width)
+    is_squats = payload.exercise_type == "squats"
+    analysis = await analyze_landmark_frame(landmarks, image_shape, is_squats, payload.session_id)
+    return build_analysis_response(analysis, payload.exercise_type)
+
+
+@app.post("/analyze_landmarks/binary", response_model=AnalyzePoseResponse)
+async def analyze_landmarks_binary_endpoint(
+    request: Request,
+    exercise_type: str,
+    session_id: Optional[str] = None,
+    image_width: float = 1.0,
+    image_height: float = 1.0,
+):
+    """
+    Compact variant of /analyze_landmarks. The body is application/octet-stream
+    holding 33×3 (x, y, z) or 33×4 (plus visibility) little-endian float32 values
+    (396 or 528 bytes). Other fields are query parameters.
+    """
+    await loaded_vision_stack()
+    from pose_pipeline import landmarks_from_bytes
+
+    try:
+        landmarks = landmarks_from_bytes(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    image_shape = (image_height, image_width)
+    is_squats = exercise_type == "squats"
+    analysis = await analyze_landmark_frame(landmarks, image_shape, is_squats, session_id)
+    return build_analysis_response(analysis, exercise_type)
+
+
+# ===== WebSocket streaming (/ws/analyze) =====
+#
+# Auth happens once at connect (?token=<Firebase ID token>). Session defaults come
+# from the query string (exercise_type, session_id, image_width, image_height) and
+# can be changed by any JSON message. Frames are either:
+#   - binary: STREAM_HEADER (uint32 seq, uint8 kind) + JPEG bytes or float32 landmarks
+#   - JSON text: {"seq", "image"} or {"seq", "landmarks"}
+# Each result is the AnalyzePoseResponse JSON plus "seq" and "dropped". Only the
+# newest unprocessed frame is kept, so a client that outpaces the server gets its
+# stale frames dropped instead of queued.
+
+STREAM_HEADER = struct.Struct("<IB")
+STREAM_KIND_IMAGE = 0
+STREAM_KIND_LANDMARKS = 1
+STREAM_CONFIG_KEYS = ("exercise_type", "session_id", "image_width", "image_height")
+
+
+class _LatestFrame:
+    """Single-slot mailbox: put() overwrites an unprocessed frame and counts it as dropped."""
+
+    def __init__(self):
+        self._frame = None
+        self._ready = asyncio.Event()
+        self._dropped = 0
+
+    def put(self, frame) -> None:
+        if self._frame is not None:
+            self._dropped += 1
+        self._frame = frame
+        self._ready.set()
+
+    async def get(self):
+        await self._ready.wait()
+        self._ready.clear()
+        frame, self._frame = self._frame, None
+        dropped, self._dropped = self._dropped, 0
+        return frame, dropped
+
+
+def stream_config_updates(msg: dict) -> dict:
+    """The STREAM_CONFIG_KEYS present in ``msg``, type-checked; ValueError on a bad value."""
+    updates = {}
+    for key in STREAM_CONFIG_KEYS:
+        if key not in msg:
+            continue
+        value = msg[key]
+        if key in ("image_width", "image_height"):
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"'{key}' must be a positive number")
+            value = float(value)
+        elif key == "exercise_type":
+            if not isinstance(value, str) or not value:
+                raise ValueError("'exercise_type' must be a non-empty string")
+        elif value is not None and not isinstance(value, str):
+            raise ValueError(f"'{key}' must be a string or null")
+        updates[key] = value
+    return updates
+
+
+def parse_stream_message(message: dict, config: dict):
+    """Turn a WebSocket message into (seq, job, args, exercise_type), or None for config-only messages."""
+    from pose_pipeline import landmarks_from_bytes, landmarks_from_rows  # loaded before the socket is accepted
+
+    if message.get("bytes") is not None:
+        data = message["bytes"]
+        if len(data) < STREAM_HEADER.size:
+            raise ValueError("Binary frame is shorter than its header")
+        seq, kind = STREAM_HEADER.unpack_from(data)
+        payload = data[STREAM_HEADER.size:]
+        if kind == STREAM_KIND_IMAGE:
+            image, landmarks = payload, None
+        elif kind == STREAM_KIND_LANDMARKS:
+            image, landmarks = None, landmarks_from_bytes(payload)
+        else:
+            raise ValueError(f"Unknown frame kind {kind}")
+    else:
+        msg = json.loads(message.get("text") or "{}")
+        if not isinstance(msg, dict):
+            raise ValueError("Text frames must be JSON objects")
+        updates = stream_config_updates(msg)
+        seq = int(msg.get("seq", 0))
+        image = msg.get("image")
+        if image is not None and not isinstance(image, str):
+            raise ValueError("'image' must be a base64 string or data URL")
+        landmarks = landmarks_from_rows(msg["landmarks"]) if "landmarks" in msg else None
+        # Only a message that parsed completely changes the session config
+        config.update(updates)
+        if image is None and landmarks is None:
+            return None
+
+    exercise_type = config["exercise_type"]
+    is_squats = exercise_type == "squats"
+    if landmarks is not None:
+        image_shape = (float(config["image_height"]), float(config["image_width"]))
+        return seq, analyze_landmark_frame, (landmarks, image_shape, is_squats, config["session_id"]), exercise_type
+    return seq, analyze_image_frame, (image, config["session_id"], is_squats), exercise_type
+
+
+async def _stream_results(websocket: WebSocket, mailbox: _LatestFrame) -> None:
+    while True:
+        (seq, job, args, exercise_type), dropped = await mailbox.get()
+        try:
+            analysis = await job(*args)
+            body = jsonable_encoder(build_analysis_response(analysis, exercise_type))
+        except HTTPException as e:
+            body = {"error": e.detail, "code": e.status_code}
+        except Exception as e:
+            # One bad frame must not end the sender: report it and keep streaming
+            body = {"error": f"{type(e).__name__}: {e}", "code": 500}
+        body.update(seq=seq, dropped=dropped)
+        await websocket.send_json(body)
+
+
+@app.websocket("/ws/analyze")
+async def analyze_stream(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    exercise_type: str = "squats",
+    session_id: Optional[str] = None,
+    image_width: float = 1.0,
+    image_height: float = 1.0,
+):
+    try:
+        # A cache miss is a blocking Firebase call: keep it off the event loop
+        await run_in_threadpool(verify_user_token, token)
+    except HTTPException as e:
+        await websocket.close(code=4401 if e.status_code == 401 else 1011, reason=str(e.detail))
+        return
+    try:
+        await loaded_vision_stack()
+    except HTTPException as e:
+        await websocket.close(code=1013, reason=str(e.detail))  # try again later
+        return
+
+    await websocket.accept()
+    config = {
+        "exercise_type": exercise_type,
+        "session_id": session_id,
+        "image_width": image_width,
+        "image_height": image_height,
+    }
+    mailbox = _LatestFrame()
+    sender = asyncio.create_task(_stream_results(websocket, mailbox))
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            try:
+                frame = parse_stream_message(message, config)
+            except (ValueError, KeyError, TypeError) as e:
+                await websocket.send_json({"error": str(e), "code": 400})
+                continue
+            if frame is not None:
+                mailbox.put(frame)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+
+
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    """Liveness plus readiness: "ready" turns true once the vision stack has loaded."""
+    return {"status": "ok", "ready": vision_stack.ready, "vision": vision_stack.status()}
+
+
+@app.get("/health/ready")
+async def readiness_check(response: Response):
+    """503 until pose analysis can be served (for load balancer readiness probes)."""
+    if not vision_stack.ready:
+        response.status_code = 503
+    return {"ready": vision_stack.ready, "vision": vision_stack.status()}
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        **vision_stack.stats(),
+        "token_cache": token_cache.stats(),
+    }
 
 
 @app.post("/sessions")
-async def create_session(payload: SessionCreate, user_id: str = Depends(get_current_user_id)):
+async def create_session(
+    payload: SessionCreate,
+    user_id: str = Depends(get_current_user_id),
+    session_repo: SessionRepository = Depends(get_session_repo),
+):
     parsed_date = parse_iso_datetime(payload.date)
 
-    conn = get_db_conn()
-    try:
-        cur = conn.execute(
-            """
-            INSERT INTO sessions (userId, exerciseType, duration, correctReps, incorrectReps, accuracy, avgConfidence, date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                user_id,
-                payload.exerciseType,
-                int(payload.duration),
-                int(payload.correctReps),
-                int(payload.incorrectReps),
-                int(payload.accuracy),
-                int(payload.avgConfidence),
-                parsed_date.isoformat(),
-            ),
-        )
-        conn.commit()
-        return {"id": int(cur.lastrowid)}
-    finally:
-        conn.close()
+    session_id = await session_repo.run(
+        session_repo.insert_session,
+        user_id,
+        (
+            payload.exerciseType,
+            int(payload.duration),
+            int(payload.correctReps),
+            int(payload.incorrectReps),
+            int(payload.accuracy),
+            int(payload.avgConfidence),
+            parsed_date.isoformat(),
+        ),
+    )
+    return {"id": session_id}
 
 
 @app.get("/sessions/recent", response_model=List[SessionRecord])
-async def get_recent_sessions(limit: int = 5, user_id: str = Depends(get_current_user_id)):
+async def get_recent_sessions(
+    limit: int = 5,
+    user_id: str = Depends(get_current_user_id),
+    session_repo: SessionRepository = Depends(get_session_repo),
+):
     limit = max(1, min(int(limit), 50))
-    conn = get_db_conn()
-    try:
-        rows = conn.execute(
-            "SELECT * FROM sessions WHERE userId = ? ORDER BY date DESC LIMIT ?;",
-            (user_id, limit),
-        ).fetchall()
-        return [row_to_session(r) for r in rows]
-    finally:
-        conn.close()
+    rows = await session_repo.run(session_repo.recent_sessions, user_id, limit)
+    return [row_to_session(r) for r in rows]
 
 
-@app.get("/sessions/history", response_model=List[SessionRecord])
-async def get_sessions_history(exercise: Optional[str] = None, user_id: str = Depends(get_current_user_id)):
-    conn = get_db_conn()
-    try:
-        if exercise:
-            rows = conn.execute(
-                "SELECT * FROM sessions WHERE userId = ? AND exerciseType = ? ORDER BY date DESC;",
-                (user_id, exercise),
-            ).fetchall()
-        else:
-            rows = conn.execute(
-                "SELECT * FROM sessions WHERE userId = ? ORDER BY date DESC;",
-                (user_id,),
-            ).fetchall()
-        return [row_to_session(r) for r in rows]
-    finally:
-        conn.close()
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
 
 
-@app.get("/stats/aggregate", response_model=AggregateStatsResponse)
-async def get_aggregate_stats(user_id: str = Depends(get_current_user_id)):
-    conn = get_db_conn()
-    try:
-        row = conn.execute(
-            """
-            SELECT
-                COUNT(*) AS totalSessions,
-                COALESCE(SUM(correctReps + incorrectReps), 0) AS totalReps,
-                COALESCE(AVG(accuracy), 0) AS avgAccuracy,
-                COALESCE(SUM(duration), 0) AS totalDuration
-            FROM sessions
-            WHERE userId = ?;
-            """
-            ,
-            (user_id,),
-        ).fetchone()
-
-        total_sessions = int(row["totalSessions"]) if row else 0
-        total_reps = int(row["totalReps"]) if row else 0
-        avg_accuracy = int(round(float(row["avgAccuracy"]))) if row else 0
-        total_time = minutes_from_seconds(int(row["totalDuration"]) if row else 0)
-
-        return AggregateStatsResponse(
-            totalSessions=total_sessions,
-            totalReps=total_reps,
-            avgAccuracy=avg_accuracy,
-            totalTime=total_time,
+async def stream_history_ndjson(session_repo: SessionRepository, user_id: str, exercise: Optional[str], after):
+    """Yield the user's history as NDJSON, one keyset page of rows at a time."""
+    while True:
+        rows = await session_repo.run(
+            session_repo.session_history, user_id, exercise, HISTORY_MAX_PAGE_SIZE, after
         )
-    finally:
-        conn.close()
+        if rows:
+            yield "".join(session_row_json(r) + "\n" for r in rows)
+        if len(rows) < HISTORY_MAX_PAGE_SIZE:
+            return
+        after = (rows[-1]["date"], rows[-1]["id"])
 
 
-@app.get("/dashboard/stats", response_model=DashboardStatsResponse)
-async def get_dashboard_stats(user_id: str = Depends(get_current_user_id)):
-    conn = get_db_conn()
+@app.get("/sessions/history", response_model=List[SessionRecord])
+async def get_sessions_history(
+    response: Response,
+    exercise: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    output_format: str = Query("json", alias="format"),
+    user_id: str = Depends(get_current_user_id),
+    session_repo: SessionRepository = Depends(get_session_repo),
+):
+    """
+    One page of sessions, newest first. Pass the X-Next-Cursor response header
+    back as ?cursor= for the next page; the header is absent on the last page.
+    format=ndjson streams every session from the cursor onwards instead, one
+    JSON object per line.
+    """
+    if output_format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'.")
     try:
-        row = conn.execute(
-            """
-            SELECT
-                COUNT(*) AS totalSessions,
-                COALESCE(AVG(accuracy), 0) AS avgAccuracy,
-                COALESCE(SUM(duration), 0) AS totalDuration
-            FROM sessions
-            WHERE userId = ?;
-            """
-            ,
-            (user_id,),
-        ).fetchone()
-
-        total_sessions = int(row["totalSessions"]) if row else 0
-        avg_accuracy = int(round(float(row["avgAccuracy"]))) if row else 0
-        total_time = minutes_from_seconds(int(row["totalDuration"]) if row else 0)
-
-        days_rows = conn.execute(
-            "SELECT date FROM sessions WHERE userId = ? ORDER BY date DESC;",
-            (user_id,),
-        ).fetchall()
-        days = set()
-        for r in days_rows:
-            try:
-                days.add(parse_iso_datetime(r["date"]).date())
-            except Exception:
-                continue
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        streak = 0
-        current = date.today()
-        while current in days:
-            streak += 1
-            current = current - timedelta(days=1)
-
-        return DashboardStatsResponse(
-            totalSessions=total_sessions,
-            avgAccuracy=avg_accuracy,
-            totalTime=total_time,
-            streak=streak,
+    if output_format == "ndjson":
+        return StreamingResponse(
+            stream_history_ndjson(session_repo, user_id, exercise, after), media_type="application/x-ndjson"
         )
-    finally:
-        conn.close()
+
+    # One extra row tells us whether another page exists.
+    rows = await session_repo.run(session_repo.session_history, user_id, exercise, limit + 1, after)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1])
+    return [row_to_session(r) for r in rows]
+
+
+@app.get("/stats/aggregate", response_model=AggregateStatsResponse)
+async def get_aggregate_stats(
+    user_id: str = Depends(get_current_user_id), session_repo: SessionRepository = Depends(get_session_repo)
+):
+    row = await session_repo.run(session_repo.aggregate_stats, user_id)
+
+    total_sessions = int(row["totalSessions"]) if row else 0
+    total_reps = int(row["totalReps"]) if row else 0
+    avg_accuracy = int(round(float(row["avgAccuracy"]))) if row else 0
+    total_time = minutes_from_seconds(int(row["totalDuration"]) if row else 0)
+
+    return AggregateStatsResponse(
+        totalSessions=total_sessions,
+        totalReps=total_reps,
+        avgAccuracy=avg_accuracy,
+        totalTime=total_time,
+    )
+
+
+@app.get("/dashboard/stats", response_model=DashboardStatsResponse)
+async def get_dashboard_stats(
+    user_id: str = Depends(get_current_user_id), session_repo: SessionRepository = Depends(get_session_repo)
+):
+    row = await session_repo.run(session_repo.aggregate_stats, user_id)
+
+    total_sessions = int(row["totalSessions"]) if row else 0
+    avg_accuracy = int(round(float(row["avgAccuracy"]))) if row else 0
+    total_time = minutes_from_seconds(int(row["totalDuration"]) if row else 0)
+
+    # Streak is stored on the rollup row as the run ending on lastActiveDay.
+    streak = 0
+    if row and row["lastActiveDay"]:
+        today = date.today()
+        last_active = date.fromisoformat(row["lastActiveDay"])
+        if last_active == today:
+            streak = int(row["currentStreak"])
+        elif last_active > today:
+            # Future-dated sessions exist; count back from today instead.
+            streak = await session_repo.run(session_repo.streak_ending, user_id, today)
+
+    return DashboardStatsResponse(
+        totalSessions=total_sessions,
+        avgAccuracy=avg_accuracy,
+        totalTime=total_time,
+        streak=streak,
+    )
 
 
 @app.post("/advice", response_model=AdviceResponse)
@@ -0,0 +1,132 @@
+"""
+Benchmark frame decoding before pose detection: full-resolution decode vs
+pose_pipeline.decode_frame (reduced JPEG decode + one resize to --input-size).
+
+Frames are re-encoded at 480p, 720p and 1080p from Dataset/squat_correct.mp4
+(or --video); without a video a synthetic frame is used. ``--pose`` also
+times MediaPipe on both inputs and reports how far the downscaled frame's
+keypoints land from the full-resolution ones, in original-frame pixels.
+
+Usage:
+    python bench_decode.py
+    python bench_decode.py --input-size 480 --pose
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from paths import DATASET_DIR
+from pose_pipeline import DEFAULT_INPUT_SIZE, decode_frame, decode_image
+
+RESOLUTIONS = {"480p": (854, 480), "720p": (1280, 720), "1080p": (1920, 1080)}
+
+
+def source_frames(video_path, count):
+    """BGR frames from the video, or one synthetic frame."""
+    cap = cv2.VideoCapture(str(video_path))
+    frames = []
+    while cap.isOpened() and len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if frames:
+        return frames
+
+    frame = np.zeros((1080, 1920, 3), np.uint8)
+    frame[:] = np.linspace(40, 200, 1920, dtype=np.uint8)[None, :, None]
+    cv2.circle(frame, (960, 300), 90, (60, 120, 220), -1)
+    cv2.rectangle(frame, (880, 400), (1040, 800), (200, 90, 40), -1)
+    return [frame]
+
+
+def encode_at(frames, size, quality=80):
+    return [
+        cv2.imencode(".jpg", cv2.resize(f, size, interpolation=cv2.INTER_AREA), [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+        for f in frames
+    ]
+
+
+def legacy_decode(jpeg_bytes):
+    """Pre-downscaling path: full decode to BGR, then a full-size color conversion."""
+    return cv2.cvtColor(decode_image(jpeg_bytes), cv2.COLOR_BGR2RGB)
+
+
+def time_per_frame(fn, frames, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            fn(frame)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(frames))
+
+
+def keypoints_px(pose, image_rgb, original_shape):
+    result = pose.process(image_rgb)
+    if not result.pose_landmarks:
+        return None
+    height, width = original_shape
+    return np.array([(lm.x * width, lm.y * height) for lm in result.pose_landmarks.landmark])
+
+
+def compare_pose(jpegs, input_size):
+    import mediapipe as mp
+
+    times = {"full": 0.0, "downscaled": 0.0}
+    deviations = []
+    # static_image_mode: every frame detected from scratch, so both inputs are comparable
+    with mp.solutions.pose.Pose(static_image_mode=True, model_complexity=1) as pose:
+        for jpeg in jpegs:
+            full = legacy_decode(jpeg)
+            small, original_shape = decode_frame(jpeg, input_size)
+            start = time.perf_counter()
+            full_kp = keypoints_px(pose, full, original_shape)
+            mid = time.perf_counter()
+            small_kp = keypoints_px(pose, small, original_shape)
+            times["full"] += mid - start
+            times["downscaled"] += time.perf_counter() - mid
+            if full_kp is not None and small_kp is not None:
+                deviations.append(np.linalg.norm(full_kp - small_kp, axis=1).mean())
+    n = len(jpegs)
+    return times["full"] * 1000 / n, times["downscaled"] * 1000 / n, deviations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", default=str(DATASET_DIR / "squat_correct.mp4"))
+    parser.add_argument("--frames", type=int, default=30, help="Frames sampled from the video")
+    parser.add_argument("--input-size", type=int, default=DEFAULT_INPUT_SIZE, help="Longest side given to MediaPipe")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pose", action="store_true", help="Also time MediaPipe and compare keypoints")
+    args = parser.parse_args()
+
+    frames = source_frames(args.video, args.frames)
+    source = args.video if len(frames) > 1 or Path(args.video).exists() else "synthetic frame"
+
+    print("=" * 70)
+    print(f"⏱️  FRAME DECODE BENCHMARK (input size {args.input_size}, {len(frames)} frame(s) from {source})")
+    print("=" * 70)
+    for name, size in RESOLUTIONS.items():
+        jpegs = encode_at(frames, size)
+        legacy_ms = time_per_frame(legacy_decode, jpegs, args.repeat)
+        fast_ms = time_per_frame(lambda jpeg: decode_frame(jpeg, args.input_size), jpegs, args.repeat)
+        shape = decode_frame(jpegs[0], args.input_size)[0].shape
+
+        print(f"\n📦 {name} ({size[0]}×{size[1]}, {sum(map(len, jpegs)) // len(jpegs) // 1024} KB JPEG)")
+        print(f"   Full decode + cvtColor:  {legacy_ms:7.2f} ms/frame")
+        print(f"   decode_frame:            {fast_ms:7.2f} ms/frame ({legacy_ms / fast_ms:.1f}×) → {shape[1]}×{shape[0]}")
+
+        if args.pose:
+            full_ms, small_ms, deviations = compare_pose(jpegs, args.input_size)
+            print(f"   MediaPipe full / small:  {full_ms:7.2f} / {small_ms:.2f} ms/frame")
+            if deviations:
+                print(f"   Keypoint deviation:      {np.mean(deviations):7.2f} px mean ({len(deviations)} frames)")
+            else:
+                print("   Keypoint deviation:      no pose detected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark squat model inference: sklearn predict_proba vs the flattened
+NumPy forest (forest_engine.py), for batch sizes 1 to 4096.
+
+Exports the forest of Models/squat_model.pkl to a temporary directory, runs
+both on the same random float32 rows and checks that the probabilities are
+bit-identical.
+
+Usage:
+    python bench_forest_engine.py
+    python bench_forest_engine.py --max-batch 1024 --seconds 0.5
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from forest_engine import FlatForest, export_forest
+from paths import DEFAULT_MODEL_PATH
+from squat_classifier import SquatClassifier
+
+
+def measure(fn, min_seconds):
+    """Average seconds per call, repeating until at least min_seconds elapsed."""
+    fn()  # warm up
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=str(DEFAULT_MODEL_PATH))
+    parser.add_argument("--max-batch", type=int, default=4096)
+    parser.add_argument("--seconds", type=float, default=1.0, help="Minimum time per measurement")
+    args = parser.parse_args()
+
+    if not Path(args.model).exists():
+        print(f"❌ Model not found: {args.model}. Run train_model.py first.")
+        return
+
+    estimator = SquatClassifier.load(args.model, use_engine=False).estimator
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = FlatForest.load(export_forest(estimator, Path(tmp) / "forest"))
+
+    meta = engine.meta
+    rng = np.random.default_rng(0)
+    sizes = [1]
+    while sizes[-1] * 4 <= args.max_batch:
+        sizes.append(sizes[-1] * 4)
+    if sizes[-1] != args.max_batch:
+        sizes.append(args.max_batch)
+
+    print("=" * 70)
+    print("⏱️  FOREST INFERENCE BENCHMARK")
+    print("=" * 70)
+    print(f"🌲 {meta['n_trees']} trees, {meta['n_nodes']} nodes, max depth {meta['max_depth']}")
+    print(f"\n{'batch':>6} {'sklearn ms':>12} {'numpy ms':>10} {'µs/row':>9} {'speedup':>8}  exact")
+
+    all_exact = True
+    for size in sizes:
+        X = rng.random((size, meta["n_features"]), dtype=np.float32)
+        exact = np.array_equal(estimator.predict_proba(X), engine.predict_proba(X))
+        all_exact &= exact
+        before = measure(lambda: estimator.predict_proba(X), args.seconds)
+        after = measure(lambda: engine.predict_proba(X), args.seconds)
+        print(
+            f"{size:>6} {before * 1e3:>12.3f} {after * 1e3:>10.3f} {after * 1e6 / size:>9.2f} "
+            f"{before / after:>7.2f}×  {'✅' if exact else '❌'}"
+        )
+
+    print(f"\n{'✅' if all_exact else '❌'} Probabilities identical to sklearn: {all_exact}")
+
+
+if __name__ == "__main__":
+    main()
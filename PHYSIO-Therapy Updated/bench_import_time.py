@@ -0,0 +1,110 @@
+"""
+Import-time regression benchmark for backend_api.
+
+Imports the app module in fresh interpreters and reports the median time,
+split into the web framework it builds on (FastAPI/pydantic/starlette,
+imported first) and the app's own share. Also fails if importing the app
+pulls in any of the heavy modules that should only load with the vision
+stack (see vision_stack.py), or if the app's share exceeds ``--max-ms``.
+
+Usage:
+    python bench_import_time.py
+    python bench_import_time.py --runs 10 --max-ms 150
+    python bench_import_time.py --top 15            # slowest imports (python -X importtime)
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent
+FRAMEWORK_MODULES = ("fastapi", "fastapi.middleware.cors", "fastapi.responses", "pydantic")
+HEAVY_MODULES = ("numpy", "cv2", "mediapipe", "sklearn", "joblib", "firebase_admin")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {framework!r}:
+    __import__(name)
+framework = time.perf_counter()
+import backend_api
+done = time.perf_counter()
+print(json.dumps({{
+    "framework_ms": (framework - start) * 1000,
+    "app_ms": (done - framework) * 1000,
+    "heavy": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def probe_once():
+    code = PROBE.format(framework=FRAMEWORK_MODULES, heavy=HEAVY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_times(code):
+    """{module: cumulative µs} from python -X importtime running ``code``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        parts = line[len("import time:"):].split("|") if line.startswith("import time:") else []
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            times[parts[2].strip()] = int(parts[1].strip())
+    return times
+
+
+def slowest_imports(top):
+    """(cumulative µs, module) of the slowest imports backend_api adds on top of the framework."""
+    framework = "import " + ", ".join(FRAMEWORK_MODULES)
+    already = import_times(framework)
+    added = import_times(framework + "; import backend_api")
+    rows = [(us, name) for name, us in added.items() if name not in already]
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=200.0, help="Fail if the app's own import exceeds this")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest imports")
+    args = parser.parse_args()
+
+    probe_once()  # warm the page cache and __pycache__
+    results = [probe_once() for _ in range(args.runs)]
+    framework_ms = statistics.median(r["framework_ms"] for r in results)
+    app_ms = statistics.median(r["app_ms"] for r in results)
+    heavy = sorted({name for r in results for name in r["heavy"]})
+
+    print("=" * 70)
+    print(f"⏱️  BACKEND IMPORT TIME ({args.runs} fresh interpreters, median)")
+    print("=" * 70)
+    print(f"   Framework (FastAPI, pydantic): {framework_ms:8.1f} ms")
+    print(f"   backend_api itself:            {app_ms:8.1f} ms")
+    print(f"   Total:                         {framework_ms + app_ms:8.1f} ms")
+
+    if args.top:
+        print(f"\n🐢 Slowest imports after the framework:")
+        for cumulative, name in slowest_imports(args.top):
+            print(f"   {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if heavy:
+        print(f"\n❌ Heavy modules imported at import time: {', '.join(heavy)}")
+        failed = True
+    if app_ms > args.max_ms:
+        print(f"\n❌ backend_api import took {app_ms:.1f} ms (limit {args.max_ms:.0f} ms)")
+        failed = True
+    if not failed:
+        print(f"\n✅ No heavy modules imported; within the {args.max_ms:.0f} ms limit")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
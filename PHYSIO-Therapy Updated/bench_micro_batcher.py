@@ -0,0 +1,73 @@
+"""
+Benchmark squat classification throughput with and without request coalescing.
+
+Simulates ``--clients`` concurrent callers, each classifying feature rows
+back to back through micro_batcher.MicroBatcher, once with batching disabled
+(max_batch=1) and once per ``--max-batch`` value. Reports rows/sec, latency
+percentiles and the batch size histogram.
+
+Usage:
+    python bench_micro_batcher.py
+    python bench_micro_batcher.py --clients 64 --max-batch 16 64 --max-wait-ms 1
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from micro_batcher import MicroBatcher
+from paths import DEFAULT_MODEL_PATH
+from squat_classifier import SquatClassifier
+
+
+async def run_clients(batcher, rows, clients, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def client(index):
+        i = index
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await batcher.submit(rows[i % len(rows)])
+            latencies.append(time.perf_counter() - start)
+            i += clients
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return len(latencies) / (time.perf_counter() - start), np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent callers")
+    parser.add_argument("--max-batch", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each run")
+    args = parser.parse_args()
+
+    model = SquatClassifier.load(DEFAULT_MODEL_PATH)
+    rows = np.random.default_rng(0).random((1024, model.n_features), dtype=np.float32)
+
+    print("=" * 70)
+    print(f"⏱️  MICRO-BATCHING BENCHMARK ({args.clients} clients, {args.seconds:.0f}s per run)")
+    print("=" * 70)
+    baseline = None
+    for max_batch in [1] + args.max_batch:
+        batcher = MicroBatcher(model.predict_batch, max_batch=max_batch, max_wait=args.max_wait_ms / 1000)
+        throughput, latencies = asyncio.run(run_clients(batcher, rows, args.clients, args.seconds))
+        stats = batcher.stats()
+        batcher.shutdown()
+
+        baseline = baseline or throughput
+        print(f"\n📦 max_batch={max_batch}")
+        print(f"   Throughput:  {throughput:9.1f} rows/s ({throughput / baseline:.2f}×)")
+        print(
+            f"   Latency:     p50 {np.percentile(latencies, 50):.2f} ms, "
+            f"p99 {np.percentile(latencies, 99):.2f} ms"
+        )
+        print(f"   Mean batch:  {stats['mean_batch_size']}  {stats['batch_size_histogram']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark squat model startup and memory across worker processes.
+
+Starts ``--workers`` spawned processes (like uvicorn workers or the process
+inference pool) that each load Models/squat_model.pkl and classify one row,
+once per loading mode:
+
+    pickle   joblib.load of the full sklearn forest (every worker owns a copy)
+    mmap     memory-mapped flattened forest (Models/squat_model_forest/,
+             written by train_model.py); pages are shared between workers
+
+Reports load time, first prediction time and, while all workers are alive,
+each worker's RSS and PSS (proportional set size: shared pages split between
+the processes mapping them) from /proc/self/smaps_rollup. ``--cold`` asks the
+kernel to drop the model files from the page cache before each mode.
+
+Load time includes whatever the mode imports: unpickling the forest pulls
+in sklearn, the mmap path only needs NumPy.
+
+Usage:
+    python bench_model_startup.py
+    python bench_model_startup.py --workers 8 --cold
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+from paths import DEFAULT_MODEL_PATH
+
+MODES = ("pickle", "mmap")
+
+
+def memory_kb():
+    """(rss, pss) of this process in kB; pss is None where smaps_rollup is unavailable."""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["Rss"].split()[0]), int(fields["Pss"].split()[0])
+    except (OSError, KeyError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, None
+
+
+def drop_from_page_cache(paths):
+    """Evict files from the page cache (best effort, no root needed)."""
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def worker(mode, model_path, barrier, results):
+    import numpy as np
+
+    from squat_classifier import SquatClassifier
+
+    before = memory_kb()
+    start = time.perf_counter()
+    model = SquatClassifier.load(model_path, mmap=(mode == "mmap"), use_engine=(mode == "mmap"))
+    loaded = time.perf_counter()
+    model.predict_one(np.zeros(model.n_features, dtype=np.float32))
+    predicted = time.perf_counter()
+
+    barrier.wait()  # every worker has loaded: PSS now reflects the sharing
+    rss, pss = memory_kb()
+    results.put(
+        {
+            "load_ms": (loaded - start) * 1000,
+            "predict_ms": (predicted - loaded) * 1000,
+            "rss_kb": rss,
+            "pss_kb": pss,
+            "rss_delta_kb": rss - before[0],
+            "pss_delta_kb": None if pss is None else pss - before[1],
+            "engine": model.engine is not None,
+        }
+    )
+    barrier.wait()  # stay alive until everyone has measured
+
+
+def run_mode(mode, model_path, workers, cold):
+    if cold:
+        files = [model_path] + sorted(Path(model_path).with_name(Path(model_path).stem + "_forest").glob("*"))
+        drop_from_page_cache(files)
+
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    start = time.perf_counter()
+    procs = [ctx.Process(target=worker, args=(mode, model_path, barrier, results)) for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    stats = [results.get() for _ in procs]
+    ready = time.perf_counter() - start
+    for proc in procs:
+        proc.join()
+    return ready, stats
+
+
+def mean(values):
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=str(DEFAULT_MODEL_PATH))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--cold", action="store_true", help="Drop model files from the page cache first")
+    args = parser.parse_args()
+
+    if not Path(args.model).exists():
+        print(f"❌ Model not found: {args.model}. Run train_model.py first.")
+        return
+
+    print("=" * 70)
+    print(f"⏱️  MODEL STARTUP BENCHMARK ({args.workers} workers, {'cold' if args.cold else 'warm'} page cache)")
+    print("=" * 70)
+    for mode in MODES:
+        ready, stats = run_mode(mode, args.model, args.workers, args.cold)
+        if mode == "mmap" and not all(s["engine"] for s in stats):
+            print("\n⚠️  No flattened forest matching the model; re-run train_model.py to export it.")
+            continue
+
+        pss = mean(s["pss_kb"] for s in stats)
+        pss_delta = mean(s["pss_delta_kb"] for s in stats)
+        print(f"\n📦 {mode}")
+        print(f"   All workers ready: {ready * 1000:8.1f} ms")
+        print(f"   Model load:        {mean(s['load_ms'] for s in stats):8.1f} ms/worker")
+        print(f"   First prediction:  {mean(s['predict_ms'] for s in stats):8.1f} ms/worker")
+        print(f"   RSS:               {mean(s['rss_kb'] for s in stats) / 1024:8.1f} MB/worker "
+              f"(+{mean(s['rss_delta_kb'] for s in stats) / 1024:.1f} MB for the model)")
+        if pss is not None:
+            print(f"   PSS:               {pss / 1024:8.1f} MB/worker (+{pss_delta / 1024:.1f} MB for the model)")
+
+
+if __name__ == "__main__":
+    main()
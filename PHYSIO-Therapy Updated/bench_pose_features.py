@@ -0,0 +1,112 @@
+"""
+Benchmark landmark -> keypoints/features conversion for one MediaPipe result.
+
+Compares the per-landmark Python loop (list.extend + np.array(...).reshape)
+with pose_features.fill_landmarks + model_features + pixel_keypoints, and
+checks that both produce the same values.
+
+Usage:
+    python bench_pose_features.py                  # synthetic landmark list
+    python bench_pose_features.py --video PATH     # landmarks of a real frame
+"""
+import argparse
+import time
+
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from pose_features import NUM_LANDMARKS, fill_landmarks, model_features, new_landmark_buffer, pixel_keypoints
+
+IMAGE_SHAPE = (480, 640, 3)
+
+
+def synthetic_landmarks(seed=0):
+    rng = np.random.default_rng(seed)
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z, visibility, presence in rng.random((NUM_LANDMARKS, 5)).tolist():
+        lm = landmark_list.landmark.add()
+        lm.x, lm.y, lm.z, lm.visibility, lm.presence = x, y, z, visibility, presence
+    return landmark_list
+
+
+def video_landmarks(video_path):
+    """pose_landmarks of the first frame of the video with a detected pose."""
+    import cv2
+    import mediapipe as mp
+
+    cap = cv2.VideoCapture(str(video_path))
+    with mp.solutions.pose.Pose(static_image_mode=False) as pose:
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            result = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if result.pose_landmarks:
+                cap.release()
+                return result.pose_landmarks
+    cap.release()
+    return None
+
+
+def legacy(landmark_list):
+    """The old per-frame code: features and keypoints each walk the landmarks in Python."""
+    row = []
+    for lm in landmark_list.landmark:
+        row.extend([lm.x, lm.y, lm.z])
+    features = np.array(row).reshape(1, -1)
+
+    h, w = IMAGE_SHAPE[:2]
+    keypoints = [(lm.x * w, lm.y * h, lm.visibility) for lm in landmark_list.landmark]
+    return features, keypoints
+
+
+def buffered(landmark_list, landmark_buffer, feature_buffer):
+    landmarks = fill_landmarks(landmark_list, landmark_buffer)
+    features = model_features(landmarks, feature_buffer)
+    keypoints = pixel_keypoints(landmarks, IMAGE_SHAPE)
+    return features, keypoints
+
+
+def measure(name, fn, iterations):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed * 1e6 / iterations
+    print(f"   {name:<10} {per_call_us:8.2f} µs/frame")
+    return per_call_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", help="Take landmarks from the first detected pose in this video")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    landmark_list = video_landmarks(args.video) if args.video else synthetic_landmarks()
+    if landmark_list is None:
+        print("❌ No pose detected in the video.")
+        return
+
+    landmark_buffer = new_landmark_buffer()
+    feature_buffer = model_features(landmark_buffer)
+
+    old_features, old_keypoints = legacy(landmark_list)
+    new_features, new_keypoints = buffered(landmark_list, landmark_buffer, feature_buffer)
+    same = np.array_equal(old_features.astype(np.float32), new_features) and np.allclose(
+        np.asarray(old_keypoints), new_keypoints
+    )
+
+    print("=" * 70)
+    print(f"⏱️  POSE FEATURE EXTRACTION BENCHMARK ({args.iterations} frames)")
+    print("=" * 70)
+    before = measure("loop", lambda: legacy(landmark_list), args.iterations)
+    after = measure("buffer", lambda: buffered(landmark_list, landmark_buffer, feature_buffer), args.iterations)
+
+    print(f"\n{'✅' if same else '❌'} Outputs match: {same}")
+    print(f"📈 Speedup: {before / after:.2f}×")
+
+
+if __name__ == "__main__":
+    main()
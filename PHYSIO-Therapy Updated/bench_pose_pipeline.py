@@ -0,0 +1,108 @@
+"""
+Benchmark /analyze_pose squat inference: legacy double pose pass vs
+PosePipeline.analyze_encoded (what the endpoint runs, via analyze_encoded_frame).
+
+Usage:
+    python bench_pose_pipeline.py                      # frames sampled from Dataset/squat_correct.mp4
+    python bench_pose_pipeline.py --frames DIR         # fixed set of *.jpg frames
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from paths import DATASET_DIR, DEFAULT_MODEL_PATH
+from pose_pipeline import PosePipeline
+
+
+def load_jpeg_frames(frames_dir=None, video_path=None, count=60):
+    """Return a fixed list of JPEG byte strings."""
+    if frames_dir:
+        files = sorted(Path(frames_dir).glob("*.jpg")) + sorted(Path(frames_dir).glob("*.jpeg"))
+        return [f.read_bytes() for f in files[:count]]
+
+    cap = cv2.VideoCapture(str(video_path))
+    frames = []
+    while cap.isOpened() and len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 60])
+        if ok:
+            frames.append(buf.tobytes())
+    cap.release()
+    return frames
+
+
+def decode(jpeg_bytes):
+    return cv2.imdecode(np.frombuffer(jpeg_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+
+def legacy_frame(jpeg_bytes, pose, model):
+    """Replicates the pre-pipeline endpoint: pose runs, then runs again inside predict."""
+    image_bgr = decode(jpeg_bytes)
+    result = pose.process(cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB))
+    if not result.pose_landmarks:
+        return
+
+    result = pose.process(cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB))
+    if not result.pose_landmarks:
+        return
+    landmarks = []
+    for lm in result.pose_landmarks.landmark:
+        landmarks.extend([lm.x, lm.y, lm.z])
+    features = np.array(landmarks).reshape(1, -1)
+    label = int(model.predict(features)[0])
+    model.predict_proba(features)[0][label]
+
+
+def pipeline_frame(jpeg_bytes, pipeline):
+    pipeline.analyze_encoded(jpeg_bytes, session_id="bench")
+
+
+def measure(name, fn, frames, repeats):
+    fn(frames[0])  # warm up graph
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for frame in frames:
+            fn(frame)
+    elapsed = time.perf_counter() - start
+    fps = (len(frames) * repeats) / elapsed
+    print(f"   {name:<10} {fps:8.1f} frames/sec  ({elapsed * 1000 / (len(frames) * repeats):.1f} ms/frame)")
+    return fps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", help="Directory of JPEG frames to replay")
+    parser.add_argument("--video", default=str(DATASET_DIR / "squat_correct.mp4"))
+    parser.add_argument("--count", type=int, default=60, help="Number of frames to use")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = load_jpeg_frames(args.frames, args.video, args.count)
+    if not frames:
+        print("❌ No frames found. Pass --frames DIR or --video PATH.")
+        return
+
+    pipeline = PosePipeline.from_model_path(DEFAULT_MODEL_PATH)
+    mp_pose = mp.solutions.pose
+
+    print("=" * 70)
+    print(f"⏱️  POSE PIPELINE BENCHMARK ({len(frames)} frames × {args.repeats})")
+    print("=" * 70)
+
+    with mp_pose.Pose(static_image_mode=False) as pose:
+        before = measure("legacy", lambda f: legacy_frame(f, pose, pipeline.model.estimator), frames, args.repeats)
+    # One session: the pipeline keeps its own tracker in the pose pool, as for a live client
+    after = measure("pipeline", lambda f: pipeline_frame(f, pipeline), frames, args.repeats)
+    pipeline.pose_pool.close()
+
+    print(f"\n📈 Speedup: {after / before:.2f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark the streaming rep detector by replaying landmark sequences.
+
+Every Squat_Data/<Valid|Invalid>/<subfolder> is replayed as one session, frame
+by frame and in file order, through rep_detector.RepSessions (the frame's
+folder label stands in for the classifier). Without Squat_Data, synthetic
+squat sequences are used. Reports µs/frame, how many times faster than real
+time (at ``--fps``) the replay ran, and the reps found; fails below
+``--target``.
+
+Usage:
+    python bench_rep_detector.py
+    python bench_rep_detector.py --fps 30 --target 1000 --rounds 5
+"""
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+from paths import SQUAT_DATA_DIR
+from rep_detector import RepSessions
+from squat_data import discover, load_into
+
+
+def squat_data_sequences(root):
+    """[(name, (frames, 33, 4) landmarks, label)] per Squat_Data subfolder.
+
+    Squat_Data rows are 44 landmarks × (x, y, z) (HOW_NPY_EXTRACTION_WORKS.md);
+    as in fix_feature_mismatch.py, the first 99 columns are MediaPipe's 33
+    landmarks. The files carry no visibility, so every landmark counts as visible.
+    """
+    files = discover(root)
+    if not len(files):
+        return []
+    data, ok, _ = load_into(files.paths)
+    if data.shape[1] != 44 * 3:
+        print(f"⚠️  Expected 132 columns (44 landmarks × x, y, z) in {root}, got {data.shape[1]}")
+        return []
+    sources = np.asarray(files.sources)
+    labels = np.asarray(files.labels)
+    sequences = []
+    for source_id, name in enumerate(files.source_names):
+        rows = np.flatnonzero((sources == source_id) & ok)
+        if len(rows):
+            poses = np.ones((len(rows), 33, 4), np.float32)
+            poses[:, :, :3] = data[rows, : 33 * 3].reshape(-1, 33, 3)
+            sequences.append((name, poses, int(labels[rows[0]])))
+    return sequences
+
+
+def synthetic_pose(knee_angle):
+    """Side-on standing/squatting skeleton with the given knee angle."""
+    landmarks = np.zeros((33, 4), np.float32)
+    landmarks[:, 3] = 1.0
+    bend = math.radians(180 - knee_angle)
+    for side, dx in ((0, -0.03), (1, 0.03)):
+        ankle = (0.5 + dx, 0.9)
+        knee = (ankle[0], 0.7)
+        hip = (knee[0] - 0.2 * math.sin(bend), knee[1] - 0.2 * math.cos(bend))
+        shoulder = (hip[0] + 0.1 * math.sin(bend), hip[1] - 0.25)
+        for index, (x, y) in zip((11, 23, 25, 27), (shoulder, hip, knee, ankle)):
+            landmarks[index + side, :2] = (x, y)
+    return landmarks
+
+
+def synthetic_sequences(count=20, reps=5, fps=30, seconds_per_rep=3.0, seed=0):
+    rng = np.random.default_rng(seed)
+    frames_per_rep = int(fps * seconds_per_rep)
+    sequences = []
+    for i in range(count):
+        phase = np.linspace(0, 2 * math.pi * reps, frames_per_rep * reps)
+        angles = 130 + 45 * np.cos(phase) + rng.normal(0, 2, phase.size)  # from 175° standing to 85° and back
+        poses = np.stack([synthetic_pose(a) for a in angles])
+        sequences.append((f"synthetic/{i}", poses, i % 2))
+    return sequences
+
+
+def replay(sequences, rounds):
+    """(seconds, frames, reps, correct reps) of feeding every sequence ``rounds`` times."""
+    frames = reps = correct = 0
+    start = time.perf_counter()
+    for round_index in range(rounds):
+        sessions = RepSessions()
+        for name, poses, label in sequences:
+            session_id = f"{round_index}:{name}"
+            for landmarks in poses:
+                event, _ = sessions.update(session_id, landmarks, label, 1.0)
+                if event is not None:
+                    reps += 1
+                    correct += event.correct
+            frames += len(poses)
+    return time.perf_counter() - start, frames, reps // rounds, correct // rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=str(SQUAT_DATA_DIR))
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate the sequences were recorded at")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--target", type=float, default=1000.0, help="Fail below this multiple of real time")
+    args = parser.parse_args()
+
+    sequences = squat_data_sequences(args.root)
+    source = args.root
+    if not sequences:
+        sequences, source = synthetic_sequences(fps=int(args.fps)), "synthetic sequences"
+    total_frames = sum(len(poses) for _, poses, _ in sequences)
+
+    print("=" * 70)
+    print(f"⏱️  REP DETECTOR REPLAY ({len(sequences)} sequences, {total_frames} frames from {source})")
+    print("=" * 70)
+    replay(sequences[:1], 1)  # warm up
+    seconds, frames, reps, correct = replay(sequences, args.rounds)
+    speed = frames / args.fps / seconds
+
+    print(f"   Per frame:   {seconds / frames * 1e6:8.2f} µs")
+    print(f"   Replay:      {speed:8.0f}× real time at {args.fps:.0f} fps")
+    print(f"   Reps found:  {reps:8d} ({correct} correct, {reps - correct} incorrect)")
+    if speed < args.target:
+        print(f"\n❌ Below the {args.target:.0f}× target")
+        sys.exit(1)
+    print(f"\n✅ Above the {args.target:.0f}× target")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Load benchmark for session storage: mixed /sessions inserts and stats/history reads.
+
+Compares the old access pattern (fresh sqlite3.connect per query, rollback
+journal) with session_db's pooled WAL connections, on a scratch copy of the
+physiosense.db schema.
+
+Usage:
+    python bench_session_db.py
+    python bench_session_db.py --threads 16 --seconds 5 --write-ratio 0.2
+    python bench_session_db.py --db physiosense.db    # start from a copy of real data
+"""
+import argparse
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from session_db import (
+    INSERT_SESSION,
+    SELECT_RECENT,
+    ConnectionPool,
+    SessionRepository,
+    connect,
+    init_schema,
+    rebuild_user_stats,
+)
+
+# Stats query used before the user_stats rollup
+SELECT_AGGREGATE = """
+    SELECT
+        COUNT(*) AS totalSessions,
+        COALESCE(SUM(correctReps + incorrectReps), 0) AS totalReps,
+        COALESCE(AVG(accuracy), 0) AS avgAccuracy,
+        COALESCE(SUM(duration), 0) AS totalDuration
+    FROM sessions
+    WHERE userId = ?;
+"""
+
+
+def session_values(rng):
+    day = datetime(2025, 1, 1) + timedelta(days=rng.randrange(365), minutes=rng.randrange(1440))
+    return ("squats", rng.randrange(60, 900), rng.randrange(20), rng.randrange(10),
+            rng.randrange(101), rng.randrange(101), day.isoformat())
+
+
+def seed(db_path, users, sessions_per_user):
+    conn = connect(db_path)
+    init_schema(conn)
+    rng = random.Random(0)
+    conn.executemany(
+        INSERT_SESSION,
+        [(f"user{u}", *session_values(rng)) for u in range(users) for _ in range(sessions_per_user)],
+    )
+    rebuild_user_stats(conn)
+    conn.commit()
+    conn.close()
+
+
+class LegacyStore:
+    """The pre-pool pattern: one connection per query, default journal, full-history aggregates."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("PRAGMA journal_mode=DELETE;")
+        conn.close()
+
+    def _conn(self):
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def insert_session(self, user_id, values):
+        conn = self._conn()
+        try:
+            conn.execute(INSERT_SESSION, (user_id, *values))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def recent_sessions(self, user_id, limit):
+        conn = self._conn()
+        try:
+            return conn.execute(SELECT_RECENT, (user_id, limit)).fetchall()
+        finally:
+            conn.close()
+
+    def aggregate_stats(self, user_id):
+        conn = self._conn()
+        try:
+            return conn.execute(SELECT_AGGREGATE, (user_id,)).fetchone()
+        finally:
+            conn.close()
+
+    def close(self):
+        pass
+
+
+def run_load(store, threads, seconds, write_ratio, users):
+    stop = time.perf_counter() + seconds
+    counts = [0] * threads
+    errors = [0] * threads
+
+    def worker(idx):
+        rng = random.Random(idx)
+        while time.perf_counter() < stop:
+            user_id = f"user{rng.randrange(users)}"
+            try:
+                if rng.random() < write_ratio:
+                    store.insert_session(user_id, session_values(rng))
+                elif rng.random() < 0.5:
+                    store.aggregate_stats(user_id)
+                else:
+                    store.recent_sessions(user_id, 5)
+                counts[idx] += 1
+            except sqlite3.OperationalError:
+                errors[idx] += 1
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sum(counts) / seconds, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="Existing physiosense.db to copy instead of synthetic data")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--sessions-per-user", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"⏱️  SESSION DB LOAD BENCHMARK ({args.threads} threads, {args.write_ratio:.0%} writes)")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name in ("legacy", "pooled"):
+            db_path = Path(tmp) / f"{name}.db"
+            if args.db:
+                shutil.copyfile(args.db, db_path)
+                conn = connect(db_path)
+                init_schema(conn)
+                conn.close()
+            else:
+                seed(db_path, args.users, args.sessions_per_user)
+
+            if name == "legacy":
+                store = LegacyStore(db_path)
+            else:
+                store = SessionRepository(ConnectionPool(db_path, size=args.pool_size))
+
+            rps, errors = run_load(store, args.threads, args.seconds, args.write_ratio, args.users)
+            store.close()
+            results[name] = rps
+            print(f"   {name:<8} {rps:10.0f} requests/sec   ({errors} lock errors)")
+
+    print(f"\n📈 Speedup: {results['pooled'] / results['legacy']:.2f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,21 @@
 Script to check the quality and diversity of your collected dataset.
 Run this after collecting new videos to see if you need more data.
 """
-import pandas as pd
 import numpy as np
 import os
 from pathlib import Path
 
-def analyze_dataset(csv_path):
+from dataset_store import dataset_exists, load_dataset
+
+def analyze_dataset(dataset_path):
     """Analyze dataset quality and diversity."""
-    if not os.path.exists(csv_path):
-        print(f"❌ Dataset not found: {csv_path}")
+    if not dataset_exists(dataset_path):
+        print(f"❌ Dataset not found: {dataset_path}")
         return
     
-    df = pd.read_csv(csv_path)
+    dataset = load_dataset(dataset_path)
+    features = dataset.features
+    num_samples = len(dataset)
     
     print("=" * 70)
     print("📊 DATASET QUALITY ANALYSIS")
@@ -21,17 +24,18 @@ def analyze_dataset(csv_path):
     
     # Basic statistics
     print(f"\n📈 Basic Statistics:")
-    print(f"   Total samples: {len(df)}")
-    print(f"   Features: {len(df.columns) - 1} (33 landmarks × 3 coordinates)")
+    print(f"   Total samples: {num_samples}")
+    print(f"   Features: {dataset.num_features} (33 landmarks × 3 coordinates)")
     
     # Label distribution
     print(f"\n🏷️  Label Distribution:")
-    label_counts = df['label'].value_counts()
-    print(f"   Correct (1): {label_counts.get(1, 0)} ({label_counts.get(1, 0)/len(df)*100:.1f}%)")
-    print(f"   Incorrect (0): {label_counts.get(0, 0)} ({label_counts.get(0, 0)/len(df)*100:.1f}%)")
+    label_counts = dataset.label_counts()
+    print(f"   Correct (1): {label_counts.get(1, 0)} ({label_counts.get(1, 0)/num_samples*100:.1f}%)")
+    print(f"   Incorrect (0): {label_counts.get(0, 0)} ({label_counts.get(0, 0)/num_samples*100:.1f}%)")
     
     # Check balance
-    balance_ratio = min(label_counts) / max(label_counts) if len(label_counts) > 1 else 0
+    counts = list(label_counts.values())
+    balance_ratio = min(counts) / max(counts) if len(counts) > 1 else 0
     if balance_ratio > 0.8:
         print("   ✅ Well balanced")
     elif balance_ratio > 0.6:
@@ -41,17 +45,17 @@ def analyze_dataset(csv_path):
     
     # Feature statistics
     print(f"\n📐 Feature Statistics:")
-    feature_cols = [col for col in df.columns if col != 'label']
+    feature_cols = dataset.columns
     
     # Check for missing values
-    missing = df[feature_cols].isnull().sum().sum()
+    missing = int(np.isnan(features).sum())
     if missing == 0:
         print("   ✅ No missing values")
     else:
         print(f"   ⚠️  {missing} missing values found")
     
     # Check for outliers (values outside 0-1 range for normalized coordinates)
-    outliers = ((df[feature_cols] < -2) | (df[feature_cols] > 2)).sum().sum()
+    outliers = int(((features < -2) | (features > 2)).sum())
     if outliers == 0:
         print("   ✅ No extreme outliers")
     else:
@@ -59,7 +63,7 @@ def analyze_dataset(csv_path):
     
     # Diversity check (variance in features)
     print(f"\n🎲 Diversity Analysis:")
-    variances = df[feature_cols].var()
+    variances = np.nanvar(features, axis=0, ddof=1, dtype=np.float64)
     low_variance_features = (variances < 0.001).sum()
     
     if low_variance_features < len(feature_cols) * 0.1:
@@ -71,12 +75,12 @@ def analyze_dataset(csv_path):
     # Recommendations
     print(f"\n💡 Recommendations:")
     
-    if len(df) < 1000:
+    if num_samples < 1000:
         print("   📹 Collect more videos (aim for 5,000+ samples)")
     
     if balance_ratio < 0.7:
-        minority_label = label_counts.idxmin()
-        minority_count = label_counts.min()
+        minority_label = min(label_counts, key=label_counts.get)
+        minority_count = label_counts[minority_label]
         print(f"   ⚖️  Collect more '{'correct' if minority_label == 1 else 'incorrect'}' samples")
         print(f"      Current: {minority_count} samples")
     
@@ -111,12 +115,12 @@ def analyze_dataset(csv_path):
     
     # Sample size recommendations
     print(f"\n🎯 Sample Size Recommendations:")
-    print(f"   Current: {len(df)} samples")
+    print(f"   Current: {num_samples} samples")
     print(f"   Minimum for basic model: 1,000 samples")
     print(f"   Recommended: 5,000-10,000 samples")
     print(f"   Ideal: 10,000+ samples")
     
-    samples_needed = max(0, 5000 - len(df))
+    samples_needed = max(0, 5000 - num_samples)
     if samples_needed > 0:
         print(f"\n   📊 Need {samples_needed} more samples to reach recommended minimum")
     
@@ -126,21 +130,21 @@ def analyze_dataset(csv_path):
 def main():
     """Main function."""
     from paths import (
-        SQUAT_DATASET_CSV,
-        SQUAT_DATASET_EXTENDED_CSV,
-        SQUAT_DATASET_COMBINED_CSV,
+        SQUAT_DATASET,
+        SQUAT_DATASET_EXTENDED,
+        SQUAT_DATASET_COMBINED,
         DATASET_DIR,
     )
 
     datasets = [
-        SQUAT_DATASET_CSV,
-        SQUAT_DATASET_EXTENDED_CSV,
-        SQUAT_DATASET_COMBINED_CSV,
+        SQUAT_DATASET,
+        SQUAT_DATASET_EXTENDED,
+        SQUAT_DATASET_COMBINED,
     ]
     
     print("🔍 Checking available datasets...\n")
     
-    found_datasets = [str(d) for d in datasets if d.exists()]
+    found_datasets = [str(d) for d in datasets if dataset_exists(d)]
     
     if not found_datasets:
         print("❌ No datasets found!")
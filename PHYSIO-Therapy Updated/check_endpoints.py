@@ -0,0 +1,76 @@
+"""
+Offline checks that malformed requests to the pose endpoints get a 4xx
+(never a 500, never a dropped connection). The WebSocket check loads the
+squat model from Models/.
+
+Runs the FastAPI app in-process with PHYSIO_FAKE_AUTH=1; no server, network
+or Firebase credentials are needed. The script exits non-zero on the first
+failed check.
+
+Usage:
+    python check_endpoints.py
+"""
+import argparse
+import os
+
+# Must be set before backend_api is imported: FAKE_AUTH is read at import time
+os.environ["PHYSIO_FAKE_AUTH"] = "1"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import backend_api  # noqa: E402
+
+client = TestClient(backend_api.app)
+
+
+def expect_status(response, status, case):
+    assert response.status_code == status, f"{case}: expected {status}, got {response.status_code} {response.text}"
+
+
+def check_analyze_pose_json():
+    for body in ("[1, 2]", '"x"', "5", "null", '{"exercise_type": "squats"}', '{"image": 5, "exercise_type": "squats"}'):
+        response = client.post("/analyze_pose", content=body, headers={"Content-Type": "application/json"})
+        expect_status(response, 422, body)
+    for body in ("{", "\xff"):
+        response = client.post("/analyze_pose", content=body.encode("latin-1"), headers={"Content-Type": "application/json"})
+        expect_status(response, 400, repr(body))
+
+
+def check_analyze_pose_raw():
+    headers = {"Content-Type": "image/jpeg"}
+    expect_status(client.post("/analyze_pose?exercise_type=squats", content=b"", headers=headers), 400, "empty body")
+    expect_status(client.post("/analyze_pose", content=b"\xff\xd8", headers=headers), 422, "no exercise_type")
+    response = client.post("/analyze_pose?exercise_type=squats", content=b"x", headers={"Content-Type": "text/plain"})
+    expect_status(response, 415, "text/plain")
+
+
+def check_stream_messages():
+    standing = [[0.5, i / 33, 0.0, 1.0] for i in range(33)]
+    with client.websocket_connect("/ws/analyze?token=fake:check&session_id=check") as ws:
+        for text in ("[1, 2]", '"x"', "5", '{"seq": 7, "image": 123}', '{"image_width": "wide"}', '{"session_id": 5}'):
+            ws.send_text(text)
+            reply = ws.receive_json()
+            assert reply.get("code") == 400, f"{text}: expected a 400 error frame, got {reply}"
+        # The socket is still open and the rejected config did not stick
+        ws.send_json({"seq": 8, "landmarks": standing})
+        reply = ws.receive_json()
+        assert reply.get("seq") == 8 and "error" not in reply, reply
+
+
+CHECKS = (check_analyze_pose_json, check_analyze_pose_raw, check_stream_messages)
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+
+    print("=" * 70)
+    print("🔌 ENDPOINT CHECKS (offline, fake auth)")
+    print("=" * 70)
+    for check in CHECKS:
+        check()
+        print(f"   ✅ {check.__name__}")
+    print(f"\n✅ All {len(CHECKS)} checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Offline checks for the verified-token cache (token_cache.py) and the
+PHYSIO_FAKE_AUTH path of backend_api.verify_user_token.
+
+A fake clock drives TokenCache, so expiry is checked at the exact ``exp``
+second without waiting. No network or Firebase credentials are needed; the
+script exits non-zero on the first failed check.
+
+Usage:
+    python check_token_cache.py
+"""
+import argparse
+import hashlib
+import os
+import time
+
+# Must be set before backend_api is imported: FAKE_AUTH is read at import time
+os.environ["PHYSIO_FAKE_AUTH"] = "1"
+
+from token_cache import TokenCache, fake_verify_token  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingVerifier:
+    """Verifier returning fixed claims per token and counting its calls."""
+
+    def __init__(self, claims_by_token):
+        self.claims_by_token = claims_by_token
+        self.calls = 0
+
+    def __call__(self, token: str) -> dict:
+        self.calls += 1
+        if token not in self.claims_by_token:
+            raise ValueError("Invalid token")
+        return dict(self.claims_by_token[token])
+
+
+def check_expiry():
+    clock = FakeClock()
+    exp = clock.now + 600
+    verifier = CountingVerifier({"a": {"uid": "alice", "exp": exp}})
+    cache = TokenCache(verifier, clock=clock)
+
+    assert cache.verify("a")["uid"] == "alice" and verifier.calls == 1
+    clock.now = exp - 0.001
+    cache.verify("a")
+    assert verifier.calls == 1, "token re-verified before its exp"
+    clock.now = exp
+    cache.verify("a")
+    assert verifier.calls == 2, "cached claims served at exp"
+    assert cache.stats()["expired"] == 1
+
+
+def check_max_ttl():
+    clock = FakeClock()
+    verifier = CountingVerifier({"a": {"uid": "alice", "exp": clock.now + 7200}})
+    cache = TokenCache(verifier, max_ttl=60, clock=clock)
+
+    cache.verify("a")
+    clock.now += 59
+    cache.verify("a")
+    assert verifier.calls == 1
+    clock.now += 1
+    cache.verify("a")
+    assert verifier.calls == 2, "entry outlived max_ttl"
+
+
+def check_not_cached():
+    clock = FakeClock()
+    verifier = CountingVerifier({"no-exp": {"uid": "bob"}, "stale": {"uid": "carol", "exp": clock.now}})
+    cache = TokenCache(verifier, clock=clock)
+
+    for token in ("bad", "bad"):
+        try:
+            cache.verify(token)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("invalid token accepted")
+    cache.verify("no-exp")
+    cache.verify("stale")
+    assert cache.stats()["size"] == 0, "failed, exp-less or expired verification was cached"
+
+
+def check_sha256_keys():
+    clock = FakeClock()
+    tokens = {f"token-{i}": {"uid": f"user-{i}", "exp": clock.now + 600} for i in range(3)}
+    cache = TokenCache(CountingVerifier(tokens), max_entries=2, clock=clock)
+
+    for token in tokens:
+        cache.verify(token)
+    expected = [hashlib.sha256(token.encode("utf-8")).digest() for token in list(tokens)[1:]]
+    assert list(cache._entries) == expected, "entries not keyed by SHA-256 of the token (LRU order)"
+    assert cache.stats()["evictions"] == 1
+
+
+def check_fake_auth():
+    import backend_api
+    from fastapi import HTTPException
+
+    assert backend_api.FAKE_AUTH and backend_api.token_cache.verifier is fake_verify_token
+    backend_api.token_cache.clear()
+
+    assert backend_api.verify_user_token("fake:alice") == "alice"
+    assert backend_api.verify_user_token(f"fake:bob:{int(time.time()) + 60}") == "bob"
+    for token in (None, "", "fake:", "real-looking.jwt.token", f"fake:carol:{int(time.time()) - 1}"):
+        try:
+            backend_api.verify_user_token(token)
+        except HTTPException as e:
+            assert e.status_code == 401, (token, e.status_code)
+        else:
+            raise AssertionError(f"{token!r} accepted")
+
+
+CHECKS = (check_expiry, check_max_ttl, check_not_cached, check_sha256_keys, check_fake_auth)
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+
+    print("=" * 70)
+    print("🔑 TOKEN CACHE CHECKS (offline, fake clock)")
+    print("=" * 70)
+    for check in CHECKS:
+        check()
+        print(f"   ✅ {check.__name__}")
+    print(f"\n✅ All {len(CHECKS)} checks passed")
+
+
+if __name__ == "__main__":
+    main()
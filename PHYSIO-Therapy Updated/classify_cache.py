@@ -0,0 +1,105 @@
+"""
+Motion-gated cache of squat classifications, one entry per session.
+
+While a patient holds the bottom of a squat or stands between reps,
+consecutive frames give nearly the same landmarks, and the forest would
+give the same answer again. ``ClassifyCache`` keeps each session's last
+classified landmarks with their (label, confidence). A new frame whose
+landmarks moved less than ``max_distance`` (mean x/y displacement per
+landmark, in normalized image units) from them reuses that result,
+for at most ``max_age`` seconds after it was computed.
+
+Hits never replace the stored landmarks, so slow drift still adds up to a
+miss. Frames without a session ID are never cached: they may come from
+different clients. ``stats()`` reports hit rates and the classification
+time the hits saved (hits × mean latency of a miss).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class _Entry:
+    __slots__ = ("xy", "label", "confidence", "created")
+
+    def __init__(self, xy: np.ndarray, label: int, confidence: float, created: float):
+        self.xy = xy
+        self.label = label
+        self.confidence = confidence
+        self.created = created
+
+
+class ClassifyCache:
+    def __init__(
+        self,
+        max_distance: float = 0.01,
+        max_age: float = 1.0,
+        max_sessions: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_distance = max_distance
+        self.max_age = max_age
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._miss_seconds = 0.0
+        self._counters = {"hits": 0, "misses": 0, "moved": 0, "expired": 0, "evictions": 0}
+
+    @staticmethod
+    def distance(a: np.ndarray, b: np.ndarray) -> float:
+        """Mean Euclidean distance between two (33, 2) landmark x/y arrays."""
+        return float(np.sqrt(((a - b) ** 2).sum(axis=1)).mean())
+
+    def lookup(self, session_id: Optional[str], landmarks: np.ndarray) -> Optional[Tuple[int, float]]:
+        """The session's cached (label, confidence) if ``landmarks`` barely moved, else None."""
+        if not session_id:
+            return None
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                self._entries.move_to_end(session_id)
+                if now - entry.created > self.max_age:
+                    self._counters["expired"] += 1
+                elif self.distance(entry.xy, landmarks[:, :2]) > self.max_distance:
+                    self._counters["moved"] += 1
+                else:
+                    self._counters["hits"] += 1
+                    return entry.label, entry.confidence
+            self._counters["misses"] += 1
+        return None
+
+    def store(
+        self, session_id: Optional[str], landmarks: np.ndarray, label: int, confidence: float, seconds: float
+    ) -> None:
+        """Remember a fresh classification; ``seconds`` is what computing it took."""
+        if not session_id:
+            return
+        entry = _Entry(np.array(landmarks[:, :2], dtype=np.float32), label, confidence, self._clock())
+        with self._lock:
+            self._miss_seconds += seconds
+            self._entries[session_id] = entry
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["sessions"] = len(self._entries)
+            miss_seconds = self._miss_seconds
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        mean_miss = miss_seconds / stats["misses"] if stats["misses"] else 0.0
+        stats["mean_classify_ms"] = round(mean_miss * 1000, 3)
+        stats["saved_ms"] = round(stats["hits"] * mean_miss * 1000, 1)
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
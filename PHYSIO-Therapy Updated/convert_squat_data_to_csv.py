@@ -1,140 +1,108 @@
 """
-Convert Squat_Data .npy files to CSV format compatible with training pipeline.
+Convert Squat_Data .npy files into the training dataset (Dataset/squat_dataset_from_npy/).
+Export it as CSV with: python dataset_store.py export Dataset/squat_dataset_from_npy
+
+Files are discovered and read concurrently straight into one preallocated
+float32 array (see squat_data.py).
+
+Usage:
+    python convert_squat_data_to_csv.py
+    python convert_squat_data_to_csv.py --workers 16 --mmap   # stage rows in a memory-mapped file
 """
-import numpy as np
-import pandas as pd
+import argparse
 import os
-from pathlib import Path
-try:
-    from tqdm import tqdm
-    HAS_TQDM = True
-except ImportError:
-    HAS_TQDM = False
-    def tqdm(iterable, desc=""):
-        if desc:
-            print(f"Processing {desc}...")
-        return iterable
+import time
 
-def convert_npy_to_csv():
-    """Convert all .npy files in Squat_Data to CSV format."""
+import numpy as np
+
+def convert_npy_to_csv(workers=8, use_mmap=False):
+    """Convert all .npy files in Squat_Data to a binary dataset."""
     print("=" * 70)
-    print("🔄 CONVERTING SQUAT_DATA TO CSV FORMAT")
+    print("🔄 CONVERTING SQUAT_DATA TO DATASET FORMAT")
     print("=" * 70)
     
-    from paths import SQUAT_DATA_DIR, DATASET_DIR, SQUAT_DATASET_FROM_NPY_CSV
-    
-    valid_folder = SQUAT_DATA_DIR / "Valid"
-    invalid_folder = SQUAT_DATA_DIR / "Invalid"
-    
-    all_data = []
-    labels = []
+    from dataset_store import from_arrays, save_dataset
+    from paths import SQUAT_DATA_DIR, DATASET_DIR, SQUAT_DATASET_FROM_NPY
+    from squat_data import discover, load_into
     
-    # Process valid samples
-    print("\n✅ Processing Valid samples...")
-    if valid_folder.exists():
-        valid_files = []
-        for subfolder in os.listdir(valid_folder):
-            subfolder_path = os.path.join(valid_folder, subfolder)
-            if os.path.isdir(subfolder_path):
-                npy_files = list(Path(subfolder_path).glob("*.npy"))
-                valid_files.extend(npy_files)
-        
-        for npy_file in tqdm(valid_files, desc="Loading valid samples"):
-            try:
-                data = np.load(str(npy_file))
-                # Flatten if needed
-                if data.ndim > 1:
-                    data = data.flatten()
-                all_data.append(data)
-                labels.append(1)  # Valid = 1 (correct)
-            except Exception as e:
-                print(f"\n⚠️  Error loading {npy_file}: {e}")
+    started = time.perf_counter()
+    files = discover(SQUAT_DATA_DIR)
+    labels = np.asarray(files.labels, dtype=np.int8)
+    print(f"\n📁 Found {len(files):,} samples in {len(files.source_names)} subfolders "
+          f"({int((labels == 1).sum()):,} valid, {int((labels == 0).sum()):,} invalid) "
+          f"in {time.perf_counter() - started:.2f}s")
     
-    # Process invalid samples
-    print("\n❌ Processing Invalid samples...")
-    if invalid_folder.exists():
-        invalid_files = []
-        for subfolder in os.listdir(invalid_folder):
-            subfolder_path = os.path.join(invalid_folder, subfolder)
-            if os.path.isdir(subfolder_path):
-                npy_files = list(Path(subfolder_path).glob("*.npy"))
-                invalid_files.extend(npy_files)
-        
-        for npy_file in tqdm(invalid_files, desc="Loading invalid samples"):
-            try:
-                data = np.load(str(npy_file))
-                # Flatten if needed
-                if data.ndim > 1:
-                    data = data.flatten()
-                all_data.append(data)
-                labels.append(0)  # Invalid = 0 (incorrect)
-            except Exception as e:
-                print(f"\n⚠️  Error loading {npy_file}: {e}")
-    
-    if not all_data:
+    if not len(files):
         print("❌ No data found! Check folder structure.")
         return
     
-    # Convert to numpy array
-    print("\n🔄 Converting to DataFrame...")
-    data_array = np.array(all_data)
+    DATASET_DIR.mkdir(parents=True, exist_ok=True)
+    mmap_path = DATASET_DIR / "squat_dataset_from_npy.rows.tmp.npy" if use_mmap else None
+    
+    print(f"\n📥 Loading samples with {workers} threads...")
+    started = time.perf_counter()
+    data_array, ok, errors = load_into(files.paths, workers=workers, mmap_path=mmap_path)
+    print(f"   Loaded in {time.perf_counter() - started:.2f}s")
+    for path, message in errors:
+        print(f"⚠️  Error loading {path}: {message}")
+    
+    sources = np.asarray(files.sources, dtype=np.int32)
+    if errors:
+        data_array, labels, sources = data_array[ok], labels[ok], sources[ok]
     
     # Check feature count
     num_features = data_array.shape[1]
     print(f"   Features per sample: {num_features}")
     
-    # Create column names
-    if num_features == 99:
-        # Standard MediaPipe format: 33 landmarks × 3 coordinates
-        columns = []
-        for i in range(33):
-            columns.extend([f'x{i}', f'y{i}', f'z{i}'])
-    elif num_features == 132:
-        # Extended format: 44 landmarks × 3 coordinates
-        columns = []
-        for i in range(44):
-            columns.extend([f'x{i}', f'y{i}', f'z{i}'])
-    else:
-        # Generic naming
-        columns = [f'feature_{i}' for i in range(num_features)]
-        print(f"   ⚠️  Using generic column names (unexpected feature count)")
+    if num_features not in (99, 132):
+        # 99 = 33 MediaPipe landmarks × 3, 132 = 44 landmarks × 3
+        print(f"   ⚠️  Unexpected feature count")
     
-    # Create DataFrame
-    df = pd.DataFrame(data_array, columns=columns)
-    df['label'] = labels
+    dataset = from_arrays(data_array, labels, sources, files.source_names)
     
-    # Save to CSV
-    output_file = SQUAT_DATASET_FROM_NPY_CSV
-    DATASET_DIR.mkdir(parents=True, exist_ok=True)
+    # Save dataset
+    output_file = SQUAT_DATASET_FROM_NPY
     
     print(f"\n💾 Saving to {output_file}...")
-    df.to_csv(output_file, index=False)
+    save_dataset(dataset, output_file)
     
     # Statistics
     print("\n" + "=" * 70)
     print("📊 CONVERSION SUMMARY")
     print("=" * 70)
-    print(f"✅ Total samples: {len(df):,}")
-    print(f"✅ Valid (label=1): {len(df[df['label']==1]):,}")
-    print(f"✅ Invalid (label=0): {len(df[df['label']==0]):,}")
+    label_counts = dataset.label_counts()
+    print(f"✅ Total samples: {len(dataset):,}")
+    print(f"✅ Valid (label=1): {label_counts.get(1, 0):,}")
+    print(f"✅ Invalid (label=0): {label_counts.get(0, 0):,}")
     print(f"✅ Features: {num_features}")
     print(f"✅ Output file: {output_file}")
     
     # Check balance
-    valid_pct = len(df[df['label']==1]) / len(df) * 100
-    invalid_pct = len(df[df['label']==0]) / len(df) * 100
+    valid_pct = label_counts.get(1, 0) / len(dataset) * 100
+    invalid_pct = label_counts.get(0, 0) / len(dataset) * 100
     print(f"\n⚖️  Distribution:")
     print(f"   Valid: {valid_pct:.1f}%")
     print(f"   Invalid: {invalid_pct:.1f}%")
     
+    if mmap_path is not None:
+        # Drop the memmap references before deleting its file (required on Windows)
+        del data_array, dataset
+        os.remove(mmap_path)
+    
     print("\n" + "=" * 70)
     print("✅ CONVERSION COMPLETE!")
     print("=" * 70)
     print("\n💡 Next Steps:")
-    print(f"   1. Update train_model.py to use: {output_file}")
-    print(f"   2. Or run: python train_model.py")
+    print(f"   1. Run: python fix_feature_mismatch.py (132 → 99 features)")
+    print(f"   2. Run: python train_model.py")
     print(f"      (It will automatically detect the new dataset)")
+    print(f"   CSV copy: python dataset_store.py export {output_file}")
 
 
 if __name__ == "__main__":
-    convert_npy_to_csv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8, help="Reader threads")
+    parser.add_argument("--mmap", action="store_true",
+                        help="Load rows into a memory-mapped file instead of RAM")
+    args = parser.parse_args()
+    convert_npy_to_csv(workers=max(1, args.workers), use_mmap=args.mmap)
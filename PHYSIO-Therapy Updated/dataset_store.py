@@ -0,0 +1,243 @@
+"""
+Binary storage for landmark datasets (replaces the 99-column CSVs).
+
+A dataset is a directory holding plain .npy arrays plus a JSON sidecar:
+
+    squat_dataset/
+        features.npy   float32 (N, F)   x0, y0, z0, ..., one row per frame
+        labels.npy     int8    (N,)     0 = incorrect, 1 = correct
+        sources.npy    int32   (N,)     index into meta.json "sources"
+        meta.json      columns, landmark layout, label names, source videos/folders
+
+Arrays load memory-mapped, so opening a dataset is instant and only the pages
+actually touched are read. CSV is kept as an export/import format:
+
+    python dataset_store.py export Dataset/squat_dataset_fixed        # -> .csv next to it
+    python dataset_store.py import Dataset/squat_dataset.csv          # -> Dataset/squat_dataset/
+"""
+import argparse
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+FORMAT_VERSION = 1
+META_NAME = "meta.json"
+LABEL_NAMES = {0: "incorrect", 1: "correct"}
+UNKNOWN_SOURCE = "unknown"
+
+
+def landmark_columns(num_features: int) -> List[str]:
+    """x0, y0, z0, ... for whole landmarks, generic names otherwise."""
+    if num_features % 3 == 0:
+        columns = []
+        for i in range(num_features // 3):
+            columns.extend([f"x{i}", f"y{i}", f"z{i}"])
+        return columns
+    return [f"feature_{i}" for i in range(num_features)]
+
+
+def csv_path_for(path) -> Path:
+    """Legacy/export CSV path for a dataset directory (Dataset/x -> Dataset/x.csv)."""
+    return Path(path).with_suffix(".csv")
+
+
+@dataclass
+class LandmarkDataset:
+    features: np.ndarray  # float32 (N, F)
+    labels: np.ndarray  # int8 (N,)
+    sources: np.ndarray  # int32 (N,), index into source_names
+    columns: List[str]
+    source_names: List[str] = field(default_factory=lambda: [UNKNOWN_SOURCE])
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @property
+    def num_features(self) -> int:
+        return self.features.shape[1]
+
+    def label_counts(self):
+        """{label: count} for labels present in the dataset."""
+        values, counts = np.unique(self.labels, return_counts=True)
+        return {int(v): int(c) for v, c in zip(values, counts)}
+
+    def feature_frame(self):
+        """Features as a DataFrame with the x0..z32 column names the model is trained on."""
+        import pandas as pd
+
+        return pd.DataFrame(self.features, columns=self.columns, copy=False)
+
+    def to_frame(self):
+        """Features plus a 'label' column, matching the old CSV layout."""
+        df = self.feature_frame()
+        df["label"] = self.labels.astype(np.int64)
+        return df
+
+
+def from_arrays(
+    features,
+    labels,
+    sources=None,
+    source_names: Optional[Sequence[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> LandmarkDataset:
+    """Build a LandmarkDataset, converting to the on-disk dtypes."""
+    features = np.ascontiguousarray(features, dtype=np.float32)
+    if features.ndim != 2:
+        raise ValueError(f"features must be 2-D (samples, features), got shape {features.shape}")
+    labels = np.asarray(labels, dtype=np.int8).reshape(-1)
+    if len(labels) != len(features):
+        raise ValueError(f"{len(features)} feature rows but {len(labels)} labels")
+    if sources is None:
+        sources = np.zeros(len(labels), dtype=np.int32)
+        source_names = [UNKNOWN_SOURCE]
+    sources = np.asarray(sources, dtype=np.int32).reshape(-1)
+    return LandmarkDataset(
+        features=features,
+        labels=labels,
+        sources=sources,
+        columns=list(columns) if columns is not None else landmark_columns(features.shape[1]),
+        source_names=list(source_names),
+    )
+
+
+def concat(datasets: Sequence[LandmarkDataset]) -> LandmarkDataset:
+    """Stack datasets with the same columns, merging their source lists."""
+    columns = datasets[0].columns
+    source_ids = {}
+    remapped = []
+    for ds in datasets:
+        if ds.columns != columns:
+            raise ValueError("Cannot concatenate datasets with different feature columns")
+        mapping = np.array(
+            [source_ids.setdefault(name, len(source_ids)) for name in ds.source_names], dtype=np.int32
+        )
+        remapped.append(mapping[ds.sources] if len(ds) else ds.sources)
+    return from_arrays(
+        np.concatenate([ds.features for ds in datasets]),
+        np.concatenate([ds.labels for ds in datasets]),
+        np.concatenate(remapped),
+        sorted(source_ids, key=source_ids.get),
+        columns,
+    )
+
+
+def drop_duplicates(ds: LandmarkDataset) -> LandmarkDataset:
+    """Remove repeated (features, label) rows, keeping the first occurrence in order."""
+    rows = np.hstack([ds.features, ds.labels[:, None].astype(np.float32)])
+    _, first = np.unique(rows, axis=0, return_index=True)
+    keep = np.sort(first)
+    return LandmarkDataset(
+        ds.features[keep], ds.labels[keep], ds.sources[keep], ds.columns, ds.source_names
+    )
+
+
+def save_dataset(ds: LandmarkDataset, path) -> Path:
+    """Write a dataset directory, replacing any existing one at ``path``."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    np.save(tmp / "features.npy", np.ascontiguousarray(ds.features, dtype=np.float32))
+    np.save(tmp / "labels.npy", np.asarray(ds.labels, dtype=np.int8))
+    np.save(tmp / "sources.npy", np.asarray(ds.sources, dtype=np.int32))
+    meta = {
+        "format": FORMAT_VERSION,
+        "num_samples": len(ds),
+        "num_features": ds.num_features,
+        "columns": ds.columns,
+        "layout": "x, y, z per landmark, landmark-major" if ds.num_features % 3 == 0 else "generic",
+        "labels": {str(k): v for k, v in LABEL_NAMES.items()},
+        "sources": ds.source_names,
+    }
+    with open(tmp / META_NAME, "w") as f:
+        json.dump(meta, f, indent=2)
+
+    if path.exists():
+        shutil.rmtree(path)
+    os.replace(tmp, path)
+    return path
+
+
+def load_dataset(path, mmap: bool = True) -> LandmarkDataset:
+    """
+    Load a dataset directory (arrays memory-mapped unless mmap=False).
+    If only the legacy CSV exists, it is imported and saved as a dataset first.
+    """
+    path = Path(path)
+    if not (path / META_NAME).exists():
+        legacy_csv = csv_path_for(path)
+        if not legacy_csv.exists():
+            raise FileNotFoundError(f"No dataset at {path} (or {legacy_csv})")
+        save_dataset(import_csv(legacy_csv), path)
+
+    with open(path / META_NAME) as f:
+        meta = json.load(f)
+    if meta.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dataset format {meta.get('format')!r} in {path}")
+
+    mmap_mode = "r" if mmap else None
+    return LandmarkDataset(
+        features=np.load(path / "features.npy", mmap_mode=mmap_mode),
+        labels=np.load(path / "labels.npy", mmap_mode=mmap_mode),
+        sources=np.load(path / "sources.npy", mmap_mode=mmap_mode),
+        columns=meta["columns"],
+        source_names=meta["sources"],
+    )
+
+
+def dataset_exists(path) -> bool:
+    """True if a dataset directory or its legacy CSV exists."""
+    path = Path(path)
+    return (path / META_NAME).exists() or csv_path_for(path).exists()
+
+
+def first_existing(candidates: Sequence) -> Optional[Path]:
+    for path in candidates:
+        if dataset_exists(path):
+            return Path(path)
+    return None
+
+
+def import_csv(csv_path) -> LandmarkDataset:
+    """Read a legacy feature columns + 'label' CSV."""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, dtype=np.float32)
+    columns = [c for c in df.columns if c != "label"]
+    return from_arrays(df[columns].to_numpy(), df["label"].to_numpy(), columns=columns)
+
+
+def export_csv(ds: LandmarkDataset, csv_path) -> Path:
+    """Write the dataset in the old CSV layout (feature columns + label)."""
+    ds.to_frame().to_csv(csv_path, index=False)
+    return Path(csv_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Write a dataset directory as CSV")
+    export.add_argument("dataset")
+    export.add_argument("csv", nargs="?")
+    imp = sub.add_parser("import", help="Convert a CSV into a dataset directory")
+    imp.add_argument("csv")
+    imp.add_argument("dataset", nargs="?")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        out = export_csv(load_dataset(args.dataset), args.csv or csv_path_for(args.dataset))
+        print(f"💾 Exported {args.dataset} -> {out}")
+    else:
+        out = save_dataset(import_csv(args.csv), args.dataset or Path(args.csv).with_suffix(""))
+        print(f"💾 Imported {args.csv} -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 import cv2
 import mediapipe as mp
-import csv
-import os
+import numpy as np
+
+from dataset_store import from_arrays, save_dataset
+from pose_features import fill_landmarks, model_features
 
 mp_pose = mp.solutions.pose
 pose = mp_pose.Pose(static_image_mode=False)
 
-def process_video(video_path, label, csv_writer):
+def process_video(video_path):
     cap = cv2.VideoCapture(video_path)
+    rows = []
 
     while cap.isOpened():
         ret, frame = cap.read()
@@ -18,31 +21,27 @@ def process_video(video_path, label, csv_writer):
         results = pose.process(image)
 
         if results.pose_landmarks:
-            row = []
-            for lm in results.pose_landmarks.landmark:
-                row.extend([lm.x, lm.y, lm.z])  # ✅ FIXED
-
-            row.append(label)
-            csv_writer.writerow(row)
+            rows.append(model_features(fill_landmarks(results.pose_landmarks)))
 
     cap.release()
+    return np.concatenate(rows) if rows else np.empty((0, 99), dtype=np.float32)
 
 
-from paths import DATASET_DIR
+from paths import DATASET_DIR, SQUAT_DATASET
 
 DATASET_DIR.mkdir(parents=True, exist_ok=True)
 
-with open((DATASET_DIR / "squat_dataset.csv"), "w", newline="") as f:
-    writer = csv.writer(f)
-
-    header = []
-    for i in range(33):
-        header += [f"x{i}", f"y{i}", f"z{i}"]  # ✅ FIXED
-    header.append("label")
-
-    writer.writerow(header)
-
-    process_video(str(DATASET_DIR / "squat_correct.mp4"), 1, writer)
-    process_video(str(DATASET_DIR / "squat_incorrect.mp4"), 0, writer)
+correct = process_video(str(DATASET_DIR / "squat_correct.mp4"))
+incorrect = process_video(str(DATASET_DIR / "squat_incorrect.mp4"))
+
+save_dataset(
+    from_arrays(
+        np.concatenate([correct, incorrect]),
+        [1] * len(correct) + [0] * len(incorrect),
+        [0] * len(correct) + [1] * len(incorrect),
+        ["squat_correct.mp4", "squat_incorrect.mp4"],
+    ),
+    SQUAT_DATASET,
+)
 
 print("Dataset created successfully!")
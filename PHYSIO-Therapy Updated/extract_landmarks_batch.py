@@ -1,37 +1,90 @@
 """
 Batch script to extract landmarks from multiple videos and add to dataset.
 This script processes all videos in the Dataset/Videos folder.
+
+Videos are extracted in parallel: each worker process owns its own MediaPipe
+Pose and handles whole videos, and results are written in a fixed order
+(Correct then Incorrect, sorted by file name) whatever order workers finish in.
+Landmarks are cached per video (see landmark_cache.py), so a re-run only
+extracts videos that are new or changed and rebuilds the dataset from the cache.
+Output is a binary dataset (see dataset_store.py); --csv also writes CSV copies.
+
+Usage:
+    python extract_landmarks_batch.py                # one worker per CPU core
+    python extract_landmarks_batch.py --workers 1    # sequential, in-process
+    python extract_landmarks_batch.py --no-cache     # re-extract everything
+    python extract_landmarks_batch.py --csv          # also export the datasets as CSV
 """
+import argparse
 import cv2
-import mediapipe as mp
-import csv
+import multiprocessing
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-# MediaPipe Pose setup
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose(static_image_mode=False)
+import numpy as np
+
+from dataset_store import (
+    concat,
+    csv_path_for,
+    dataset_exists,
+    drop_duplicates,
+    export_csv,
+    from_arrays,
+    load_dataset,
+    save_dataset,
+)
+from landmark_cache import LandmarkCache
+from pose_features import fill_landmarks
+
+VIDEO_EXTENSIONS = ['.mp4', '.mov', '.avi', '.mkv']
+
+# Pose options used for extraction (part of the landmark cache key)
+POSE_SETTINGS = {
+    "static_image_mode": False,
+    "model_complexity": 1,
+    "smooth_landmarks": True,
+    "min_detection_confidence": 0.5,
+    "min_tracking_confidence": 0.5,
+}
+
+# Per-process MediaPipe Pose, created lazily (or by the pool initializer)
+_pose = None
+
+
+def init_worker():
+    """Create this process's Pose instance. Used as the worker pool initializer."""
+    global _pose
+    import mediapipe as mp
+
+    # One OpenCV thread per worker: the pool already uses every core.
+    cv2.setNumThreads(1)
+    _pose = mp.solutions.pose.Pose(**POSE_SETTINGS)
+
 
-def process_video(video_path, label, csv_writer, video_name=""):
+def extract_video(video_path):
     """
-    Process a single video and extract landmarks.
+    Extract landmarks from every frame of one video with this process's Pose.
     
-    Args:
-        video_path: Path to video file
-        label: 1 for correct, 0 for incorrect
-        csv_writer: CSV writer object
-        video_name: Name of video (for progress tracking)
+    Returns:
+        (rows, frame_count) where rows is a float32 array of shape (N, 99)
+        holding x0, y0, z0, ..., x32, y32, z32 for each frame with a pose,
+        or (None, 0) if the video could not be opened.
     """
-    cap = cv2.VideoCapture(video_path)
-    
+    if _pose is None:
+        init_worker()
+    # Tracking state must not carry over from the previous video this worker handled.
+    _pose.reset()
+
+    cap = cv2.VideoCapture(str(video_path))
     if not cap.isOpened():
-        print(f"❌ Error: Could not open {video_path}")
-        return 0
+        return None, 0
     
     frame_count = 0
-    landmarks_extracted = 0
-    
-    print(f"  Processing: {video_name or os.path.basename(video_path)}...", end=" ")
+    detected = 0
+    # One (33, 4) slot per frame, sized from the container's frame count and grown if it lies
+    landmarks = np.empty((max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 1), 33, 4), dtype=np.float32)
     
     while cap.isOpened():
         ret, frame = cap.read()
@@ -42,64 +95,135 @@ def process_video(video_path, label, csv_writer, video_name=""):
         
         # Convert BGR to RGB
         image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = pose.process(image)
+        results = _pose.process(image)
         
         if results.pose_landmarks:
-            row = []
-            for lm in results.pose_landmarks.landmark:
-                row.extend([lm.x, lm.y, lm.z])
-            
-            row.append(label)
-            csv_writer.writerow(row)
-            landmarks_extracted += 1
+            if detected == len(landmarks):
+                landmarks = np.concatenate([landmarks, np.empty_like(landmarks)])
+            fill_landmarks(results.pose_landmarks, landmarks[detected])
+            detected += 1
     
     cap.release()
-    print(f"✅ Extracted {landmarks_extracted} landmarks from {frame_count} frames")
-    return landmarks_extracted
+    rows = np.ascontiguousarray(landmarks[:detected, :, :3]).reshape(detected, 99)
+    return rows, frame_count
 
 
-def process_folder(folder_path, label, csv_writer):
-    """
-    Process all videos in a folder.
-    
-    Args:
-        folder_path: Path to folder containing videos
-        label: 1 for correct, 0 for incorrect
-        csv_writer: CSV writer object
-    """
-    video_extensions = ['.mp4', '.mov', '.avi', '.mkv']
-    video_files = []
-    
+def find_videos(folder_path):
+    """Sorted list of video files in a folder (empty if the folder is missing)."""
     if not os.path.exists(folder_path):
         print(f"⚠️  Folder not found: {folder_path}")
-        return 0
+        return []
     
-    # Find all video files
-    for ext in video_extensions:
-        video_files.extend(Path(folder_path).glob(f'*{ext}'))
-        video_files.extend(Path(folder_path).glob(f'*{ext.upper()}'))
+    video_files = set()
+    for ext in VIDEO_EXTENSIONS:
+        video_files.update(Path(folder_path).glob(f'*{ext}'))
+        video_files.update(Path(folder_path).glob(f'*{ext.upper()}'))
     
     if not video_files:
         print(f"⚠️  No video files found in {folder_path}")
-        return 0
+    return sorted(video_files)
+
+
+def format_seconds(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+def extract_all(jobs, workers, cache=None):
+    """
+    Extract landmarks for a list of (video_path, label) jobs.
+    
+    Yields (video_path, label, rows, frame_count) in job order, printing
+    progress and ETA as videos finish. workers=1 runs in this process.
+    With a LandmarkCache, videos whose content and extraction settings are
+    unchanged are loaded from their cached shard instead of re-extracted.
+    """
+    hashes = [None] * len(jobs)
+    finished = {}
+    if cache is not None:
+        # Hashing is I/O-bound; threads keep the disk busy while the GIL is released.
+        with ThreadPoolExecutor(max_workers=8) as hasher:
+            hashes = list(hasher.map(cache.content_hash, [video_path for video_path, _ in jobs]))
+        cache.save_index()
+        for idx, content_hash in enumerate(hashes):
+            cached = cache.load(content_hash)
+            if cached is not None:
+                finished[idx] = cached
+        if finished:
+            print(f"  💾 {len(finished)} of {len(jobs)} videos unchanged, loaded from cache")
+    
+    pending = [idx for idx in range(len(jobs)) if idx not in finished]
+    total = len(pending)
+    started = time.perf_counter()
+    next_idx = 0
     
-    print(f"\n📁 Processing {len(video_files)} videos from {folder_path}")
-    total_landmarks = 0
+    def report(done, video_path, rows, frame_count):
+        elapsed = time.perf_counter() - started
+        eta = elapsed / done * (total - done)
+        if rows is None:
+            status = "❌ Could not open"
+        else:
+            status = f"✅ {len(rows)} landmarks from {frame_count} frames"
+        print(f"  [{done}/{total}] {video_path.name}: {status}   "
+              f"(elapsed {format_seconds(elapsed)}, ETA {format_seconds(eta)})")
     
-    for video_path in sorted(video_files):
-        landmarks = process_video(str(video_path), label, csv_writer, video_path.name)
-        total_landmarks += landmarks
+    def extracted(idx, rows, frame_count):
+        if cache is not None and rows is not None:
+            cache.store(hashes[idx], rows, frame_count)
+        finished[idx] = (rows, frame_count)
     
-    return total_landmarks
+    def ready():
+        # Hand results on in job order, as soon as the next one is ready
+        nonlocal next_idx
+        while next_idx in finished:
+            rows, frame_count = finished.pop(next_idx)
+            yield jobs[next_idx][0], jobs[next_idx][1], rows, frame_count
+            next_idx += 1
+    
+    yield from ready()
+    
+    if workers <= 1 or total <= 1:
+        for done, idx in enumerate(pending, start=1):
+            video_path = jobs[idx][0]
+            rows, frame_count = extract_video(video_path)
+            report(done, video_path, rows, frame_count)
+            extracted(idx, rows, frame_count)
+            yield from ready()
+        return
+    
+    # spawn, not fork: MediaPipe graphs and their threads must not be forked.
+    with ProcessPoolExecutor(
+        max_workers=min(workers, total),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+    ) as pool:
+        futures = {pool.submit(extract_video, jobs[idx][0]): idx for idx in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            idx = futures[future]
+            rows, frame_count = future.result()
+            report(done, jobs[idx][0], rows, frame_count)
+            extracted(idx, rows, frame_count)
+            yield from ready()
 
 
 def main():
     """Main function to process all videos and create/extend dataset."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes, each with its own Pose (default: one per CPU core)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-extract every video instead of reusing cached landmarks")
+    parser.add_argument("--csv", action="store_true",
+                        help="Also export the extracted/combined datasets as CSV")
+    args = parser.parse_args()
+    workers = max(1, args.workers)
+    cache = None if args.no_cache else LandmarkCache(POSE_SETTINGS)
+    
     print("=" * 70)
     print("🎬 BATCH LANDMARK EXTRACTION FROM VIDEOS")
     print("=" * 70)
     
-    from paths import DATASET_DIR, SQUAT_DATASET_CSV, SQUAT_DATASET_EXTENDED_CSV, SQUAT_DATASET_COMBINED_CSV
+    from paths import DATASET_DIR, SQUAT_DATASET, SQUAT_DATASET_EXTENDED, SQUAT_DATASET_COMBINED
     
     # Create Dataset directory if it doesn't exist
     DATASET_DIR.mkdir(parents=True, exist_ok=True)
@@ -111,36 +235,40 @@ def main():
     incorrect_dir.mkdir(exist_ok=True)
     
     # Check if existing dataset exists
-    existing_dataset = SQUAT_DATASET_CSV
-    output_dataset = SQUAT_DATASET_EXTENDED_CSV
+    existing_dataset = SQUAT_DATASET
+    output_dataset = SQUAT_DATASET_EXTENDED
+    
+    correct_videos = find_videos(correct_dir)
+    incorrect_videos = find_videos(incorrect_dir)
+    jobs = [(v, 1) for v in correct_videos] + [(v, 0) for v in incorrect_videos]
+    workers = min(workers, max(1, len(jobs)))
     
-    # Create CSV header
-    header = []
-    for i in range(33):
-        header += [f"x{i}", f"y{i}", f"z{i}"]
-    header.append("label")
+    print(f"\n🎬 Processing {len(correct_videos)} correct + {len(incorrect_videos)} incorrect videos "
+          f"with {workers} worker{'s' if workers != 1 else ''}")
     
-    total_correct = 0
-    total_incorrect = 0
+    features, labels, sources, source_names = [], [], [], []
     
     # Process videos
-    with open(output_dataset, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(header)
-        
-        # Process correct videos
-        print("\n" + "=" * 70)
-        print("✅ PROCESSING CORRECT SQUAT VIDEOS")
-        print("=" * 70)
-        correct_folder = str(correct_dir)
-        total_correct = process_folder(correct_folder, 1, writer)
-        
-        # Process incorrect videos
-        print("\n" + "=" * 70)
-        print("❌ PROCESSING INCORRECT SQUAT VIDEOS")
-        print("=" * 70)
-        incorrect_folder = str(incorrect_dir)
-        total_incorrect = process_folder(incorrect_folder, 0, writer)
+    for video_path, label, rows, _ in extract_all(jobs, workers, cache):
+        if rows is None:
+            continue
+        features.append(rows)
+        labels.append(np.full(len(rows), label, dtype=np.int8))
+        sources.append(np.full(len(rows), len(source_names), dtype=np.int32))
+        source_names.append(f"{video_path.parent.name}/{video_path.name}")
+    
+    if features:
+        new_dataset = from_arrays(np.concatenate(features), np.concatenate(labels),
+                                  np.concatenate(sources), source_names)
+    else:
+        new_dataset = from_arrays(np.empty((0, 99), np.float32), [], [], [])
+    save_dataset(new_dataset, output_dataset)
+    if args.csv:
+        export_csv(new_dataset, csv_path_for(output_dataset))
+    
+    label_counts = new_dataset.label_counts()
+    total_correct = label_counts.get(1, 0)
+    total_incorrect = label_counts.get(0, 0)
     
     # Summary
     print("\n" + "=" * 70)
@@ -152,39 +280,39 @@ def main():
     print(f"\n💾 Dataset saved to: {output_dataset}")
     
     # Check if we should merge with existing dataset
-    if os.path.exists(existing_dataset):
+    if dataset_exists(existing_dataset):
         print("\n" + "=" * 70)
         print("🔄 MERGING WITH EXISTING DATASET")
         print("=" * 70)
         
-        import pandas as pd
-        
         # Load existing dataset
-        existing_df = pd.read_csv(existing_dataset)
-        new_df = pd.read_csv(output_dataset)
+        existing = load_dataset(existing_dataset)
         
         # Combine datasets
-        combined_df = pd.concat([existing_df, new_df], ignore_index=True)
+        combined = concat([existing, new_dataset])
         
         # Remove duplicates (if any)
-        initial_count = len(combined_df)
-        combined_df = combined_df.drop_duplicates()
-        duplicates_removed = initial_count - len(combined_df)
+        initial_count = len(combined)
+        combined = drop_duplicates(combined)
+        duplicates_removed = initial_count - len(combined)
         
         # Save combined dataset
-        combined_output = SQUAT_DATASET_COMBINED_CSV
-        combined_df.to_csv(combined_output, index=False)
+        combined_output = SQUAT_DATASET_COMBINED
+        save_dataset(combined, combined_output)
+        if args.csv:
+            export_csv(combined, csv_path_for(combined_output))
         
-        print(f"✅ Existing samples: {len(existing_df)}")
-        print(f"✅ New samples: {len(new_df)}")
-        print(f"✅ Combined total: {len(combined_df)}")
+        print(f"✅ Existing samples: {len(existing)}")
+        print(f"✅ New samples: {len(new_dataset)}")
+        print(f"✅ Combined total: {len(combined)}")
         if duplicates_removed > 0:
             print(f"⚠️  Removed {duplicates_removed} duplicate samples")
         print(f"\n💾 Combined dataset saved to: {combined_output}")
         
         # Show distribution
         print("\n📊 Label Distribution:")
-        print(combined_df['label'].value_counts())
+        for label, count in sorted(combined.label_counts().items(), reverse=True):
+            print(f"   {label}: {count}")
     
     print("\n" + "=" * 70)
     print("✅ EXTRACTION COMPLETE!")
@@ -1,46 +1,51 @@
 """
 Fix feature mismatch: Extract first 99 features (33 landmarks) to match MediaPipe.
 """
-import pandas as pd
-import os
+from dataset_store import LandmarkDataset, dataset_exists, load_dataset, save_dataset
+from paths import SQUAT_DATASET_FIXED, SQUAT_DATASET_FROM_NPY
 
 print("=" * 70)
 print("🔧 FIXING FEATURE MISMATCH")
 print("=" * 70)
 
-input_file = "Dataset/squat_dataset_from_npy.csv"
-output_file = "Dataset/squat_dataset_fixed.csv"
+input_file = SQUAT_DATASET_FROM_NPY
+output_file = SQUAT_DATASET_FIXED
 
-if not os.path.exists(input_file):
+if not dataset_exists(input_file):
     print(f"❌ Error: {input_file} not found!")
     exit(1)
 
 print(f"\n📊 Loading dataset: {input_file}")
-df = pd.read_csv(input_file)
+dataset = load_dataset(input_file)
 
-print(f"   Original features: {len(df.columns) - 1}")
-print(f"   Samples: {len(df):,}")
+print(f"   Original features: {dataset.num_features}")
+print(f"   Samples: {len(dataset):,}")
 
 # Extract first 99 features (33 landmarks × 3 coordinates)
 # Features are: x0,y0,z0, x1,y1,z1, ..., x32,y32,z32 (99 total)
-feature_cols = [col for col in df.columns if col != 'label']
-first_99_features = feature_cols[:99]
+first_99_features = dataset.columns[:99]
 
 print(f"\n✂️  Extracting first 99 features (33 landmarks)...")
 print(f"   Features: x0-z0 to x32-z32")
 
-# Create new dataframe with first 99 features + label
-df_fixed = df[first_99_features + ['label']].copy()
+# Keep the first 99 feature columns; labels and sources are unchanged
+fixed = LandmarkDataset(
+    features=dataset.features[:, :99],
+    labels=dataset.labels,
+    sources=dataset.sources,
+    columns=first_99_features,
+    source_names=dataset.source_names,
+)
 
 # Verify
 print(f"\n✅ Fixed dataset:")
-print(f"   Features: {len(df_fixed.columns) - 1}")
-print(f"   Samples: {len(df_fixed):,}")
-print(f"   Matches MediaPipe: {len(df_fixed.columns) - 1 == 99}")
+print(f"   Features: {fixed.num_features}")
+print(f"   Samples: {len(fixed):,}")
+print(f"   Matches MediaPipe: {fixed.num_features == 99}")
 
 # Save
 print(f"\n💾 Saving to: {output_file}")
-df_fixed.to_csv(output_file, index=False)
+save_dataset(fixed, output_file)
 
 print("\n" + "=" * 70)
 print("✅ FEATURE MISMATCH FIXED!")
@@ -0,0 +1,180 @@
+"""
+Flattened random forest inference in pure NumPy.
+
+``export_forest`` writes a fitted RandomForestClassifier as a directory of
+contiguous node arrays (every tree's nodes concatenated, child indices made
+global):
+
+    feature.npy     int32   (nodes,)     split feature (0 at leaves)
+    threshold.npy   float64 (nodes,)     go left if x[feature] <= threshold
+    children.npy    int32   (nodes, 2)   [right, left] child; leaves point to themselves
+    leaf_proba.npy  float64 (nodes, n_classes)  normalized class distribution
+    roots.npy       int32   (trees,)     root node of each tree
+    meta.json       classes, n_features, feature names, max_depth, source model hash
+
+``FlatForest`` walks all (row, tree) pairs one level per step with
+vectorized gathers (next node = children[node, x <= threshold]), so a batch
+costs ``max_depth`` NumPy steps instead of one Python-level call per tree.
+Pairs that reached a leaf are dropped every few levels. It reproduces
+sklearn's arithmetic (float32 inputs compared against float64 thresholds,
+per-tree normalization, trees summed in order then divided by the tree
+count), so probabilities match ``predict_proba`` exactly.
+
+Per-step NumPy overhead makes this the faster path for small batches (the
+live endpoint's single frames, up to a few hundred rows); sklearn's compiled
+loop wins on large ones. See bench_forest_engine.py.
+"""
+import json
+import os
+import shutil
+from pathlib import Path
+
+from typing import List, Optional
+
+import numpy as np
+
+FORMAT_VERSION = 1
+META_NAME = "meta.json"
+ARRAY_NAMES = ("feature", "threshold", "children", "leaf_proba", "roots")
+
+# Drop (row, tree) pairs that already reached a leaf every this many levels
+COMPACT_EVERY = 4
+
+
+def forest_dir_for(model_path) -> Path:
+    """Flattened forest directory stored next to a model pickle (squat_model.pkl -> squat_model_forest/)."""
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.stem + "_forest")
+
+
+def export_forest(forest, out_dir, source_sha256: str = "", feature_names: Optional[List[str]] = None) -> Path:
+    """Flatten a fitted RandomForestClassifier into ``out_dir``."""
+    features, thresholds, children, probas, roots = [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        own = np.arange(tree.node_count)
+
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+        right = np.where(is_leaf, own, tree.children_right)
+        left = np.where(is_leaf, own, tree.children_left)
+        children.append((np.stack([right, left], axis=1) + offset).astype(np.int32))
+
+        # Same normalization as DecisionTreeClassifier.predict_proba
+        value = tree.value[:, 0, :].astype(np.float64)
+        normalizer = value.sum(axis=1)
+        normalizer[normalizer == 0.0] = 1.0
+        probas.append(value / normalizer[:, None])
+
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, int(tree.max_depth))
+
+    out_dir = Path(out_dir)
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    arrays = {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "children": np.concatenate(children),
+        "leaf_proba": np.ascontiguousarray(np.concatenate(probas)),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+    for name, array in arrays.items():
+        np.save(tmp / f"{name}.npy", array)
+    meta = {
+        "format": FORMAT_VERSION,
+        "classes": np.asarray(forest.classes_).tolist(),
+        "n_features": int(forest.n_features_in_),
+        "feature_names": list(feature_names) if feature_names is not None else None,
+        "n_trees": len(roots),
+        "n_nodes": offset,
+        "max_depth": max_depth,
+        "source_sha256": source_sha256,
+    }
+    with open(tmp / META_NAME, "w") as f:
+        json.dump(meta, f, indent=2)
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    os.replace(tmp, out_dir)
+    return out_dir
+
+
+class FlatForest:
+    def __init__(self, arrays: dict, meta: dict):
+        # Plain ndarray views, so memory-mapped arrays skip np.memmap's subclass overhead
+        arrays = {name: np.asarray(array) for name, array in arrays.items()}
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.children = arrays["children"]
+        self.leaf_proba = arrays["leaf_proba"]
+        self.roots = arrays["roots"]
+        self.meta = meta
+        self.classes_ = np.asarray(meta["classes"])
+        self.n_features = int(meta["n_features"])
+        self.n_trees = len(self.roots)
+        self.max_depth = int(meta["max_depth"])
+        # Flat view: children[node, go_left] == next_node[2 * node + go_left]
+        self.next_node = self.children.reshape(-1)
+        self.is_leaf = self.children[:, 1] == np.arange(len(self.children))
+
+    @classmethod
+    def load(cls, forest_dir, mmap_mode=None) -> "FlatForest":
+        """Load an exported forest; mmap_mode='r' maps the arrays instead of reading them."""
+        forest_dir = Path(forest_dir)
+        with open(forest_dir / META_NAME) as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported forest format {meta.get('format')!r} in {forest_dir}")
+        arrays = {name: np.load(forest_dir / f"{name}.npy", mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        return cls(arrays, meta)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """(n_trees, N) leaf node index reached by every row in every tree."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected (N, {self.n_features}) features, got shape {X.shape}")
+
+        n_rows = len(X)
+        flat_x = X.reshape(-1)
+        # Tree-major (row, tree) pairs: consecutive pairs share a tree's nodes
+        nodes = np.repeat(self.roots, n_rows)
+        row_offsets = np.tile(np.arange(n_rows, dtype=np.intp) * self.n_features, self.n_trees)
+        leaves = positions = None  # allocated once pairs start being dropped
+
+        for depth in range(1, self.max_depth + 1):
+            index = np.take(self.feature, nodes) + row_offsets
+            go_left = np.take(flat_x, index) <= np.take(self.threshold, nodes)
+            nodes = np.take(self.next_node, 2 * nodes + go_left)
+
+            if depth % COMPACT_EVERY == 0 and depth < self.max_depth:
+                active = ~np.take(self.is_leaf, nodes)
+                if not active.all():
+                    if positions is None:
+                        leaves, positions = np.empty_like(nodes), np.arange(len(nodes))
+                    leaves[positions] = nodes
+                    nodes, row_offsets, positions = nodes[active], row_offsets[active], positions[active]
+                    if not len(nodes):
+                        break
+
+        if positions is None:
+            leaves = nodes
+        else:
+            leaves[positions] = nodes
+        return leaves.reshape(self.n_trees, n_rows)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+        # (trees, N, classes) -> sum over trees in order, as sklearn accumulates them
+        proba = np.add.reduce(self.leaf_proba[leaves], axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -0,0 +1,144 @@
+"""
+Bounded executor that keeps blocking CV/ML work off the asyncio event loop.
+
+Jobs run on a thread pool (default) or a process pool whose workers preload
+the model through ``initializer``. Admission is bounded: once ``max_workers``
+jobs are running and ``max_queue`` more are waiting, new jobs are rejected
+immediately with ``ExecutorSaturated`` instead of piling up. Every job has a
+deadline; a job that misses it raises ``DeadlineExceeded`` and is cancelled
+if it has not started yet.
+
+In process mode every worker keeps its own state (the model and the
+per-session MediaPipe trackers), so each worker gets its own single-process
+pool and a job submitted with an ``affinity`` key (the session ID) always
+runs on the worker that key hashes to. Jobs without a key go to the least
+busy worker.
+"""
+import asyncio
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when the executor queue is full."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a job does not finish before its deadline."""
+
+
+class InferenceExecutor:
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        deadline: float = 2.0,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = (),
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown executor mode: {mode!r} (expected 'thread' or 'process')")
+
+        self.mode = mode
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_queue = self.max_workers * 2 if max_queue is None else max_queue
+        self.deadline = deadline
+
+        if mode == "process":
+            # spawn, not fork: MediaPipe graphs and their threads must not be forked.
+            context = multiprocessing.get_context("spawn")
+            self._pools: List[Executor] = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=initializer, initargs=initargs)
+                for _ in range(self.max_workers)
+            ]
+        else:
+            # Threads share one process (and its tracker pool): no affinity needed
+            self._pools = [
+                ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="inference",
+                    initializer=initializer,
+                    initargs=initargs,
+                )
+            ]
+
+        # Only touched from the event loop thread.
+        self._pending = 0
+        self._pool_pending = [0] * len(self._pools)
+        self._counters = {
+            "submitted": 0,
+            "finished": 0,
+            "rejected": 0,
+            "deadline_exceeded": 0,
+        }
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _pool_index(self, affinity: Optional[str]) -> int:
+        if len(self._pools) == 1:
+            return 0
+        if affinity:
+            # Stable across processes and restarts, unlike hash()
+            return zlib.crc32(affinity.encode("utf-8")) % len(self._pools)
+        return min(range(len(self._pools)), key=self._pool_pending.__getitem__)
+
+    async def run(
+        self, fn: Callable, *args, deadline: Optional[float] = None, affinity: Optional[str] = None
+    ) -> Any:
+        """Run ``fn(*args)`` in the pool and await its result. Jobs with the same
+        ``affinity`` key run on the same worker process."""
+        if self._pending >= self.capacity:
+            self._counters["rejected"] += 1
+            raise ExecutorSaturated(
+                f"Inference queue is full ({self._pending} jobs pending); try again shortly."
+            )
+
+        loop = asyncio.get_running_loop()
+        index = self._pool_index(affinity)
+        self._pending += 1
+        self._pool_pending[index] += 1
+        self._counters["submitted"] += 1
+        try:
+            job = self._pools[index].submit(fn, *args)
+        except BaseException:
+            self._pending -= 1
+            self._pool_pending[index] -= 1
+            raise
+        # The slot is released when the job really finishes, not when the caller
+        # stops waiting, so timed-out jobs still count against the queue bound.
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._job_done, index))
+
+        timeout = self.deadline if deadline is None else deadline
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout)
+        except asyncio.TimeoutError:
+            job.cancel()
+            self._counters["deadline_exceeded"] += 1
+            raise DeadlineExceeded(f"Inference did not finish within {timeout:.2f}s")
+
+    def _job_done(self, index: int) -> None:
+        self._pending -= 1
+        self._pool_pending[index] -= 1
+        self._counters["finished"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._counters)
+        stats.update(
+            mode=self.mode,
+            max_workers=self.max_workers,
+            max_queue=self.max_queue,
+            pending=self._pending,
+        )
+        if len(self._pools) > 1:
+            stats["pending_per_worker"] = list(self._pool_pending)
+        return stats
+
+    def shutdown(self) -> None:
+        for pool in self._pools:
+            pool.shutdown(wait=False, cancel_futures=True)
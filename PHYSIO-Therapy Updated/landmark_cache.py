@@ -0,0 +1,108 @@
+"""
+Per-video landmark cache for extract_landmarks_batch.py.
+
+Each video's extracted landmarks are stored as one compressed .npz shard,
+keyed by the SHA-256 of the video's bytes plus a fingerprint of the
+extraction settings (MediaPipe version and Pose options). Renaming or moving
+a video keeps its cache hit; re-encoding it, upgrading MediaPipe or changing
+a Pose option is a miss, so only new or changed videos are re-extracted.
+
+A small index (path, size, mtime -> hash) avoids re-hashing unchanged files.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from paths import LANDMARK_CACHE_DIR
+
+# Bump when the extracted array layout changes
+CACHE_FORMAT_VERSION = 1
+
+INDEX_NAME = "index.json"
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_fingerprint(pose_settings: dict) -> str:
+    """Short hash of everything besides the video bytes that affects extraction."""
+    import mediapipe as mp
+
+    payload = json.dumps(
+        {
+            "format": CACHE_FORMAT_VERSION,
+            "mediapipe": mp.__version__,
+            "pose": pose_settings,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class LandmarkCache:
+    def __init__(self, pose_settings: dict, cache_dir=LANDMARK_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.fingerprint = settings_fingerprint(pose_settings)
+        self._index_path = self.cache_dir / INDEX_NAME
+        self._index: Dict[str, list] = self._load_index()
+        self._lock = threading.Lock()
+
+    def _load_index(self) -> Dict[str, list]:
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self) -> None:
+        with self._lock:
+            tmp = self._index_path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(self._index, f)
+            os.replace(tmp, self._index_path)
+
+    def content_hash(self, video_path) -> str:
+        """SHA-256 of the video, reused from the index while size and mtime are unchanged."""
+        video_path = Path(video_path)
+        stat = video_path.stat()
+        key = str(video_path.resolve())
+        with self._lock:
+            entry = self._index.get(key)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+
+        digest = file_sha256(video_path)
+        with self._lock:
+            self._index[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def shard_path(self, content_hash: str) -> Path:
+        return self.cache_dir / f"{content_hash}-{self.fingerprint}.npz"
+
+    def load(self, content_hash: str) -> Optional[Tuple[np.ndarray, int]]:
+        """(landmarks, frame_count) for a cached video, or None on a miss."""
+        path = self.shard_path(content_hash)
+        try:
+            with np.load(path) as shard:
+                return shard["landmarks"], int(shard["frame_count"])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def store(self, content_hash: str, landmarks: np.ndarray, frame_count: int) -> None:
+        path = self.shard_path(content_hash)
+        # Write to a temp file first so an interrupted run never leaves a truncated shard.
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez_compressed(tmp, landmarks=landmarks, frame_count=np.int64(frame_count))
+        os.replace(tmp, path)
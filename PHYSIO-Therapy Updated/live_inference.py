@@ -1,18 +1,39 @@
+"""
+Live squat detection from the webcam, or scoring of a recorded video.
+
+Usage:
+    python live_inference.py
+    python live_inference.py --video Dataset/squat_correct.mp4
+"""
+import argparse
+
 import cv2
 import mediapipe as mp
-import numpy as np
-import joblib
+
+from paths import DEFAULT_MODEL_PATH
+from pose_features import fill_landmarks, model_features, new_landmark_buffer
+from squat_classifier import SquatClassifier
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--video", help="Video file to score instead of the webcam")
+args = parser.parse_args()
 
 # Load trained model
-model = joblib.load("Models/squat_model.pkl")
+model = SquatClassifier.load(DEFAULT_MODEL_PATH)
 
 # MediaPipe Pose
 mp_pose = mp.solutions.pose
 pose = mp_pose.Pose()
 mp_draw = mp.solutions.drawing_utils
 
-# Webcam
-cap = cv2.VideoCapture(0)
+# Reused every frame
+landmark_buffer = new_landmark_buffer()
+feature_buffer = model_features(landmark_buffer)
+
+# Webcam or video file
+cap = cv2.VideoCapture(args.video if args.video else 0)
+frames_scored = 0
+frames_correct = 0
 
 while cap.isOpened():
     ret, frame = cap.read()
@@ -24,22 +45,21 @@ while cap.isOpened():
     result = pose.process(rgb)
 
     if result.pose_landmarks:
-        landmarks = []
-
-        for lm in result.pose_landmarks.landmark:
-            landmarks.extend([lm.x, lm.y, lm.z])
-
-        # Convert to numpy & reshape
-        landmarks = np.array(landmarks).reshape(1, -1)
+        # Fill the reused (33, 4) buffer and (1, 99) feature row
+        fill_landmarks(result.pose_landmarks, landmark_buffer)
+        landmarks = model_features(landmark_buffer, feature_buffer)
 
         # Prediction
-        prediction = model.predict(landmarks)[0]
+        labels, confidences = model.predict_batch(landmarks)
+        prediction, confidence = labels[0], confidences[0]
+        frames_scored += 1
+        frames_correct += int(prediction == 1)
 
         if prediction == 1:
-            label = "Correct Squat"
+            label = f"Correct Squat ({confidence:.0%})"
             color = (0, 255, 0)
         else:
-            label = "Incorrect Squat"
+            label = f"Incorrect Squat ({confidence:.0%})"
             color = (0, 0, 255)
 
         # Draw landmarks
@@ -67,3 +87,6 @@ while cap.isOpened():
 
 cap.release()
 cv2.destroyAllWindows()
+
+if frames_scored:
+    print(f"Scored {frames_scored} frames: {frames_correct / frames_scored:.0%} correct form")
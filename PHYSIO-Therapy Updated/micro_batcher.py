@@ -0,0 +1,129 @@
+"""
+Request coalescer for squat classification.
+
+Concurrent requests each hand one feature row to ``MicroBatcher.submit``.
+Rows that arrive within ``max_wait`` seconds of the first waiting one (or
+until ``max_batch`` rows are waiting) are stacked and classified with a
+single ``predict_batch`` call on a dedicated thread, and every caller gets
+its own (label, confidence) back. Rows arriving while a batch is being
+classified wait for the next one, so under load batches grow on their own.
+
+``max_batch=1`` turns coalescing off (every row is classified immediately).
+The event loop only appends rows and resolves futures; it never runs the
+model.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _bucket(size: int) -> str:
+    """Histogram bucket of a batch size: 1, 2, 3-4, 5-8, 9-16, ..."""
+    if size <= 2:
+        return str(size)
+    upper = 1 << (size - 1).bit_length()
+    return f"{upper // 2 + 1}-{upper}"
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        predict_batch: Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray]],
+        max_batch: int = 32,
+        max_wait: float = 0.002,
+    ):
+        if max_batch < 1:
+            raise ValueError(f"max_batch must be at least 1, got {max_batch}")
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="classify")
+
+        # Only touched from the event loop thread.
+        self._rows: List[np.ndarray] = []
+        self._waiters: List[asyncio.Future] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._histogram: Dict[str, int] = {}
+        self._counters = {
+            "rows": 0,
+            "batches": 0,
+            "full_flushes": 0,
+            "timer_flushes": 0,
+            "errors": 0,
+        }
+
+    async def submit(self, features: np.ndarray) -> Tuple[int, float]:
+        """(label, confidence) for one (1, n_features) or (n_features,) row."""
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._rows.append(np.asarray(features, dtype=np.float32).reshape(1, -1))
+        self._waiters.append(waiter)
+
+        if len(self._rows) >= self.max_batch:
+            self._counters["full_flushes"] += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._on_timer)
+        return await waiter
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        if self._rows:
+            self._counters["timer_flushes"] += 1
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        rows, waiters = self._rows, self._waiters
+        self._rows, self._waiters = [], []
+
+        size = len(rows)
+        self._counters["rows"] += size
+        self._counters["batches"] += 1
+        bucket = _bucket(size)
+        self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+
+        batch = rows[0] if size == 1 else np.concatenate(rows)
+        job = asyncio.get_running_loop().run_in_executor(self._pool, self.predict_batch, batch)
+        job.add_done_callback(lambda done: self._resolve(done, waiters))
+
+    def _resolve(self, done: asyncio.Future, waiters: List[asyncio.Future]) -> None:
+        if done.cancelled():
+            # shutdown() cancelled the batch before it ran; exception() would raise here
+            for waiter in waiters:
+                waiter.cancel()
+            return
+        error = done.exception()
+        if error is not None:
+            self._counters["errors"] += 1
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(error)
+            return
+
+        labels, confidences = done.result()
+        for waiter, label, confidence in zip(waiters, labels.tolist(), confidences.tolist()):
+            # A caller that gave up (disconnect, deadline) leaves a cancelled future
+            if not waiter.done():
+                waiter.set_result((int(label), float(confidence)))
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._counters)
+        batches = stats["batches"]
+        stats.update(
+            max_batch=self.max_batch,
+            max_wait_ms=round(self.max_wait * 1000, 3),
+            waiting=len(self._rows),
+            mean_batch_size=round(stats["rows"] / batches, 2) if batches else 0.0,
+            batch_size_histogram=dict(
+                sorted(self._histogram.items(), key=lambda item: int(item[0].split("-")[0]))
+            ),
+        )
+        return stats
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
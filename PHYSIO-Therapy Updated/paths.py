@@ -7,11 +7,19 @@ PROJECT_ROOT = Path(__file__).resolve().parent
 DATASET_DIR = PROJECT_ROOT / "Dataset"
 MODELS_DIR = PROJECT_ROOT / "Models"
 SQUAT_DATA_DIR = PROJECT_ROOT / "Squat_Data"
+LANDMARK_CACHE_DIR = DATASET_DIR / "landmark_cache"
 
 # Common files
 DEFAULT_MODEL_PATH = MODELS_DIR / "squat_model.pkl"
 
-# Frequently used datasets
+# Frequently used datasets (binary dataset directories, see dataset_store.py)
+SQUAT_DATASET = DATASET_DIR / "squat_dataset"
+SQUAT_DATASET_FIXED = DATASET_DIR / "squat_dataset_fixed"
+SQUAT_DATASET_FROM_NPY = DATASET_DIR / "squat_dataset_from_npy"
+SQUAT_DATASET_EXTENDED = DATASET_DIR / "squat_dataset_extended"
+SQUAT_DATASET_COMBINED = DATASET_DIR / "squat_dataset_combined"
+
+# CSV exports of the datasets above (also read once as legacy input)
 SQUAT_DATASET_CSV = DATASET_DIR / "squat_dataset.csv"
 SQUAT_DATASET_FIXED_CSV = DATASET_DIR / "squat_dataset_fixed.csv"
 SQUAT_DATASET_FROM_NPY_CSV = DATASET_DIR / "squat_dataset_from_npy.csv"
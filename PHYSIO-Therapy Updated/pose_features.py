@@ -0,0 +1,87 @@
+"""
+Landmark arrays straight from MediaPipe Pose results.
+
+``fill_landmarks`` writes a result's 33 landmarks into a float32 (33, 4)
+buffer (x, y, z, visibility) without building Python lists: the
+NormalizedLandmarkList is serialized once and its fixed-width protobuf
+records are read through a strided NumPy view of the bytes. Lists whose wire layout is
+not the expected fixed one (e.g. an unset field) fall back to a
+per-landmark loop, so the result is always the same.
+
+Keypoints and model features are then taken from that array:
+``landmarks[:, :2]`` / ``landmarks[:, 3]`` are views, and ``model_features``
+copies x, y, z into a (1, 99) float32 row (what the forest consumes without
+further conversion).
+"""
+from typing import Optional
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+NUM_FEATURES = NUM_LANDMARKS * 3
+
+
+def _record_layout(with_presence: bool):
+    # Each landmark is a length-delimited submessage (tag 0x0a, 1-byte length)
+    # holding fixed32 fields x=1, y=2, z=3, visibility=4[, presence=5], each
+    # a 1-byte tag followed by a little-endian float32.
+    field_count = 5 if with_presence else 4
+    stride = 2 + 5 * field_count
+    tag_columns = [0, 1] + [2 + 5 * i for i in range(field_count)]
+    tag_values = [0x0A, 5 * field_count] + [(i + 1) << 3 | 5 for i in range(field_count)]
+    # Expected bytes of each tag column across all 33 records
+    tag_checks = [(column, bytes([value]) * NUM_LANDMARKS) for column, value in zip(tag_columns, tag_values)]
+    return stride, tag_checks
+
+
+# Serialized size -> (record stride, [(tag byte column, expected bytes)])
+_LAYOUTS = {}
+for _with_presence in (True, False):
+    _layout = _record_layout(_with_presence)
+    _LAYOUTS[NUM_LANDMARKS * _layout[0]] = _layout
+
+
+def new_landmark_buffer() -> np.ndarray:
+    return np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+
+
+def fill_landmarks(landmark_list, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Copy a NormalizedLandmarkList (e.g. ``result.pose_landmarks``) into a
+    float32 (33, 4) array of x, y, z, visibility. Allocates one if ``out`` is None.
+    """
+    if out is None:
+        out = new_landmark_buffer()
+
+    raw = landmark_list.SerializeToString()
+    layout = _LAYOUTS.get(len(raw))
+    if layout is not None:
+        stride, tag_checks = layout
+        if all(raw[column::stride] == expected for column, expected in tag_checks):
+            # x, y, z, visibility: 4 floats, 5 bytes apart, starting after the first tag
+            out[:] = np.ndarray((NUM_LANDMARKS, 4), dtype="<f4", buffer=raw, offset=3, strides=(stride, 5))
+            return out
+
+    landmarks = landmark_list.landmark
+    if len(landmarks) != NUM_LANDMARKS:
+        raise ValueError(f"Expected {NUM_LANDMARKS} landmarks, got {len(landmarks)}")
+    for i, lm in enumerate(landmarks):
+        out[i] = (lm.x, lm.y, lm.z, lm.visibility)
+    return out
+
+
+def model_features(landmarks: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Model input row x0, y0, z0, ..., x32, y32, z32 as float32 (1, 99)."""
+    if out is None:
+        out = np.empty((1, NUM_FEATURES), dtype=np.float32)
+    out.reshape(NUM_LANDMARKS, 3)[:] = landmarks[:, :3]
+    return out
+
+
+def pixel_keypoints(landmarks: np.ndarray, image_shape) -> np.ndarray:
+    """(33, 3) array of pixel x, pixel y, visibility for a (33, 4) landmark array."""
+    h, w = image_shape[:2]
+    keypoints = np.empty((len(landmarks), 3), dtype=np.float64)
+    np.multiply(landmarks[:, :2], (w, h), out=keypoints[:, :2])
+    keypoints[:, 2] = landmarks[:, 3]
+    return keypoints
@@ -0,0 +1,333 @@
+"""
+Single-pass pose inference pipeline.
+
+Runs MediaPipe Pose once per frame and hands the resulting landmarks to
+keypoint building, feature extraction and classification, so a frame is
+never decoded or pose-detected twice.
+
+Encoded frames go through ``decode_frame``: large JPEGs are decoded at a
+reduced scale, and the frame reaches MediaPipe as one RGB array no larger
+than ``input_size`` (MediaPipe resizes to its own small input anyway).
+Landmarks are normalized, so keypoints still map to the original frame's
+pixels through ``PoseAnalysis.image_shape``. With ``roi_padding`` set, later
+frames of a session are cropped to the region around the previous pose
+(roi_tracker.py) and the landmarks are mapped back to the full frame.
+
+OpenCV is imported on first decode/detect, so landmark-only users (and
+importing this module) do not pay for it.
+"""
+import base64
+import binascii
+import struct
+import threading
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from paths import DEFAULT_MODEL_PATH
+from pose_features import NUM_LANDMARKS, fill_landmarks, model_features
+from pose_pool import PosePool
+from rep_detector import RepEvent
+from roi_tracker import RoiTracker, crop_pixels, to_full_frame
+from squat_classifier import SquatClassifier
+
+
+# Longest side of the image handed to MediaPipe; larger frames are downscaled
+# while decoding. None or 0 keeps the full resolution.
+DEFAULT_INPUT_SIZE = 640
+
+# JPEG start-of-frame markers (baseline, progressive, ...) that carry the image size
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _image_bytes(data: Union[str, bytes]) -> bytes:
+    """Raw image bytes from bytes, a raw base64 string or a data URL. Raises ValueError if empty."""
+    if isinstance(data, str):
+        if "," in data:
+            data = data.split(",", 1)[1]
+        try:
+            data = base64.b64decode(data)
+        except (binascii.Error, ValueError) as e:
+            raise ValueError(f"Invalid base64 image data: {e}")
+    if not data:
+        # cv2.imdecode asserts on an empty buffer instead of returning None
+        raise ValueError("Empty image data.")
+    return data
+
+
+def encoded_image_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """(width, height) read from a JPEG or PNG header, or None for other/unknown data."""
+    if data[:8] == _PNG_SIGNATURE and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    if data[:2] != b"\xff\xd8":
+        return None
+
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+        elif marker == 0x01 or 0xD0 <= marker <= 0xD7:  # markers without a length
+            i += 2
+        elif marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        else:
+            i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+
+def decode_image(data: Union[str, bytes]) -> np.ndarray:
+    """
+    Decode a frame to a full-resolution BGR array. Accepts raw image bytes
+    (decoded in place, without a copy), a raw base64 string or a data URL like
+    'data:image/jpeg;base64,/9j/4AAQ...'.
+    Raises ValueError if the data cannot be decoded.
+    """
+    import cv2
+
+    img = cv2.imdecode(np.frombuffer(_image_bytes(data), np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not decode image.")
+    return img
+
+
+def decode_frame(
+    data: Union[str, bytes], max_side: Optional[int] = DEFAULT_INPUT_SIZE
+) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """
+    Decode a frame (same inputs as ``decode_image``) straight to the RGB array
+    MediaPipe takes, with its longest side at most ``max_side``, plus the
+    original (height, width).
+
+    A JPEG whose longest side is at least 2×/4×/8× ``max_side`` is decoded at
+    1/2, 1/4 or 1/8 scale by libjpeg. What remains is one resize;
+    OpenCV 4.10+ decodes to RGB directly, older versions swap channels after
+    the resize, on the small image.
+    """
+    import cv2
+
+    data = _image_bytes(data)
+    size = encoded_image_size(data)
+
+    flags = cv2.IMREAD_COLOR
+    if size and max_side:
+        ratio = max(size) // max_side
+        for reduction, reduced_flags in (
+            (8, cv2.IMREAD_REDUCED_COLOR_8),
+            (4, cv2.IMREAD_REDUCED_COLOR_4),
+            (2, cv2.IMREAD_REDUCED_COLOR_2),
+        ):
+            if ratio >= reduction:
+                flags = reduced_flags
+                break
+    rgb_flag = getattr(cv2, "IMREAD_COLOR_RGB", None)
+    if rgb_flag is not None:
+        flags = (flags & ~cv2.IMREAD_COLOR) | rgb_flag
+
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), flags)
+    if img is None:
+        raise ValueError("Could not decode image.")
+    height, width = img.shape[:2]
+    original_shape = (size[1], size[0]) if size else (height, width)
+    if (height > width) != (original_shape[0] > original_shape[1]):
+        original_shape = original_shape[::-1]  # EXIF rotation applied by imdecode
+
+    if max_side and max(height, width) > max_side:
+        scale = max_side / max(height, width)
+        target = (max(1, round(width * scale)), max(1, round(height * scale)))
+        # Below 2× bilinear barely aliases and is several times faster than
+        # INTER_AREA at fractional ratios; the reduced decode did the rest.
+        interpolation = cv2.INTER_LINEAR if scale > 0.5 else cv2.INTER_AREA
+        img = cv2.resize(img, target, interpolation=interpolation)
+    if rgb_flag is None:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    return img, original_shape
+
+
+def landmarks_from_rows(rows) -> np.ndarray:
+    """
+    Build a (33, 4) landmark array from 33 rows of [x, y, z] or
+    [x, y, z, visibility]. Missing visibility defaults to 1.0.
+    """
+    arr = np.asarray(rows, dtype=np.float32)
+    if arr.ndim == 1 and arr.size in (NUM_LANDMARKS * 3, NUM_LANDMARKS * 4):
+        arr = arr.reshape(NUM_LANDMARKS, -1)
+    if arr.ndim != 2 or arr.shape[0] != NUM_LANDMARKS or arr.shape[1] not in (3, 4):
+        raise ValueError(
+            f"Expected {NUM_LANDMARKS} landmarks of [x, y, z] or [x, y, z, visibility], got shape {arr.shape}"
+        )
+    if arr.shape[1] == 3:
+        arr = np.hstack([arr, np.ones((NUM_LANDMARKS, 1), dtype=np.float32)])
+    if not np.isfinite(arr).all():
+        raise ValueError("Landmarks contain NaN or infinite values")
+    return arr
+
+
+def landmarks_from_bytes(data: bytes) -> np.ndarray:
+    """Decode little-endian float32 landmarks (33×3 or 33×4) into a (33, 4) array."""
+    if len(data) % 4:
+        raise ValueError(f"Landmark payload must be float32 values, got {len(data)} bytes")
+    return landmarks_from_rows(np.frombuffer(data, dtype="<f4"))
+
+
+@dataclass
+class PoseAnalysis:
+    """Result of running the pipeline on one frame."""
+
+    landmarks: Optional[np.ndarray]  # (33, 4) x, y, z, visibility or None if no pose
+    image_shape: Tuple[int, ...]
+    label: Optional[int] = None  # 0 = incorrect, 1 = correct
+    confidence: Optional[float] = None
+    rep: Optional[RepEvent] = None  # the squat rep this frame completed, if any
+    rep_count: Optional[int] = None  # reps so far in the session (None: not tracked)
+
+    @property
+    def detected(self) -> bool:
+        return self.landmarks is not None
+
+
+class PosePipeline:
+    """Detect -> features -> classify, with detection running once per frame."""
+
+    def __init__(
+        self,
+        model: SquatClassifier,
+        pose_pool: Optional[PosePool] = None,
+        input_size: Optional[int] = DEFAULT_INPUT_SIZE,
+    ):
+        self.model = model
+        self.pose_pool = pose_pool if pose_pool is not None else PosePool()
+        self.input_size = input_size
+        self._roi_lock = threading.Lock()
+        self._roi_counters = {
+            "frames": 0,
+            "cropped": 0,
+            "lost": 0,  # crop lost the pose (or cut it off); the next frame is detected in full
+            "decoded_pixels": 0,
+            "detected_pixels": 0,
+        }
+
+    @classmethod
+    def from_model_path(
+        cls,
+        model_path=DEFAULT_MODEL_PATH,
+        input_size: Optional[int] = DEFAULT_INPUT_SIZE,
+        roi_padding: Optional[float] = None,
+        **pool_kwargs,
+    ) -> "PosePipeline":
+        """``roi_padding`` turns on per-session ROI cropping (see roi_tracker.RoiTracker)."""
+        if roi_padding:
+            pool_kwargs["roi_factory"] = partial(RoiTracker, padding=roi_padding)
+        return cls(SquatClassifier.load(model_path), PosePool(**pool_kwargs), input_size)
+
+    def detect_rgb(self, image_rgb: np.ndarray, pose) -> Optional[np.ndarray]:
+        """Run MediaPipe Pose on an RGB frame and return a (33, 4) landmark array."""
+        result = pose.process(image_rgb)
+
+        if not result.pose_landmarks:
+            return None
+
+        return fill_landmarks(result.pose_landmarks)
+
+    @staticmethod
+    def features(landmarks: np.ndarray) -> np.ndarray:
+        """Model input row: x0, y0, z0, ..., x32, y32, z32."""
+        return model_features(landmarks)
+
+    def classify(self, landmarks: np.ndarray) -> Tuple[int, float]:
+        """Return (label, confidence) for a landmark array."""
+        # Labels are 0 = incorrect, 1 = correct; one predict_proba pass gives both
+        return self.model.predict_one(self.features(landmarks))
+
+    def analyze_encoded(
+        self, data: Union[str, bytes], session_id: Optional[str] = None, classify: bool = True
+    ) -> PoseAnalysis:
+        """Decode at most ``input_size`` pixels wide/high, detect, optionally classify."""
+        image_rgb, (height, width) = decode_frame(data, self.input_size)
+        with self.pose_pool.checkout(session_id) as entry:
+            landmarks = self.detect_tracked(image_rgb, entry.pose, entry.roi)
+
+        # Landmarks are normalized: keypoints scale to the original frame
+        analysis = PoseAnalysis(landmarks=landmarks, image_shape=(height, width, 3))
+        if landmarks is not None and classify:
+            analysis.label, analysis.confidence = self.classify(landmarks)
+        return analysis
+
+    def detect_tracked(self, image_rgb: np.ndarray, pose, roi: Optional[RoiTracker]) -> Optional[np.ndarray]:
+        """
+        Detect once with the session's tracker: in its ROI when it has one, else
+        in the full frame. A crop that loses the pose (or cuts it off) is not
+        retried on this frame, which would feed the tracker two images for one
+        timestamp; the ROI is dropped and the next frame is detected in full.
+        """
+        cropped = lost = False
+        if roi is not None and roi.box is not None:
+            top, bottom, left, right = crop_pixels(roi.box, image_rgb.shape)
+            crop = np.ascontiguousarray(image_rgb[top:bottom, left:right])
+            detected_pixels = crop.shape[0] * crop.shape[1]
+            landmarks = self.detect_rgb(crop, pose)
+            if landmarks is not None:
+                # Map through the box actually cut, after rounding to pixels
+                height, width = image_rgb.shape[:2]
+                landmarks = to_full_frame(landmarks, (left / width, top / height, right / width, bottom / height))
+            cropped = True
+            lost = not roi.accepts(landmarks)
+        else:
+            detected_pixels = image_rgb.shape[0] * image_rgb.shape[1]
+            landmarks = self.detect_rgb(image_rgb, pose)
+
+        if roi is not None:
+            if lost:
+                roi.reset()
+            else:
+                roi.update(landmarks)
+            with self._roi_lock:
+                counters = self._roi_counters
+                counters["frames"] += 1
+                counters["cropped"] += cropped
+                counters["lost"] += lost
+                counters["decoded_pixels"] += image_rgb.shape[0] * image_rgb.shape[1]
+                counters["detected_pixels"] += detected_pixels
+        return landmarks
+
+    def roi_stats(self) -> Dict[str, Any]:
+        with self._roi_lock:
+            stats: Dict[str, Any] = dict(self._roi_counters)
+        frames, decoded = stats["frames"], stats.pop("decoded_pixels")
+        detected = stats.pop("detected_pixels")
+        stats["crop_rate"] = round(stats["cropped"] / frames, 4) if frames else 0.0
+        # Share of decoded pixels MediaPipe actually had to process
+        stats["pixel_ratio"] = round(detected / decoded, 4) if decoded else 0.0
+        return stats
+
+
+# ===== Per-process pipeline used by inference_executor jobs =====
+
+_process_pipeline: Optional[PosePipeline] = None
+
+
+def init_process_pipeline(
+    model_path=DEFAULT_MODEL_PATH,
+    pool_kwargs=None,
+    input_size: Optional[int] = DEFAULT_INPUT_SIZE,
+    roi_padding: Optional[float] = None,
+) -> PosePipeline:
+    """Load the model and tracker pool for this process (executor worker initializer)."""
+    global _process_pipeline
+    _process_pipeline = PosePipeline.from_model_path(model_path, input_size, roi_padding, **(pool_kwargs or {}))
+    return _process_pipeline
+
+
+def analyze_encoded_frame(
+    data: Union[str, bytes], session_id: Optional[str] = None, classify: bool = True
+) -> PoseAnalysis:
+    """Decode + analyze one frame with this process's pipeline. Picklable executor job."""
+    if _process_pipeline is None:
+        init_process_pipeline()
+    return _process_pipeline.analyze_encoded(data, session_id, classify)
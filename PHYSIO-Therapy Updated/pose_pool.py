@@ -0,0 +1,180 @@
+"""
+Bounded pool of MediaPipe Pose trackers keyed by session ID.
+
+Each live session gets its own ``Pose(static_image_mode=False)`` instance so
+temporal tracking is never shared between patients and a graph is never
+driven by two threads at once. Idle sessions are evicted by TTL first and
+then by LRU; when every tracker is busy, callers wait up to
+``acquire_timeout`` seconds and then get ``PoolExhausted``.
+
+With a ``roi_factory`` every session also owns a region-of-interest tracker
+(see roi_tracker.py), created and dropped together with the session.
+"""
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+DEFAULT_SESSION_ID = "default"
+
+
+class PoolExhausted(RuntimeError):
+    """Raised when no tracker becomes free before the acquire timeout."""
+
+
+def default_pose_factory():
+    import mediapipe as mp
+
+    return mp.solutions.pose.Pose(static_image_mode=False)
+
+
+class _PoseSession:
+    __slots__ = ("pose", "roi", "in_use", "last_used")
+
+    def __init__(self, pose, now: float, roi=None):
+        self.pose = pose
+        self.roi = roi
+        self.in_use = True
+        self.last_used = now
+
+
+class PosePool:
+    def __init__(
+        self,
+        max_sessions: int = 64,
+        idle_ttl: float = 120.0,
+        acquire_timeout: float = 0.5,
+        pose_factory: Callable = default_pose_factory,
+        clock: Callable[[], float] = time.monotonic,
+        roi_factory: Optional[Callable] = None,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.acquire_timeout = acquire_timeout
+        self._pose_factory = pose_factory
+        self._roi_factory = roi_factory
+        self._clock = clock
+        self._sessions: "OrderedDict[str, _PoseSession]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "evictions_lru": 0,
+            "evictions_ttl": 0,
+            "rejections": 0,
+        }
+
+    @contextmanager
+    def session(self, session_id: Optional[str] = None):
+        """Check out the tracker for ``session_id`` for the duration of the block."""
+        with self.checkout(session_id) as entry:
+            yield entry.pose
+
+    @contextmanager
+    def checkout(self, session_id: Optional[str] = None):
+        """Like ``session`` but yields the whole entry (``.pose`` and ``.roi``)."""
+        session_id = session_id or DEFAULT_SESSION_ID
+        entry, recycled = self._acquire(session_id)
+        if entry.pose is None or recycled:
+            self._prepare(session_id, entry, recycled)
+        try:
+            yield entry
+        finally:
+            self._release(entry)
+
+    def _acquire(self, session_id: str):
+        """Return ``(entry, recycled)``; graph building happens outside the lock."""
+        deadline = self._clock() + self.acquire_timeout
+        with self._cond:
+            while True:
+                now = self._clock()
+                self._evict_expired(now)
+
+                entry = self._sessions.get(session_id)
+                if entry is not None:
+                    if not entry.in_use:
+                        entry.in_use = True
+                        self._sessions.move_to_end(session_id)
+                        self._counters["hits"] += 1
+                        return entry, False
+                elif len(self._sessions) < self.max_sessions:
+                    self._counters["misses"] += 1
+                    return self._insert(session_id, None, now), False
+                else:
+                    victim_id = self._lru_idle()
+                    if victim_id is not None:
+                        victim = self._sessions.pop(victim_id)
+                        self._counters["misses"] += 1
+                        self._counters["evictions_lru"] += 1
+                        # Recycle the evicted graph instead of building a new one.
+                        return self._insert(session_id, victim.pose, now), True
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._counters["rejections"] += 1
+                    raise PoolExhausted(
+                        f"All {self.max_sessions} pose trackers are busy; try again shortly."
+                    )
+                self._cond.wait(remaining)
+
+    def _insert(self, session_id: str, pose, now: float) -> _PoseSession:
+        roi = self._roi_factory() if self._roi_factory is not None else None
+        entry = _PoseSession(pose, now, roi)
+        self._sessions[session_id] = entry
+        return entry
+
+    def _prepare(self, session_id: str, entry: _PoseSession, recycled: bool) -> None:
+        try:
+            if recycled:
+                if hasattr(entry.pose, "reset"):
+                    entry.pose.reset()
+            else:
+                entry.pose = self._pose_factory()
+        except Exception:
+            with self._cond:
+                if self._sessions.get(session_id) is entry:
+                    del self._sessions[session_id]
+                self._cond.notify_all()
+            raise
+
+    def _release(self, entry: _PoseSession) -> None:
+        with self._cond:
+            entry.in_use = False
+            entry.last_used = self._clock()
+            self._cond.notify_all()
+
+    def _lru_idle(self) -> Optional[str]:
+        for session_id, entry in self._sessions.items():
+            if not entry.in_use:
+                return session_id
+        return None
+
+    def _evict_expired(self, now: float) -> None:
+        expired = [
+            session_id
+            for session_id, entry in self._sessions.items()
+            if not entry.in_use and now - entry.last_used > self.idle_ttl
+        ]
+        for session_id in expired:
+            entry = self._sessions.pop(session_id)
+            if entry.pose is not None:
+                entry.pose.close()
+            self._counters["evictions_ttl"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            stats = dict(self._counters)
+            stats["sessions"] = len(self._sessions)
+            stats["in_use"] = sum(1 for e in self._sessions.values() if e.in_use)
+            stats["max_sessions"] = self.max_sessions
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def close(self) -> None:
+        with self._cond:
+            for entry in self._sessions.values():
+                if entry.pose is not None:
+                    entry.pose.close()
+            self._sessions.clear()
@@ -0,0 +1,218 @@
+"""
+Streaming squat rep detection from pose landmarks.
+
+``RepDetector`` follows one session frame by frame. Each frame's knee and hip
+angles (hip-knee-ankle and shoulder-hip-knee, from the better visible side or
+both sides averaged) go into a small ring buffer whose running sum gives the
+smoothed angle, and a three-state machine turns the smoothed knee angle into
+reps:
+
+    standing --(knee < stand_angle)--> descending --(knee <= bottom_angle)--> bottom
+    descending/bottom --(knee >= stand_angle)--> standing
+
+Returning to standing from ``bottom`` completes a rep; from ``descending`` the
+movement was too shallow and is dropped. A session starts counting once it
+has been seen standing. While a rep is in progress the detector keeps running
+totals (frames, frames classified correct, confidence, deepest knee and hip
+angles), so the work per frame is constant and no history is ever re-scanned.
+A rep is correct when most of its classified frames were.
+
+``RepSessions`` keeps one detector per session (LRU-bounded).
+"""
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# MediaPipe Pose landmark indices, (left, right)
+SHOULDERS = (11, 12)
+HIPS = (23, 24)
+KNEES = (25, 26)
+ANKLES = (27, 28)
+_JOINTS = list(SHOULDERS + HIPS + KNEES + ANKLES)
+
+STANDING, DESCENDING, BOTTOM = "standing", "descending", "bottom"
+
+
+@dataclass
+class RepEvent:
+    """Aggregates of one completed rep."""
+
+    count: int  # reps completed in the session so far, including this one
+    correct: bool
+    accuracy: float  # share of the rep's classified frames labelled correct
+    frames: int
+    mean_confidence: float
+    min_knee_angle: float
+    min_hip_angle: float
+
+
+def _angle(ax, ay, bx, by, cx, cy) -> float:
+    """Angle ABC in degrees."""
+    ux, uy, vx, vy = ax - bx, ay - by, cx - bx, cy - by
+    return math.degrees(math.atan2(abs(ux * vy - uy * vx), ux * vx + uy * vy))
+
+
+def joint_angles(landmarks, aspect: float = 1.0, min_visibility: float = 0.5) -> Optional[Tuple[float, float]]:
+    """(knee, hip) angles in degrees from (33, 4) landmarks, or None if neither leg is visible.
+
+    ``aspect`` is the frame's width / height, so angles are measured in pixels
+    rather than in normalized coordinates.
+    """
+    (
+        (lsx, lsy, _, lsv), (rsx, rsy, _, rsv),
+        (lhx, lhy, _, lhv), (rhx, rhy, _, rhv),
+        (lkx, lky, _, lkv), (rkx, rky, _, rkv),
+        (lax, lay, _, lav), (rax, ray, _, rav),
+    ) = landmarks[_JOINTS, :].tolist()
+
+    left = min(lsv, lhv, lkv, lav)
+    right = min(rsv, rhv, rkv, rav)
+    if max(left, right) < min_visibility:
+        return None
+
+    knee = hip = 0.0
+    sides = 0
+    if left >= min_visibility:
+        knee += _angle(lhx * aspect, lhy, lkx * aspect, lky, lax * aspect, lay)
+        hip += _angle(lsx * aspect, lsy, lhx * aspect, lhy, lkx * aspect, lky)
+        sides += 1
+    if right >= min_visibility:
+        knee += _angle(rhx * aspect, rhy, rkx * aspect, rky, rax * aspect, ray)
+        hip += _angle(rsx * aspect, rsy, rhx * aspect, rhy, rkx * aspect, rky)
+        sides += 1
+    return knee / sides, hip / sides
+
+
+class RepDetector:
+    def __init__(
+        self,
+        stand_angle: float = 160.0,
+        bottom_angle: float = 120.0,
+        window: int = 3,
+        min_visibility: float = 0.5,
+    ):
+        if bottom_angle >= stand_angle:
+            raise ValueError(f"bottom_angle ({bottom_angle}) must be below stand_angle ({stand_angle})")
+        self.stand_angle = stand_angle
+        self.bottom_angle = bottom_angle
+        self.min_visibility = min_visibility
+
+        # Ring buffers of the last ``window`` angles and their running sums
+        self._knees = [0.0] * window
+        self._hips = [0.0] * window
+        self._knee_sum = self._hip_sum = 0.0
+        self._next = 0
+        self._filled = 0
+
+        self.state: Optional[str] = None  # None until the session is first seen standing
+        self.count = 0
+        self.correct_count = 0
+        self._start_rep()
+
+    def _start_rep(self) -> None:
+        self._frames = self._classified = self._correct = 0
+        self._confidence_sum = 0.0
+        self._min_knee = self._min_hip = 180.0
+
+    def _smooth(self, knee: float, hip: float) -> Tuple[float, float]:
+        i = self._next
+        self._knee_sum += knee - self._knees[i]
+        self._hip_sum += hip - self._hips[i]
+        self._knees[i], self._hips[i] = knee, hip
+        self._next = (i + 1) % len(self._knees)
+        self._filled = min(self._filled + 1, len(self._knees))
+        return self._knee_sum / self._filled, self._hip_sum / self._filled
+
+    def update(
+        self, landmarks, label: Optional[int] = None, confidence: Optional[float] = None, aspect: float = 1.0
+    ) -> Optional[RepEvent]:
+        """Feed one frame; returns the rep it completes, if any. Frames without visible legs are skipped."""
+        angles = joint_angles(landmarks, aspect, self.min_visibility)
+        if angles is None:
+            return None
+        knee, hip = self._smooth(*angles)
+
+        if self.state is None:
+            if knee >= self.stand_angle:
+                self.state = STANDING
+            return None
+
+        if self.state == STANDING:
+            if knee >= self.stand_angle:
+                return None
+            self.state = DESCENDING
+            self._start_rep()
+
+        self._frames += 1
+        if label is not None:
+            self._classified += 1
+            self._correct += label == 1
+            self._confidence_sum += confidence or 0.0
+        self._min_knee = min(self._min_knee, knee)
+        self._min_hip = min(self._min_hip, hip)
+
+        if knee <= self.bottom_angle:
+            self.state = BOTTOM
+        elif knee >= self.stand_angle:
+            completed = self.state == BOTTOM
+            self.state = STANDING
+            if completed:
+                return self._finish_rep()
+        return None
+
+    def _finish_rep(self) -> RepEvent:
+        accuracy = self._correct / self._classified if self._classified else 0.0
+        correct = accuracy > 0.5
+        self.count += 1
+        self.correct_count += correct
+        return RepEvent(
+            count=self.count,
+            correct=correct,
+            accuracy=round(accuracy, 4),
+            frames=self._frames,
+            mean_confidence=round(self._confidence_sum / self._classified, 4) if self._classified else 0.0,
+            min_knee_angle=round(self._min_knee, 1),
+            min_hip_angle=round(self._min_hip, 1),
+        )
+
+
+class RepSessions:
+    """One RepDetector per session ID, least recently used dropped first."""
+
+    def __init__(self, max_sessions: int = 1024, **detector_kwargs):
+        self.max_sessions = max_sessions
+        self.detector_kwargs = detector_kwargs
+        self._detectors: "OrderedDict[str, RepDetector]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"frames": 0, "reps": 0, "correct_reps": 0, "evictions": 0}
+
+    def update(
+        self, session_id: Optional[str], landmarks, label=None, confidence=None, aspect: float = 1.0
+    ) -> Tuple[Optional[RepEvent], Optional[int]]:
+        """(completed rep or None, session rep count); (None, None) without a session ID."""
+        if not session_id:
+            return None, None
+        with self._lock:
+            detector = self._detectors.get(session_id)
+            if detector is None:
+                detector = self._detectors[session_id] = RepDetector(**self.detector_kwargs)
+                while len(self._detectors) > self.max_sessions:
+                    self._detectors.popitem(last=False)
+                    self._counters["evictions"] += 1
+            else:
+                self._detectors.move_to_end(session_id)
+            # Under the lock: frames of one session must go through its state machine one at a time
+            event = detector.update(landmarks, label, confidence, aspect)
+            self._counters["frames"] += 1
+            if event is not None:
+                self._counters["reps"] += 1
+                self._counters["correct_reps"] += event.correct
+            return event, detector.count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats["sessions"] = len(self._detectors)
+        return stats
@@ -0,0 +1,130 @@
+"""
+Per-session region of interest for pose detection.
+
+A patient in a live session moves little between frames, so after a frame
+with a confident pose the next one only needs the padded bounding box of its
+landmarks. ``RoiTracker`` keeps that box (normalized to the full frame) for
+one session; the pose pipeline crops the decoded frame to it, runs MediaPipe
+on the crop and maps the landmarks back with ``to_full_frame``.
+
+Every frame gets exactly one pass through the session's MediaPipe tracker,
+on the crop or on the full frame. The box is sticky: it is only recomputed
+when the pose gets close to its edge or shrinks well inside it, so the crop
+keeps its size and position between those moves and the coordinates the
+tracker carries over from the previous frame stay valid. A crop without a
+confident pose, or with the pose running into the crop's edge, clears the
+box; the next frame is detected on the full frame and the box is rebuilt
+from that.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+Box = Tuple[float, float, float, float]  # x0, y0, x1, y1 in [0, 1] of the full frame
+
+
+def landmark_bounds(landmarks: np.ndarray, min_visibility: float) -> Optional[Box]:
+    """Tight normalized box around the visible landmarks, or None if too few are visible."""
+    visible = landmarks[landmarks[:, 3] >= min_visibility]
+    if len(visible) < 4:
+        return None
+    x0, y0 = visible[:, :2].min(axis=0)
+    x1, y1 = visible[:, :2].max(axis=0)
+    return float(x0), float(y0), float(x1), float(y1)
+
+
+def to_full_frame(landmarks: np.ndarray, box: Box) -> np.ndarray:
+    """Map (33, 4) landmarks normalized to the crop ``box`` back to the full frame."""
+    x0, y0, x1, y1 = box
+    width, height = x1 - x0, y1 - y0
+    out = landmarks.copy()
+    out[:, 0] = x0 + landmarks[:, 0] * width
+    out[:, 1] = y0 + landmarks[:, 1] * height
+    out[:, 2] = landmarks[:, 2] * width  # MediaPipe scales z like x
+    return out
+
+
+def crop_pixels(box: Box, shape) -> Tuple[int, int, int, int]:
+    """(top, bottom, left, right) pixel slice of ``box`` in an image of ``shape``."""
+    height, width = shape[:2]
+    x0, y0, x1, y1 = box
+    return (
+        int(y0 * height),
+        max(int(y0 * height) + 1, int(round(y1 * height))),
+        int(x0 * width),
+        max(int(x0 * width) + 1, int(round(x1 * width))),
+    )
+
+
+class RoiTracker:
+    def __init__(
+        self,
+        padding: float = 0.25,
+        min_visibility: float = 0.5,
+        min_size: float = 0.2,
+        max_area: float = 0.7,
+    ):
+        self.padding = padding  # added on each side, as a fraction of the pose's width/height
+        self.min_visibility = min_visibility
+        self.min_size = min_size  # smallest box side, as a fraction of the frame
+        self.max_area = max_area  # boxes covering more of the frame are not worth cropping
+        self.box: Optional[Box] = None
+
+    def reset(self) -> None:
+        self.box = None
+
+    def confident(self, landmarks: Optional[np.ndarray]) -> bool:
+        """Whether a detection is good enough to keep tracking from."""
+        return landmarks is not None and float(landmarks[:, 3].mean()) >= self.min_visibility
+
+    def accepts(self, landmarks: Optional[np.ndarray], edge: float = 0.02) -> bool:
+        """Whether full-frame ``landmarks`` detected in the crop can be kept: confident, and
+        not touching a crop edge (within ``edge`` of the box size) that is not the frame's."""
+        bounds = landmark_bounds(landmarks, self.min_visibility) if self.confident(landmarks) else None
+        if bounds is None:
+            return False
+        bx0, by0, bx1, by1 = self.box
+        x0, y0, x1, y1 = bounds
+        tol_x, tol_y = (bx1 - bx0) * edge, (by1 - by0) * edge
+        return (
+            (x0 - tol_x > bx0 or bx0 == 0.0)
+            and (y0 - tol_y > by0 or by0 == 0.0)
+            and (x1 + tol_x < bx1 or bx1 == 1.0)
+            and (y1 + tol_y < by1 or by1 == 1.0)
+        )
+
+    def update(self, landmarks: Optional[np.ndarray]) -> None:
+        """Set the box for the next frame from full-frame ``landmarks`` (None: lost)."""
+        bounds = landmark_bounds(landmarks, self.min_visibility) if self.confident(landmarks) else None
+        if bounds is None:
+            self.box = None
+        elif self.box is None or not self._still_fits(bounds):
+            self.box = self._padded(bounds)
+
+    def _padded(self, bounds: Box) -> Optional[Box]:
+        x0, y0, x1, y1 = bounds
+        pad_x = max((x1 - x0) * self.padding, (self.min_size - (x1 - x0)) / 2, 0.0)
+        pad_y = max((y1 - y0) * self.padding, (self.min_size - (y1 - y0)) / 2, 0.0)
+        box = (max(0.0, x0 - pad_x), max(0.0, y0 - pad_y), min(1.0, x1 + pad_x), min(1.0, y1 + pad_y))
+        if (box[2] - box[0]) * (box[3] - box[1]) > self.max_area:
+            return None
+        return box
+
+    def _still_fits(self, bounds: Box) -> bool:
+        """Pose keeps half the padding clear of each edge (or sits on the frame border) and fills the box."""
+        bx0, by0, bx1, by1 = self.box
+        x0, y0, x1, y1 = bounds
+        margin_x = (x1 - x0) * self.padding / 2
+        margin_y = (y1 - y0) * self.padding / 2
+        inside = (
+            (x0 - margin_x >= bx0 or bx0 == 0.0)
+            and (y0 - margin_y >= by0 or by0 == 0.0)
+            and (x1 + margin_x <= bx1 or bx1 == 1.0)
+            and (y1 + margin_y <= by1 or by1 == 1.0)
+        )
+        padded = self._padded(bounds)
+        if padded is None:
+            return False
+        padded_area = (padded[2] - padded[0]) * (padded[3] - padded[1])
+        box_area = (bx1 - bx0) * (by1 - by0)
+        return inside and box_area <= 2 * padded_area
@@ -0,0 +1,390 @@
+"""
+Pooled SQLite access layer for session storage (physiosense.db).
+
+- A fixed pool of long-lived connections in WAL mode, so readers never block
+  the writer and the writer never blocks readers.
+- Tuned pragmas: synchronous=NORMAL (safe with WAL), mmap_size, cache_size,
+  busy_timeout.
+- Prepared-statement reuse: every query is a module-level SQL constant and
+  connections live as long as the pool, so sqlite3's per-connection statement
+  cache compiles each statement once per connection.
+- Async-friendly: ``await repo.run(repo.method, ...)`` runs the call on a
+  dedicated thread pool sized to the connection pool, keeping blocking I/O
+  off the event loop.
+- Session history is keyset-paginated on (date, id) with opaque cursors, so a
+  page costs the same however deep into a user's history it is.
+"""
+import asyncio
+import base64
+import binascii
+import queue
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Callable, List, Optional, Tuple
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA mmap_size=268435456;",  # 256 MB
+    "PRAGMA cache_size=-16000;",  # ~16 MB per connection
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA busy_timeout=5000;",
+)
+
+
+def connect(db_path, statement_cache_size: int = 256) -> sqlite3.Connection:
+    """Open a connection with row access by name and the tuned pragmas applied."""
+    conn = sqlite3.connect(
+        str(db_path),
+        check_same_thread=False,  # pooled connections move between worker threads
+        cached_statements=statement_cache_size,
+    )
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection):
+    """BEGIN IMMEDIATE ... COMMIT: holds the database write lock from the first statement."""
+    conn.commit()  # close any implicit transaction first
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def init_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create the base tables, then apply pending MIGRATIONS (tracked in PRAGMA
+    user_version). Safe when several workers start on the same database at
+    once: every step runs under the write lock and re-checks whether another
+    worker already applied it.
+    """
+    with write_transaction(conn):
+        _create_base_schema(conn)
+
+    for target, migrate in enumerate(MIGRATIONS, start=1):
+        if schema_version(conn) >= target:
+            continue
+        with write_transaction(conn):
+            if schema_version(conn) < target:
+                migrate(conn)
+                conn.execute(f"PRAGMA user_version = {target};")
+
+
+def _create_base_schema(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            userId TEXT,
+            exerciseType TEXT NOT NULL,
+            duration INTEGER NOT NULL,
+            correctReps INTEGER NOT NULL,
+            incorrectReps INTEGER NOT NULL,
+            accuracy INTEGER NOT NULL,
+            avgConfidence INTEGER NOT NULL,
+            date TEXT NOT NULL
+        );
+        """
+    )
+
+    cols = [r["name"] for r in conn.execute("PRAGMA table_info(sessions);").fetchall()]
+    if "userId" not in cols:
+        conn.execute("ALTER TABLE sessions ADD COLUMN userId TEXT;")
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_exercise ON sessions(exerciseType);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(userId);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user_date ON sessions(userId, date);")
+
+
+# ===== Migrations =====
+
+
+def rebuild_user_stats(conn: sqlite3.Connection) -> None:
+    """Recompute the user_stats rollup from the sessions table."""
+    conn.execute("DELETE FROM user_stats;")
+    conn.execute(
+        """
+        INSERT INTO user_stats (userId, totalSessions, totalReps, accuracySum, totalDuration, lastSessionDate)
+        SELECT
+            userId,
+            COUNT(*),
+            COALESCE(SUM(correctReps + incorrectReps), 0),
+            COALESCE(SUM(accuracy), 0),
+            COALESCE(SUM(duration), 0),
+            MAX(date)
+        FROM sessions
+        WHERE userId IS NOT NULL
+        GROUP BY userId;
+        """
+    )
+    has_streaks = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_activity_days';"
+    ).fetchone()
+    if has_streaks:
+        rebuild_streaks(conn)
+
+
+def rebuild_streaks(conn: sqlite3.Connection) -> None:
+    """Repopulate user_activity_days from sessions and recompute each user's stored streak."""
+    conn.execute("DELETE FROM user_activity_days;")
+    # Stored dates are isoformat() strings, so the first 10 characters are the
+    # session's calendar day in its own UTC offset (same as datetime.date()).
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO user_activity_days (userId, day)
+        SELECT userId, substr(date, 1, 10) FROM sessions WHERE userId IS NOT NULL;
+        """
+    )
+    users = conn.execute(
+        "SELECT userId, MAX(day) AS lastDay FROM user_activity_days GROUP BY userId;"
+    ).fetchall()
+    for row in users:
+        last_day = date.fromisoformat(row["lastDay"])
+        conn.execute(
+            "UPDATE user_stats SET currentStreak = ?, lastActiveDay = ? WHERE userId = ?;",
+            (streak_ending(conn, row["userId"], last_day), row["lastDay"], row["userId"]),
+        )
+
+
+def streak_ending(conn: sqlite3.Connection, user_id: str, day: date) -> int:
+    """Length of the run of consecutive active days ending on ``day`` (walks the day index)."""
+    streak = 0
+    expected = day
+    for (active_day,) in conn.execute(SELECT_ACTIVE_DAYS_BEFORE, (user_id, day.isoformat())):
+        if active_day != expected.isoformat():
+            break
+        streak += 1
+        expected -= timedelta(days=1)
+    return streak
+
+
+def _migrate_user_stats(conn: sqlite3.Connection) -> None:
+    # Per-user rollup maintained by insert_session, so stats reads are one row.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_stats (
+            userId TEXT PRIMARY KEY,
+            totalSessions INTEGER NOT NULL DEFAULT 0,
+            totalReps INTEGER NOT NULL DEFAULT 0,
+            accuracySum INTEGER NOT NULL DEFAULT 0,
+            totalDuration INTEGER NOT NULL DEFAULT 0,
+            lastSessionDate TEXT
+        );
+        """
+    )
+    rebuild_user_stats(conn)
+
+
+def _migrate_streaks(conn: sqlite3.Connection) -> None:
+    # One row per (user, active day), plus the current run stored on user_stats,
+    # so the dashboard streak is read from a single row.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_activity_days (
+            userId TEXT NOT NULL,
+            day TEXT NOT NULL,
+            PRIMARY KEY (userId, day)
+        ) WITHOUT ROWID;
+        """
+    )
+    conn.execute("ALTER TABLE user_stats ADD COLUMN currentStreak INTEGER NOT NULL DEFAULT 0;")
+    conn.execute("ALTER TABLE user_stats ADD COLUMN lastActiveDay TEXT;")
+    rebuild_streaks(conn)
+
+
+def _migrate_history_index(conn: sqlite3.Connection) -> None:
+    # Keyset pages filtered by exercise; (userId, date) already covers the unfiltered
+    # case because id is the rowid and breaks date ties in index order.
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_sessions_user_exercise_date "
+        "ON sessions(userId, exerciseType, date);"
+    )
+
+
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _migrate_user_stats,  # 1
+    _migrate_streaks,  # 2
+    _migrate_history_index,  # 3
+]
+
+
+def encode_cursor(row: sqlite3.Row) -> str:
+    """Opaque page cursor for the (date, id) key of the last row on a page."""
+    raw = f"{row['date']}|{int(row['id'])}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of encode_cursor. Raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        session_date, session_id = raw.rsplit("|", 1)
+        return session_date, int(session_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections; ``connection()`` blocks until one is free."""
+
+    def __init__(self, db_path, size: int = 4):
+        self.db_path = db_path
+        self.size = size
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(size):
+            self._idle.put(connect(db_path))
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        for _ in range(self.size):
+            self._idle.get().close()
+
+
+# ===== Statements =====
+
+INSERT_SESSION = """
+    INSERT INTO sessions (userId, exerciseType, duration, correctReps, incorrectReps, accuracy, avgConfidence, date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SELECT_RECENT = "SELECT * FROM sessions WHERE userId = ? ORDER BY date DESC LIMIT ?;"
+# Newest first, keyset-paginated on (date, id).
+SELECT_HISTORY_PAGE = "SELECT * FROM sessions WHERE userId = ?{filters} ORDER BY date DESC, id DESC LIMIT ?;"
+HISTORY_EXERCISE_FILTER = " AND exerciseType = ?"
+HISTORY_AFTER_FILTER = " AND (date, id) < (?, ?)"
+UPSERT_USER_STATS = """
+    INSERT INTO user_stats (userId, totalSessions, totalReps, accuracySum, totalDuration, lastSessionDate)
+    VALUES (?, 1, ?, ?, ?, ?)
+    ON CONFLICT(userId) DO UPDATE SET
+        totalSessions = totalSessions + 1,
+        totalReps = totalReps + excluded.totalReps,
+        accuracySum = accuracySum + excluded.accuracySum,
+        totalDuration = totalDuration + excluded.totalDuration,
+        lastSessionDate = MAX(COALESCE(lastSessionDate, ''), excluded.lastSessionDate);
+"""
+SELECT_USER_STATS = """
+    SELECT
+        totalSessions,
+        totalReps,
+        CASE WHEN totalSessions > 0 THEN CAST(accuracySum AS REAL) / totalSessions ELSE 0 END AS avgAccuracy,
+        totalDuration,
+        lastSessionDate,
+        currentStreak,
+        lastActiveDay
+    FROM user_stats
+    WHERE userId = ?;
+"""
+INSERT_ACTIVE_DAY = "INSERT OR IGNORE INTO user_activity_days (userId, day) VALUES (?, ?);"
+SELECT_STREAK = "SELECT currentStreak, lastActiveDay FROM user_stats WHERE userId = ?;"
+UPDATE_STREAK = "UPDATE user_stats SET currentStreak = ?, lastActiveDay = ? WHERE userId = ?;"
+SELECT_ACTIVE_DAYS_BEFORE = (
+    "SELECT day FROM user_activity_days WHERE userId = ? AND day <= ? ORDER BY day DESC;"
+)
+
+
+class SessionRepository:
+    """All reads and writes of the sessions table go through here."""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self._executor = ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix="sqlite")
+
+    async def run(self, method: Callable, *args):
+        """Await a repository method on the database thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(method, *args))
+
+    def insert_session(self, user_id: str, values: tuple) -> int:
+        """values: (exerciseType, duration, correctReps, incorrectReps, accuracy, avgConfidence, date)."""
+        _, duration, correct_reps, incorrect_reps, accuracy, _, session_date = values
+        with self.pool.connection() as conn:
+            # Session row and rollup update commit in the same transaction.
+            cur = conn.execute(INSERT_SESSION, (user_id, *values))
+            conn.execute(
+                UPSERT_USER_STATS,
+                (user_id, correct_reps + incorrect_reps, accuracy, duration, session_date),
+            )
+            day = datetime.fromisoformat(session_date).date()
+            if conn.execute(INSERT_ACTIVE_DAY, (user_id, day.isoformat())).rowcount:
+                self._advance_streak(conn, user_id, day)
+            conn.commit()
+            return int(cur.lastrowid)
+
+    @staticmethod
+    def _advance_streak(conn: sqlite3.Connection, user_id: str, day: date) -> None:
+        """Update the stored streak for a newly active ``day``."""
+        row = conn.execute(SELECT_STREAK, (user_id,)).fetchone()
+        last_day = date.fromisoformat(row["lastActiveDay"]) if row["lastActiveDay"] else None
+
+        if last_day is None or day > last_day + timedelta(days=1):
+            streak, last_day = 1, day
+        elif day == last_day + timedelta(days=1):
+            streak, last_day = int(row["currentStreak"]) + 1, day
+        else:
+            # Back-dated session: it may have closed a gap in the run ending at last_day.
+            streak = streak_ending(conn, user_id, last_day)
+        conn.execute(UPDATE_STREAK, (streak, last_day.isoformat(), user_id))
+
+    def recent_sessions(self, user_id: str, limit: int) -> List[sqlite3.Row]:
+        with self.pool.connection() as conn:
+            return conn.execute(SELECT_RECENT, (user_id, limit)).fetchall()
+
+    def session_history(
+        self,
+        user_id: str,
+        exercise: Optional[str] = None,
+        limit: int = 50,
+        after: Optional[Tuple[str, int]] = None,
+    ) -> List[sqlite3.Row]:
+        """Up to ``limit`` sessions, newest first, strictly older than the ``after`` (date, id) key."""
+        filters, params = "", [user_id]
+        if exercise:
+            filters += HISTORY_EXERCISE_FILTER
+            params.append(exercise)
+        if after is not None:
+            filters += HISTORY_AFTER_FILTER
+            params.extend(after)
+        params.append(limit)
+        with self.pool.connection() as conn:
+            return conn.execute(SELECT_HISTORY_PAGE.format(filters=filters), params).fetchall()
+
+    def aggregate_stats(self, user_id: str) -> Optional[sqlite3.Row]:
+        """
+        One row from the rollup (None if the user has no sessions): totalSessions,
+        totalReps, avgAccuracy, totalDuration, lastSessionDate, and currentStreak,
+        the run of consecutive active days ending on lastActiveDay.
+        """
+        with self.pool.connection() as conn:
+            return conn.execute(SELECT_USER_STATS, (user_id,)).fetchone()
+
+    def streak_ending(self, user_id: str, day: date) -> int:
+        with self.pool.connection() as conn:
+            return streak_ending(conn, user_id, day)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.pool.close()
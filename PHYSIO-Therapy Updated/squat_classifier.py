@@ -0,0 +1,147 @@
+"""
+Squat form classifier: the trained estimator plus its feature layout.
+
+Labels and confidences come from a single ``predict_proba`` pass (sklearn's
+``predict`` is ``argmax(predict_proba)`` anyway), so every tree of the
+forest is evaluated once per row instead of twice. ``predict_batch`` takes
+any number of rows; the live endpoint, ``train_model.py`` evaluation and
+``live_inference.py`` all go through it.
+
+``train_model.py`` saves a SquatClassifier to Models/squat_model.pkl and a
+flattened copy of the forest to Models/squat_model_forest/ (forest_engine.py).
+When that copy was exported from the same pickle, ``SquatClassifier.load``
+memory-maps it instead of unpickling the forest: every process serving the
+model (uvicorn workers, inference processes) shares the same page-cache
+pages, and startup does not rebuild 100 trees. It handles batches of up to
+ENGINE_MAX_BATCH rows; the sklearn estimator is unpickled on first use by a
+larger batch. Both give identical probabilities.
+
+``SquatClassifier.load`` also accepts an older pickle holding a bare
+estimator and wraps it.
+"""
+import threading
+from typing import List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from forest_engine import FlatForest, forest_dir_for
+from landmark_cache import file_sha256
+from paths import DEFAULT_MODEL_PATH
+
+# Largest batch sent to the flattened forest; bigger ones are faster in sklearn
+ENGINE_MAX_BATCH = 256
+
+
+class SquatClassifier:
+    def __init__(self, estimator, feature_names: Optional[List[str]] = None):
+        self._estimator = estimator
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.classes_ = np.asarray(getattr(estimator, "classes_", [0, 1]))
+        # Set by load(), never pickled
+        self.engine: Optional[FlatForest] = None
+        self._model_path = None  # pickle to unpickle the estimator from on first use
+        self._load_lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_estimator=self.estimator, engine=None, _model_path=None, _load_lock=None)
+        return state
+
+    def __setstate__(self, state):
+        if "estimator" in state:  # pickled before the estimator was loaded lazily
+            state["_estimator"] = state.pop("estimator")
+        self.__dict__.update(state)
+        self.engine = None
+        self._model_path = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def estimator(self):
+        """The sklearn estimator; unpickled on first access when the classifier was memory-mapped."""
+        if self._estimator is None:
+            with self._load_lock:
+                if self._estimator is None:
+                    self._estimator = self.load(self._model_path, use_engine=False)._estimator
+        return self._estimator
+
+    @property
+    def n_features(self) -> int:
+        if self._estimator is None and self.engine is not None:
+            return self.engine.n_features
+        return int(self.estimator.n_features_in_)
+
+    @classmethod
+    def load(cls, model_path=DEFAULT_MODEL_PATH, use_engine: bool = True, mmap: bool = True) -> "SquatClassifier":
+        """
+        Load a saved classifier. With ``mmap`` and a matching flattened forest,
+        only the forest arrays are mapped and the pickle is left unread.
+        """
+        engine = load_engine(model_path, mmap_mode="r" if mmap else None) if use_engine else None
+        if engine is not None and mmap:
+            classifier = cls(None, engine.meta.get("feature_names"))
+            classifier.classes_ = engine.classes_
+            classifier.engine = engine
+            classifier._model_path = model_path
+            return classifier
+
+        obj = joblib.load(str(model_path))
+        if isinstance(obj, cls):
+            classifier = obj
+        else:
+            # Bare estimator from an older train_model.py. If it was fitted on a
+            # DataFrame, keep the column names here instead: rows arrive as plain
+            # arrays, and sklearn warns on every call when the names are missing.
+            names = getattr(obj, "feature_names_in_", None)
+            if names is not None:
+                del obj.feature_names_in_
+            classifier = cls(obj, names)
+        classifier.engine = engine
+        return classifier
+
+    def save(self, model_path=DEFAULT_MODEL_PATH) -> None:
+        joblib.dump(self, str(model_path))
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """(N, n_classes) class probabilities for an (N, n_features) array."""
+        features = np.asarray(features, dtype=np.float32)
+        if self.engine is not None and len(features) <= ENGINE_MAX_BATCH:
+            return self.engine.predict_proba(features)
+        return self.estimator.predict_proba(features)
+
+    def predict_batch(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Labels (0 = incorrect, 1 = correct) and the probability of each
+        predicted label, for an (N, n_features) array.
+        """
+        features = np.asarray(features, dtype=np.float32)
+        if features.ndim == 1:
+            features = features.reshape(1, -1)
+        if self.engine is None and not hasattr(self.estimator, "predict_proba"):
+            labels = np.asarray(self.estimator.predict(features))
+            return labels, np.ones(len(labels))  # no probability support
+
+        proba = self.predict_proba(features)
+        best = proba.argmax(axis=1)
+        return self.classes_[best], proba[np.arange(len(best)), best]
+
+    def predict_one(self, features: np.ndarray) -> Tuple[int, float]:
+        """(label, confidence) for a single feature row."""
+        labels, confidences = self.predict_batch(features)
+        return int(labels[0]), float(confidences[0])
+
+
+def load_engine(model_path=DEFAULT_MODEL_PATH, mmap_mode: Optional[str] = "r") -> Optional[FlatForest]:
+    """Flattened forest exported from this exact pickle, or None (sklearn is used)."""
+    forest_dir = forest_dir_for(model_path)
+    if not forest_dir.exists():
+        return None
+    try:
+        engine = FlatForest.load(forest_dir, mmap_mode=mmap_mode)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring flattened forest {forest_dir}: {e}")
+        return None
+    if engine.meta.get("source_sha256") != file_sha256(model_path):
+        print(f"⚠️  {forest_dir} was exported from a different model, using sklearn (re-run train_model.py)")
+        return None
+    return engine
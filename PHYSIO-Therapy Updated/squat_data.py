@@ -0,0 +1,152 @@
+"""
+Bulk loader for the Squat_Data .npy tree.
+
+    Squat_Data/Valid/<subfolder>/<n>.npy      label 1 (correct)
+    Squat_Data/Invalid/<subfolder>/<n>.npy    label 0 (incorrect)
+
+Every file holds one frame of the same shape and dtype, so the loader reads
+the .npy header of one file and copies every other file's data straight into
+its row of a preallocated float32 array (or a memory-mapped .npy output)
+with ``readinto``. Reads run on a thread pool; file I/O releases the GIL.
+Files whose header differs from the first one fall back to ``np.load``.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from paths import SQUAT_DATA_DIR
+
+# (folder name, label)
+LABEL_FOLDERS = (("Valid", 1), ("Invalid", 0))
+
+
+@dataclass
+class SquatDataFiles:
+    paths: List[str] = field(default_factory=list)
+    labels: List[int] = field(default_factory=list)
+    sources: List[int] = field(default_factory=list)  # index into source_names
+    source_names: List[str] = field(default_factory=list)  # "Valid/<subfolder>"
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+
+def _natural_key(name: str):
+    stem = name.rsplit(".", 1)[0]
+    return (0, int(stem), name) if stem.isdigit() else (1, 0, name)
+
+
+def _list_npy(folder: str) -> List[str]:
+    with os.scandir(folder) as entries:
+        names = [e.name for e in entries if e.name.endswith(".npy") and e.is_file()]
+    return [os.path.join(folder, name) for name in sorted(names, key=_natural_key)]
+
+
+def discover(root=SQUAT_DATA_DIR, workers: int = 16) -> SquatDataFiles:
+    """List every sample file in a fixed order (label folder, subfolder, file number)."""
+    subfolders: List[Tuple[str, int, str]] = []
+    for folder_name, label in LABEL_FOLDERS:
+        folder = Path(root) / folder_name
+        if not folder.is_dir():
+            continue
+        with os.scandir(folder) as entries:
+            names = sorted((e.name for e in entries if e.is_dir()), key=_natural_key)
+        subfolders.extend((str(folder / name), label, f"{folder_name}/{name}") for name in names)
+
+    # Directory listing is I/O-bound; list subfolders concurrently.
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        listings = list(pool.map(_list_npy, [path for path, _, _ in subfolders]))
+
+    files = SquatDataFiles()
+    for (_, label, source_name), paths in zip(subfolders, listings):
+        source_id = len(files.source_names)
+        files.source_names.append(source_name)
+        files.paths.extend(paths)
+        files.labels.extend([label] * len(paths))
+        files.sources.extend([source_id] * len(paths))
+    return files
+
+
+def _read_header(path: str):
+    """(header bytes, dtype, shape, fortran_order) of a .npy file."""
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        header_len = f.tell()
+        f.seek(0)
+        return f.read(header_len), dtype, shape, fortran_order
+
+
+def load_into(
+    paths: List[str],
+    out: Optional[np.ndarray] = None,
+    workers: int = 8,
+    mmap_path=None,
+) -> Tuple[np.ndarray, np.ndarray, List[Tuple[str, str]]]:
+    """
+    Load one flattened sample per path into rows of a float32 (N, F) array.
+
+    The array is ``out`` if given, else a new memory-mapped .npy at
+    ``mmap_path``, else a new in-memory array. Returns
+    (array, ok_mask, errors) where errors lists (path, message) for rows
+    that could not be read (their ok_mask entry is False).
+    """
+    if not paths:
+        return np.empty((0, 0), np.float32), np.zeros(0, bool), []
+
+    # The first file with a readable header is the template; unreadable files
+    # before it are reported like any other bad row by load_chunk below.
+    first_error = None
+    for template in paths:
+        try:
+            header, dtype, shape, fortran_order = _read_header(template)
+            break
+        except Exception as e:
+            first_error = first_error or f"{template}: {e}"
+    else:
+        raise ValueError(f"No readable .npy file among {len(paths)} paths (first: {first_error})")
+    num_features = int(np.prod(shape))
+    if out is None:
+        if mmap_path is not None:
+            out = np.lib.format.open_memmap(
+                str(mmap_path), mode="w+", dtype=np.float32, shape=(len(paths), num_features)
+            )
+        else:
+            out = np.empty((len(paths), num_features), dtype=np.float32)
+    ok = np.ones(len(paths), dtype=bool)
+    data_bytes = num_features * dtype.itemsize
+    fast = not fortran_order or len(shape) <= 1
+
+    def load_chunk(start: int, stop: int) -> List[Tuple[str, str]]:
+        errors = []
+        row = np.empty(num_features, dtype=dtype)  # per-thread read buffer
+        for i in range(start, stop):
+            path = paths[i]
+            try:
+                if fast:
+                    with open(path, "rb") as f:
+                        if f.read(len(header)) == header and f.readinto(row) == data_bytes:
+                            out[i] = row
+                            continue
+                # Different header (dtype/shape/order) or truncated data: let numpy decide
+                data = np.load(path).ravel()
+                if data.size != num_features:
+                    raise ValueError(f"expected {num_features} values, got {data.size}")
+                out[i] = data
+            except Exception as e:
+                ok[i] = False
+                errors.append((path, str(e)))
+        return errors
+
+    chunk = max(1, -(-len(paths) // (workers * 4)))
+    bounds = [(start, min(start + chunk, len(paths))) for start in range(0, len(paths), chunk)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = [err for chunk_errors in pool.map(lambda b: load_chunk(*b), bounds) for err in chunk_errors]
+    return out, ok, errors
@@ -0,0 +1,99 @@
+"""
+Cache of verified Firebase ID tokens.
+
+Verifying an ID token checks its RS256 signature against Google's public keys
+on every request. A verified token's claims cannot change before it expires,
+so the claims are cached under a SHA-256 of the token until the token's
+``exp`` claim. After the first request a token check is a dictionary lookup.
+Failed verifications are never cached.
+
+The verifier is injectable; ``fake_verify_token`` lets the cache (and the
+backend, with PHYSIO_FAKE_AUTH=1) run offline.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+class TokenCache:
+    def __init__(
+        self,
+        verifier: Callable[[str], dict],
+        max_entries: int = 10000,
+        max_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.verifier = verifier
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def verify(self, token: str) -> dict:
+        """Return the token's claims, verifying it only if it is not cached."""
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        now = self._clock()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, claims = entry
+                if now < expires_at:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return claims
+                del self._entries[key]
+                self._counters["expired"] += 1
+            self._counters["misses"] += 1
+
+        claims = self.verifier(token)
+
+        expires_at = self._expiry(claims, now)
+        if expires_at is not None:
+            with self._lock:
+                self._entries[key] = (expires_at, claims)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return claims
+
+    def _expiry(self, claims: dict, now: float) -> Optional[float]:
+        try:
+            exp = float(claims["exp"])
+        except (KeyError, TypeError, ValueError):
+            return None  # no usable expiry: do not cache
+        if exp <= now:
+            return None
+        return min(exp, now + self.max_ttl)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def fake_verify_token(token: str) -> dict:
+    """
+    Offline stand-in for firebase_auth.verify_id_token. Accepts tokens of the
+    form 'fake:<uid>' or 'fake:<uid>:<exp>' (exp in epoch seconds, default one
+    hour from now). Never enable this in production.
+    """
+    parts = token.split(":")
+    if len(parts) not in (2, 3) or parts[0] != "fake" or not parts[1]:
+        raise ValueError("Not a fake token")
+    exp = int(parts[2]) if len(parts) == 3 else int(time.time()) + 3600
+    if exp <= time.time():
+        raise ValueError("Fake token expired")
+    return {"uid": parts[1], "sub": parts[1], "exp": exp}
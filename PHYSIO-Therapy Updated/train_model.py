@@ -1,34 +1,32 @@
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import joblib
 import os
 
 # Try to load the best available dataset (prioritize fixed/larger datasets)
+from dataset_store import first_existing, load_dataset
+from forest_engine import export_forest, forest_dir_for
+from landmark_cache import file_sha256
+from squat_classifier import SquatClassifier
 from paths import (
     DATASET_DIR,
     MODELS_DIR,
-    SQUAT_DATASET_FIXED_CSV,
-    SQUAT_DATASET_FROM_NPY_CSV,
-    SQUAT_DATASET_COMBINED_CSV,
-    SQUAT_DATASET_EXTENDED_CSV,
-    SQUAT_DATASET_CSV,
+    SQUAT_DATASET_FIXED,
+    SQUAT_DATASET_FROM_NPY,
+    SQUAT_DATASET_COMBINED,
+    SQUAT_DATASET_EXTENDED,
+    SQUAT_DATASET,
 )
 
 datasets = [
-    SQUAT_DATASET_FIXED_CSV,     # Fixed dataset (99 features, matches MediaPipe)
-    SQUAT_DATASET_FROM_NPY_CSV,  # New large dataset (21K+ samples, 132 features)
-    SQUAT_DATASET_COMBINED_CSV,  # Combined (existing + new)
-    SQUAT_DATASET_EXTENDED_CSV,  # New videos only
-    SQUAT_DATASET_CSV,           # Original
+    SQUAT_DATASET_FIXED,     # Fixed dataset (99 features, matches MediaPipe)
+    SQUAT_DATASET_FROM_NPY,  # New large dataset (21K+ samples, 132 features)
+    SQUAT_DATASET_COMBINED,  # Combined (existing + new)
+    SQUAT_DATASET_EXTENDED,  # New videos only
+    SQUAT_DATASET,           # Original
 ]
 
-dataset_path = None
-for ds in datasets:
-    if ds.exists():
-        dataset_path = ds
-        break
+dataset_path = first_existing(datasets)
 
 if not dataset_path:
     print("❌ Error: No dataset found!")
@@ -39,10 +37,11 @@ if not dataset_path:
     exit(1)
 
 print(f"📊 Loading dataset: {dataset_path}")
-df = pd.read_csv(dataset_path)
+dataset = load_dataset(dataset_path)
 
-X = df.drop("label", axis=1)
-y = df["label"]
+# Plain float32 rows, as the pipeline feeds them at inference time
+X = dataset.features
+y = dataset.labels
 
 # Split data
 X_train, X_test, y_train, y_test = train_test_split(
@@ -55,9 +54,10 @@ model = RandomForestClassifier(
     random_state=42
 )
 model.fit(X_train, y_train)
+classifier = SquatClassifier(model, dataset.columns)
 
 # Evaluate
-y_pred = model.predict(X_test)
+y_pred, y_conf = classifier.predict_batch(X_test)
 accuracy = accuracy_score(y_test, y_pred)
 
 print("\n" + "=" * 70)
@@ -73,18 +73,26 @@ print(f"                Predicted")
 print(f"              Incorrect  Correct")
 print(f"Actual Incorrect   {cm[0][0]:4d}     {cm[0][1]:4d}")
 print(f"       Correct     {cm[1][0]:4d}     {cm[1][1]:4d}")
+print(f"\n🎯 Mean confidence: {y_conf.mean():.2%}")
 
 # Save model
 MODELS_DIR.mkdir(parents=True, exist_ok=True)
 model_path = MODELS_DIR / "squat_model.pkl"
-joblib.dump(model, str(model_path))
+classifier.save(model_path)
+
+# Flattened node arrays for the NumPy inference engine (see forest_engine.py)
+forest_dir = export_forest(
+    model, forest_dir_for(model_path), source_sha256=file_sha256(model_path), feature_names=dataset.columns
+)
 
 print("\n" + "=" * 70)
 print(f"✅ Model trained and saved to: {model_path}")
+print(f"🌲 Flattened forest exported to: {forest_dir}")
 print("=" * 70)
 print(f"\n📊 Dataset Statistics:")
-print(f"   Total samples: {len(df)}")
+print(f"   Total samples: {len(dataset)}")
 print(f"   Training samples: {len(X_train)}")
 print(f"   Test samples: {len(X_test)}")
-print(f"   Correct samples: {len(df[df['label']==1])}")
-print(f"   Incorrect samples: {len(df[df['label']==0])}")
+label_counts = dataset.label_counts()
+print(f"   Correct samples: {label_counts.get(1, 0)}")
+print(f"   Incorrect samples: {label_counts.get(0, 0)}")
@@ -0,0 +1,157 @@
+"""
+Lazily loaded vision/ML stack of backend_api.
+
+Importing backend_api does not import NumPy, OpenCV, MediaPipe or the model:
+session and stats endpoints come up (and are tested) without them.
+``VisionStack.load`` imports them, loads the model and (in thread mode) the
+tracker pool, starts the inference executor and classification batcher, and
+warms them with one prediction. The app's lifespan hook starts that in a
+background thread so the server accepts requests at once; the first pose
+request waits for it (or triggers it, when warmup is off). ``status()`` is what /health reports.
+
+A failed load is reported by ``status()`` and retried on the next request.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from inference_executor import InferenceExecutor
+
+# What /metrics shows for tracker counters that only exist inside process-mode workers
+PER_WORKER_STATS = "unavailable: kept per worker in process mode"
+
+
+class VisionStack:
+    def __init__(
+        self,
+        model_path,
+        pose_pool_config: dict,
+        executor_config: dict,
+        batch_config: dict,
+        input_size: Optional[int] = None,
+        roi_padding: Optional[float] = None,
+        cache_config: Optional[dict] = None,
+        rep_config: Optional[dict] = None,
+    ):
+        self.model_path = model_path
+        self.pose_pool_config = pose_pool_config
+        self.input_size = input_size  # longest side of frames given to MediaPipe (pose_pipeline.decode_frame)
+        self.roi_padding = roi_padding  # None: always detect on the full frame (roi_tracker.py)
+        self.executor_config = executor_config
+        self.batch_config = batch_config
+        self.cache_config = cache_config  # None or max_distance 0: classify every frame (classify_cache.py)
+        self.rep_config = rep_config or {}  # rep_detector.RepSessions arguments
+
+        self.state = "cold"  # cold -> loading -> ready, or failed
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+        # Set by load()
+        self.model = None
+        self.pipeline = None  # None in process mode: the workers own the pipelines
+        self.executor: Optional[InferenceExecutor] = None
+        self.batcher = None
+        self.classify_cache = None
+        self.reps = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def load(self) -> "VisionStack":
+        """Import and initialize everything (blocking, idempotent, thread-safe)."""
+        with self._lock:
+            if self.ready:
+                return self
+            self.state, self.error = "loading", None
+            start = time.perf_counter()
+            try:
+                # Imported here rather than by the first frame
+                import cv2  # noqa: F401
+                import mediapipe  # noqa: F401
+                import numpy as np
+
+                from classify_cache import ClassifyCache
+                from micro_batcher import MicroBatcher
+                from pose_pipeline import init_process_pipeline
+                from rep_detector import RepSessions
+                from squat_classifier import SquatClassifier
+
+                pipeline_args = (self.model_path, self.pose_pool_config, self.input_size, self.roi_padding)
+                process_mode = self.executor_config.get("mode") == "process"
+                if process_mode:
+                    # Frames are detected in the workers; this process only classifies (batched)
+                    pipeline = None
+                    model = SquatClassifier.load(self.model_path)
+                else:
+                    pipeline = init_process_pipeline(*pipeline_args)
+                    model = pipeline.model
+                executor = InferenceExecutor(
+                    **self.executor_config,
+                    # In "process" mode every worker loads its own model and tracker pool.
+                    initializer=init_process_pipeline if process_mode else None,
+                    initargs=pipeline_args,
+                )
+                batcher = MicroBatcher(model.predict_batch, **self.batch_config)
+                cache = None
+                if self.cache_config and self.cache_config.get("max_distance"):
+                    cache = ClassifyCache(**self.cache_config)
+                reps = RepSessions(**self.rep_config)
+                model.predict_one(np.zeros(model.n_features, dtype=np.float32))
+            except Exception as e:
+                self.state, self.error = "failed", f"{type(e).__name__}: {e}"
+                raise
+
+            self.model, self.pipeline, self.executor, self.batcher = model, pipeline, executor, batcher
+            self.classify_cache = cache
+            self.reps = reps
+            self.load_seconds = time.perf_counter() - start
+            self.state = "ready"
+            return self
+
+    async def ensure_ready(self) -> "VisionStack":
+        """Load on a worker thread if needed; concurrent callers wait for the same load."""
+        if not self.ready:
+            await asyncio.get_running_loop().run_in_executor(None, self.load)
+        return self
+
+    def start_warmup(self) -> None:
+        """Load in a background thread; failures are kept in status()."""
+
+        def warm():
+            try:
+                self.load()
+            except Exception:
+                pass
+
+        threading.Thread(target=warm, name="vision-warmup", daemon=True).start()
+
+    def status(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {"state": self.state}
+        if self.load_seconds is not None:
+            status["load_ms"] = round(self.load_seconds * 1000, 1)
+        if self.error:
+            status["error"] = self.error
+        return status
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.ready:
+            return {}
+        stats = {
+            "pose_pool": self.pipeline.pose_pool.stats() if self.pipeline else PER_WORKER_STATS,
+            "inference_executor": self.executor.stats(),
+            "classify_batcher": self.batcher.stats(),
+        }
+        if self.roi_padding:
+            stats["pose_roi"] = self.pipeline.roi_stats() if self.pipeline else PER_WORKER_STATS
+        if self.classify_cache is not None:
+            stats["classify_cache"] = self.classify_cache.stats()
+        stats["reps"] = self.reps.stats()
+        return stats
+
+    def shutdown(self) -> None:
+        if self.ready:
+            self.executor.shutdown()
+            self.batcher.shutdown()